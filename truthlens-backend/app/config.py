@@ -10,6 +10,16 @@ from typing import Optional
 load_dotenv()
 
 
+def _parse_keys(*values: Optional[str]) -> list:
+    """Split comma-separated values (API keys, model names), dropping blanks and duplicates."""
+    keys = []
+    for value in values:
+        for key in (value or "").split(","):
+            key = key.strip()
+            if key and key not in keys:
+                keys.append(key)
+    return keys
+
 
 class Settings:
     """Application settings loaded from environment variables."""
@@ -20,18 +30,45 @@ class Settings:
     AIORNOT_API_KEY: Optional[str] = os.getenv("AIORNOT_API_KEY")  # Replaced Hive with AI or Not
     ELEVENLABS_API_KEY: Optional[str] = os.getenv("ELEVENLABS_API_KEY")  # ElevenLabs TTS
     
+    # Key pools (comma-separated, e.g. GEMINI_API_KEYS=key1,key2,key3)
+    GEMINI_API_KEYS: list = _parse_keys(os.getenv("GEMINI_API_KEYS"), GEMINI_API_KEY)
+    BRAVE_API_KEYS: list = _parse_keys(os.getenv("BRAVE_API_KEYS"), BRAVE_API_KEY)
+    KEY_POOL_STRATEGY: str = os.getenv("KEY_POOL_STRATEGY", "least_loaded")  # or "round_robin"
+    KEY_POOL_MAX_ATTEMPTS: int = 2  # Keys tried per call when the first one is rate limited
+    
     # API Configuration
-    GEMINI_MODEL: str = "gemini-2.0-flash-lite"
-    BRAVE_SEARCH_URL: str = "https://api.search.brave.com/res/v1/web/search"
-    AIORNOT_API_URL: str = "https://api.aiornot.com/v1/reports/image"  # AI or Not endpoint
-    ELEVENLABS_API_URL: str = "https://api.elevenlabs.io/v1/text-to-speech"  # ElevenLabs TTS
+    GEMINI_EXTRACTION_MODEL: str = os.getenv("GEMINI_EXTRACTION_MODEL", "gemini-2.0-flash-lite")
+    GEMINI_SYNTHESIS_MODELS: list = _parse_keys(
+        os.getenv("GEMINI_SYNTHESIS_MODELS", "gemini-2.0-flash-lite,gemini-2.5-flash")
+    )  # Cascade tiers, fastest and cheapest first
+    GEMINI_API_ENDPOINT: Optional[str] = os.getenv("GEMINI_API_ENDPOINT")  # Override (e.g. local stand-in, uses REST)
+    BRAVE_SEARCH_URL: str = os.getenv("BRAVE_SEARCH_URL", "https://api.search.brave.com/res/v1/web/search")
+    AIORNOT_API_URL: str = os.getenv("AIORNOT_API_URL", "https://api.aiornot.com/v1/reports/image")  # AI or Not endpoint
+    ELEVENLABS_API_URL: str = os.getenv("ELEVENLABS_API_URL", "https://api.elevenlabs.io/v1/text-to-speech")  # ElevenLabs TTS
     ELEVENLABS_VOICE_ID: str = "21m00Tcm4TlvDq8ikWAM"  # Default voice: Rachel (neutral, clear)
     
+    # Synthesis model cascade (a verdict is re-run on the next tier when it looks unreliable)
+    CASCADE_CONFIDENCE_THRESHOLD: float = float(os.getenv("CASCADE_CONFIDENCE_THRESHOLD", "0.7"))  # Escalate below this
+    CASCADE_ESCALATE_LABELS: list = ["Unverifiable", "Misleading"]  # Escalate these labels at any confidence
+    CASCADE_MIN_SECONDS: float = 1.5  # Time left before the request deadline needed to escalate
+    GEMINI_PRICES: dict = {
+        "gemini-2.0-flash-lite": (0.075, 0.30),
+        "gemini-2.0-flash": (0.10, 0.40),
+        "gemini-2.5-flash-lite": (0.10, 0.40),
+        "gemini-2.5-flash": (0.30, 2.50),
+        "gemini-2.5-pro": (1.25, 10.00),
+    }  # List prices, USD per million (input, output) tokens
+    
     # Search Configuration
     SEARCH_RESULT_COUNT: int = 20
     SEARCH_FRESHNESS: str = "pw"  # Past week
     MAX_SOURCES: int = 3
     
+    # Multi-claim decomposition (off: only the most significant claim is checked)
+    MULTI_CLAIM_ENABLED: bool = os.getenv("MULTI_CLAIM_ENABLED", "false").lower() == "true"
+    MAX_CLAIMS: int = int(os.getenv("MAX_CLAIMS", "3"))  # Atomic claims checked per post
+    CLAIM_QUERY_OVERLAP: float = 0.6  # Claims whose queries overlap this much share one search
+    
     # Trusted Domains for Fact-Checking
     TRUSTED_DOMAINS: list = [
         # News Agencies & Wire Services
@@ -57,18 +94,155 @@ class Settings:
     # Thread Pool
     MAX_WORKERS: int = 5
     
+    # Request scheduling (fact-check pipeline)
+    SCHEDULER_MAX_CONCURRENT: int = int(os.getenv("SCHEDULER_MAX_CONCURRENT", "8"))
+    SCHEDULER_WEIGHTS: dict = {"interactive": 8.0, "background": 2.0, "batch": 1.0}
+    SCHEDULER_MAX_QUEUE: int = 100  # Per priority class
+    
+    # Request deadlines (server default per priority class; a tighter X-Deadline wins)
+    REQUEST_DEADLINES: dict = {
+        "interactive": float(os.getenv("REQUEST_DEADLINE", "20")),
+        "background": 60.0,
+        "batch": 300.0,
+    }  # Seconds
+    STAGE_MIN_SECONDS: dict = {"extract": 0.5, "search": 0.3, "evidence": 0.0, "synthesize": 1.0}  # Least time worth starting a stage with
+    PARTIAL_RESULT_TTL: int = 600  # Seconds an abandoned run's claim and sources are kept for a retry
+    PARTIAL_RESULT_MAX_ENTRIES: int = 2000
+    
+    # WebSocket channel (/ws)
+    WS_MAX_IN_FLIGHT: int = 16  # Concurrent requests per connection
+    WS_SEND_QUEUE: int = 64  # Outgoing frames buffered per connection before producers wait
+    
+    # Text-to-speech narration (segment-level synthesis with cached phrase audio)
+    ELEVENLABS_MODEL_ID: str = "eleven_multilingual_v2"  # Better quality model
+    ELEVENLABS_OUTPUT_FORMAT: str = "mp3_44100_128"  # Pinned so cached clips can be joined frame by frame
+    TTS_SEGMENTED: bool = os.getenv("TTS_SEGMENTED", "true").lower() == "true"
+    TTS_PHRASE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024  # ~30 minutes of 128 kbps audio
+    TTS_MAX_SEGMENT_CALLS: int = 4  # Upstream calls per narration before the rest is merged into one
+    
+    # Text-to-speech backends (ElevenLabs and a local CPU engine)
+    TTS_BACKEND_POLICY: str = os.getenv("TTS_BACKEND_POLICY", "elevenlabs_first")  # Or local_first, elevenlabs, local
+    TTS_FIRST_AUDIO_TIMEOUT: float = float(os.getenv("TTS_FIRST_AUDIO_TIMEOUT", "3"))  # Seconds before fallback
+    TTS_LOCAL_WHEN_BUSY: int = int(os.getenv("TTS_LOCAL_WHEN_BUSY", "8"))  # ElevenLabs backlog that sends new narrations local (0 = never)
+    TTS_LOCAL_ENGINE: str = os.getenv("TTS_LOCAL_ENGINE", "espeak")  # "espeak" (espeak-ng binary) or "piper" (piper-tts)
+    TTS_LOCAL_VOICE: Optional[str] = os.getenv("TTS_LOCAL_VOICE")  # eSpeak voice name or Piper .onnx model path
+    TTS_LOCAL_WORKERS: int = int(os.getenv("TTS_LOCAL_WORKERS", "2"))  # Synthesis processes
+    
+    # Verdict cache
+    VERDICT_CACHE_TTL: int = int(os.getenv("VERDICT_CACHE_TTL", "3600"))  # Seconds
+    VERDICT_CACHE_MAX_ENTRIES: int = 10000
+    VERDICT_STALE_WHILE_REVALIDATE: int = 600  # Seconds a stale verdict may still be served
+    
+    # Background pre-verification of trending claims
+    PREVERIFY_ENABLED: bool = os.getenv("PREVERIFY_ENABLED", "true").lower() == "true"
+    PREVERIFY_INTERVAL: int = 60  # Seconds between refresh cycles
+    PREVERIFY_TOP_K: int = 20  # Trending claims kept warm
+    PREVERIFY_MIN_COUNT: int = 3  # Requests before a claim counts as trending
+    PREVERIFY_REFRESH_AHEAD: int = 300  # Refresh verdicts expiring within this many seconds
+    PREVERIFY_BUDGET_PER_CYCLE: int = int(os.getenv("PREVERIFY_BUDGET_PER_CYCLE", "3"))
+    PREVERIFY_OFF_PEAK_BUDGET: int = int(os.getenv("PREVERIFY_OFF_PEAK_BUDGET", "10"))
+    PREVERIFY_OFF_PEAK_HOURS: str = os.getenv("PREVERIFY_OFF_PEAK_HOURS", "2-8")  # UTC, e.g. "0-6,22-24"
+    PREVERIFY_MAX_LOAD: float = 0.5  # Skip a cycle when the scheduler is busier than this
+    TRENDING_DECAY_INTERVAL: int = 900  # Seconds between halving claim counts
+    
+    # Evidence enrichment (fetch and extract the text of top source pages)
+    EVIDENCE_ENABLED: bool = os.getenv("EVIDENCE_ENABLED", "true").lower() == "true"
+    EVIDENCE_MAX_PAGES: int = 3  # Top-ranked pages fetched per claim
+    EVIDENCE_MAX_CONCURRENT: int = 8  # Page fetches in flight across all requests
+    EVIDENCE_TIME_BUDGET: float = float(os.getenv("EVIDENCE_TIME_BUDGET", "1.5"))  # Seconds a request waits for pages
+    EVIDENCE_PAGE_TIMEOUT: float = 5.0  # Seconds before a single fetch is abandoned
+    EVIDENCE_MAX_BYTES: int = 512 * 1024  # Bytes read per page before giving up on the rest
+    EVIDENCE_MAX_CHARS: int = 3000  # Extracted article text kept per page
+    EVIDENCE_CACHE_TTL: int = 3600  # Seconds before a cached page is revalidated
+    EVIDENCE_CACHE_MAX_ENTRIES: int = 2000
+    EVIDENCE_FAILURE_TTL: int = 300  # Seconds a failed/non-HTML page is not retried
+    EVIDENCE_MAX_REDIRECTS: int = 3  # Redirects followed per page (each hop is checked like the first)
+    
+    # Check-worthiness gate (skip posts with no checkable claim before any upstream call)
+    # Off by default until calibrated on real labeled traffic (it answers without any upstream call)
+    CHECKWORTHY_ENABLED: bool = os.getenv("CHECKWORTHY_ENABLED", "false").lower() == "true"
+    CHECKWORTHY_THRESHOLD: Optional[float] = (
+        float(os.getenv("CHECKWORTHY_THRESHOLD")) if os.getenv("CHECKWORTHY_THRESHOLD") else None
+    )  # Min P(not checkable) to skip; default is the model's calibrated threshold
+    
+    # Local evidence index (SQLite FTS5 over fact-check records and past verdict sources)
+    EVIDENCE_INDEX_ENABLED: bool = os.getenv("EVIDENCE_INDEX_ENABLED", "true").lower() == "true"
+    EVIDENCE_INDEX_PATH: str = os.getenv("EVIDENCE_INDEX_PATH", "data/evidence_index.db")
+    EVIDENCE_INDEX_STRONG_MATCH: float = 0.75  # Share of query terms a record must match to skip Brave
+    EVIDENCE_INDEX_WEAK_MATCH: float = 0.4  # Below this a record is not used at all
+    EVIDENCE_INDEX_MIN_STRONG: int = 2  # Strong imported fact-check matches needed to skip the Brave search
+    EVIDENCE_INDEX_VERDICT_TTL: int = 7 * 24 * 3600  # Seconds past-verdict sources are kept (SEARCH_FRESHNESS window)
+    EVIDENCE_INDEX_PRUNE_INTERVAL: int = 3600  # Seconds between deletions of expired past-verdict sources
+    
+    # Admin surface (/api/admin profiling and /api/metrics; disabled unless ADMIN_TOKEN is set)
+    ADMIN_TOKEN: Optional[str] = os.getenv("ADMIN_TOKEN")
+    PROFILE_MAX_SECONDS: int = 60  # Longest sampling profile
+    PROFILE_SAMPLE_INTERVAL: float = 0.005  # Seconds between stack samples (200 Hz)
+    PROFILE_KEEP_REQUESTS: int = 20  # Per-request cProfile dumps kept in memory
+    LOOP_MONITOR_ENABLED: bool = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+    LOOP_MONITOR_INTERVAL: float = 0.05  # Seconds between event-loop heartbeats
+    LOOP_STALL_THRESHOLD: float = float(os.getenv("LOOP_STALL_THRESHOLD", "0.1"))  # Heartbeat lateness reported as a stall
+    LOOP_STALLS_KEPT: int = 50
+    LOOP_STALL_STACK_DEPTH: int = 30  # Innermost frames kept per stall
+    
+    # Asynchronous jobs (/api/jobs): durable SQLite queue drained by a bounded worker pool
+    JOBS_ENABLED: bool = os.getenv("JOBS_ENABLED", "true").lower() == "true"
+    JOBS_DB_PATH: str = os.getenv("JOBS_DB_PATH", "data/jobs.db")
+    JOBS_WORKERS: int = int(os.getenv("JOBS_WORKERS", "4"))  # Jobs running at once
+    JOBS_MAX_QUEUED: int = int(os.getenv("JOBS_MAX_QUEUED", "10000"))  # Submissions beyond this get 503
+    JOBS_TTL: int = int(os.getenv("JOBS_TTL", "3600"))  # Seconds a job (and its result) is kept
+    JOBS_MAX_ATTEMPTS: int = 3  # Runs before a job that keeps failing is marked failed
+    JOBS_LEASE: float = 30.0  # Seconds a running job stays claimed without a heartbeat from its process
+    JOBS_RETRY_DELAY: float = 5.0  # Seconds before a failed attempt is retried (doubles each time)
+    JOBS_MAX_BATCH: int = 100  # Posts per batch fact-check job
+    JOBS_BATCH_CONCURRENCY: int = 4  # Posts of one batch job verified at once
+    JOBS_MAX_WAIT: int = 60  # Longest long-poll on GET /api/jobs/{id}?wait=
+    JOBS_SWEEP_INTERVAL: int = 60  # Seconds between deletions of expired jobs
+    
+    # Cluster mode: replicas partition verdicts by claim over a consistent-hash ring
+    # (off unless CLUSTER_PEERS lists two or more replicas)
+    CLUSTER_PEERS: list = [peer.rstrip("/") for peer in _parse_keys(os.getenv("CLUSTER_PEERS"))]  # Base URL of every replica, this one included
+    CLUSTER_SELF: Optional[str] = (os.getenv("CLUSTER_SELF") or "").rstrip("/") or None  # This replica's URL as listed in CLUSTER_PEERS
+    CLUSTER_SECRET: Optional[str] = os.getenv("CLUSTER_SECRET")  # Shared secret replicas send to each other (required in cluster mode)
+    CLUSTER_VNODES: int = 64  # Ring points per replica (evens out the key share)
+    CLUSTER_PEER_COOLDOWN: float = 10.0  # Seconds an unreachable replica is routed around
+    CLUSTER_CONNECT_TIMEOUT: float = 1.0
+    CLUSTER_MAX_CONNECTIONS: int = 200  # Pooled keep-alive connections to the other replicas
+    
     # Timeouts (seconds)
     SEARCH_TIMEOUT: int = 10
+    GEMINI_TIMEOUT: int = 30  # Per completion, so an abandoned call does not hold its thread for long
     AIORNOT_TIMEOUT: int = 30  # AI or Not timeout
-    
+
+    # Upstream quotas: (sustained requests/second, burst size) per API key
+    UPSTREAM_RATE_LIMITS: dict = {
+        "gemini": (float(os.getenv("GEMINI_RATE_LIMIT", "0.5")), float(os.getenv("GEMINI_BURST", "5"))),
+        "brave": (float(os.getenv("BRAVE_RATE_LIMIT", "1")), float(os.getenv("BRAVE_BURST", "1"))),
+        "aiornot": (float(os.getenv("AIORNOT_RATE_LIMIT", "1")), float(os.getenv("AIORNOT_BURST", "2"))),
+        "elevenlabs": (float(os.getenv("ELEVENLABS_RATE_LIMIT", "2")), float(os.getenv("ELEVENLABS_BURST", "4"))),
+    }
+    QUOTA_BACKGROUND_RESERVE: float = 0.25  # Bucket share held back per lower priority step
+    QUOTA_MAX_WAIT: dict = {"interactive": 2.0, "background": 30.0, "batch": 120.0}  # Seconds
+    QUOTA_DEFAULT_COOLDOWN: float = 5.0  # Seconds to back off after a 429 without Retry-After
+
     def validate(self):
         """Validate required configuration."""
         errors = []
         
-        if not self.GEMINI_API_KEY:
-            errors.append("GEMINI_API_KEY is required")
-        if not self.BRAVE_API_KEY:
-            errors.append("BRAVE_API_KEY is required")
+        if not self.GEMINI_API_KEYS:
+            errors.append("GEMINI_API_KEY or GEMINI_API_KEYS is required")
+        if not self.BRAVE_API_KEYS:
+            errors.append("BRAVE_API_KEY or BRAVE_API_KEYS is required")
+        if self.KEY_POOL_STRATEGY not in ("least_loaded", "round_robin"):
+            errors.append("KEY_POOL_STRATEGY must be 'least_loaded' or 'round_robin'")
+        if not self.GEMINI_SYNTHESIS_MODELS:
+            errors.append("GEMINI_SYNTHESIS_MODELS needs at least one model")
+        if self.TTS_BACKEND_POLICY not in ("elevenlabs_first", "local_first", "elevenlabs", "local"):
+            errors.append("TTS_BACKEND_POLICY must be 'elevenlabs_first', 'local_first', 'elevenlabs' or 'local'")
+        if len(self.CLUSTER_PEERS) > 1 and self.CLUSTER_SELF not in self.CLUSTER_PEERS:
+            errors.append("CLUSTER_SELF must be one of the CLUSTER_PEERS")
+        if self.CLUSTER_PEERS and not self.CLUSTER_SECRET:
+            errors.append("CLUSTER_SECRET is required when CLUSTER_PEERS is set")
         
         if errors:
             raise ValueError(f"Configuration errors: {', '.join(errors)}")
@@ -77,18 +251,10 @@ class Settings:
             print("⚠️  AIORNOT_API_KEY not set - AI media detection will be unavailable")
         
         if not self.ELEVENLABS_API_KEY:
-            print("⚠️  ELEVENLABS_API_KEY not set - Text-to-speech will be unavailable")
+            print("⚠️  ELEVENLABS_API_KEY not set - Text-to-speech will use the local engine only, if installed")
         
         return True
 
 
-# Global settings instance
+# Global settings instance (validated at app startup, see app/main.py lifespan)
 settings = Settings()
-
-# Validate on import
-try:
-    settings.validate()
-    print("✓ Configuration loaded and validated")
-except ValueError as e:
-    print(f"❌ Configuration error: {e}")
-    raise
@@ -0,0 +1,156 @@
+"""
+Lifespan-managed container for process-wide resources.
+
+Nothing expensive happens at import time: thread and process pools, the
+shared HTTP clients and Gemini clients are created on first use, and the
+Gemini SDK itself is only imported then.
+The app lifespan in app/main.py calls shutdown() to release everything.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+import httpx
+from app.config import settings
+
+
+class GeminiModel:
+    """
+    A Gemini model on its own GenerativeServiceClient.
+
+    Only the text generate_content() the pipeline uses, built on the public
+    google.ai.generativelanguage client so each API key gets its own client
+    (google.generativeai.GenerativeModel always uses the global one).
+    """
+
+    def __init__(self, client: Any, model_name: str):
+        self.client = client
+        self.model_name = model_name if model_name.startswith("models/") else f"models/{model_name}"
+
+    def generate_content(self, prompt: str, request_options: Optional[dict] = None):
+        """Blocking single-turn completion (a google.generativeai GenerateContentResponse)."""
+        import google.ai.generativelanguage as glm
+        from google.generativeai.types import GenerateContentResponse
+
+        request = glm.GenerateContentRequest(
+            model=self.model_name,
+            contents=[glm.Content(role="user", parts=[glm.Part(text=prompt)])]
+        )
+        response = self.client.generate_content(request, **(request_options or {}))
+        return GenerateContentResponse.from_response(response)
+
+
+class ServiceContainer:
+    """Lazily constructed executors and upstream clients."""
+
+    def __init__(self):
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._process_pools: Dict[str, ProcessPoolExecutor] = {}
+        self._gemini_clients: Dict[str, Any] = {}
+        self._gemini_models: Dict[Tuple[str, str], GeminiModel] = {}
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._cluster_client: Optional[httpx.AsyncClient] = None
+
+    def executor(self, name: str) -> ThreadPoolExecutor:
+        """
+        Thread pool for blocking calls to one upstream.
+
+        Args:
+            name: Pool name ("gemini", "brave", "aiornot")
+
+        Returns:
+            The pool, created on first use
+        """
+        executor = self._executors.get(name)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=settings.MAX_WORKERS,
+                thread_name_prefix=f"truthlens-{name}"
+            )
+            self._executors[name] = executor
+        return executor
+
+    def process_pool(self, name: str, workers: int) -> ProcessPoolExecutor:
+        """
+        Process pool for CPU-bound work that would hold the GIL.
+
+        Workers are spawned (not forked) so they never inherit the event
+        loop or the thread pools of the server process.
+
+        Args:
+            name: Pool name ("tts")
+            workers: Worker processes, used when the pool is created
+
+        Returns:
+            The pool, created on first use
+        """
+        pool = self._process_pools.get(name)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            self._process_pools[name] = pool
+        return pool
+
+    def http_client(self) -> httpx.AsyncClient:
+        """Shared pooled async HTTP client (keep-alive across requests)."""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                follow_redirects=True,
+                timeout=httpx.Timeout(settings.EVIDENCE_PAGE_TIMEOUT, connect=2.0),
+                limits=httpx.Limits(max_connections=settings.EVIDENCE_MAX_CONCURRENT * 4)
+            )
+        return self._http_client
+
+    def cluster_client(self) -> httpx.AsyncClient:
+        """Pooled client for calls to the other replicas (timeouts are set per call)."""
+        if self._cluster_client is None:
+            limits = httpx.Limits(
+                max_connections=settings.CLUSTER_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.CLUSTER_MAX_CONNECTIONS
+            )
+            self._cluster_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(None, connect=settings.CLUSTER_CONNECT_TIMEOUT),
+                limits=limits
+            )
+        return self._cluster_client
+
+    def gemini_model(self, api_key: str, model_name: str) -> "GeminiModel":
+        """Return a Gemini model bound to a specific API key."""
+        model = self._gemini_models.get((api_key, model_name))
+        if model is None:
+            # Deferred: the SDK takes a quarter of a second to import
+            import google.ai.generativelanguage as glm
+
+            # genai.configure() is process-global, so give each key its own client
+            client = self._gemini_clients.get(api_key)
+            if client is None:
+                client_options = {"api_key": api_key}
+                if settings.GEMINI_API_ENDPOINT:
+                    client_options["api_endpoint"] = settings.GEMINI_API_ENDPOINT
+                    client = glm.GenerativeServiceClient(client_options=client_options, transport="rest")
+                else:
+                    client = glm.GenerativeServiceClient(client_options=client_options)
+                self._gemini_clients[api_key] = client
+            model = GeminiModel(client, model_name)
+            self._gemini_models[(api_key, model_name)] = model
+            print(f"✓ Gemini model configured: {model_name}")
+        return model
+
+    async def shutdown(self):
+        """Release executors and clients (called from the app lifespan)."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        if self._cluster_client is not None:
+            await self._cluster_client.aclose()
+            self._cluster_client = None
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._executors.clear()
+        for pool in self._process_pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._process_pools.clear()
+        self._gemini_models.clear()
+        self._gemini_clients.clear()
+
+
+# Global container instance
+container = ServiceContainer()
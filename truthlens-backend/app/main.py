@@ -2,22 +2,72 @@
 TruthLens API - Main application entry point.
 Refactored modular architecture for scalability.
 """
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.routers import fact_check_router, media_router
+from app.container import container
+from app.profiling import ProfilingMiddleware, loop_monitor
+from app.routers import admin_router, fact_check_router, jobs_router, media_router, metrics_router, ws_router
+from app.services import TTSService, cluster, evidence_index, job_queue, local_backend, preverification_worker
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Validate configuration and manage background resources.
+    
+    Import stays side-effect free; clients and thread pools are created
+    lazily by the service container and released here on shutdown.
+    """
+    print("=" * 50)
+    print("🚀 Initializing TruthLens API")
+    print("=" * 50)
+    
+    try:
+        settings.validate()
+        print("✓ Configuration loaded and validated")
+    except ValueError as e:
+        print(f"❌ Configuration error: {e}")
+        raise
+    
+    preverification_worker.start()
+    await job_queue.start()
+    if settings.LOOP_MONITOR_ENABLED:
+        loop_monitor.start(asyncio.get_running_loop())
+    if local_backend in TTSService.backend_order():
+        local_backend.warm()
+    
+    print("=" * 50)
+    print(f"✅ TruthLens API Ready")
+    print(f"📍 Models: extract={settings.GEMINI_EXTRACTION_MODEL}, synthesize={' → '.join(settings.GEMINI_SYNTHESIS_MODELS)}")
+    print(f"🔍 Search: Brave Search API")
+    print(f"🤖 Media Detection: {'Enabled (AI or Not)' if settings.AIORNOT_API_KEY else 'Disabled'}")
+    print(f"🔊 TTS: {' → '.join(b.name for b in TTSService.backend_order()) or 'Disabled'}")
+    if cluster.enabled:
+        print(f"🕸️  Cluster: {cluster.self_url} of {len(cluster.ring.nodes)} replicas")
+    print(f"🩺 Admin profiling and metrics: {'Enabled' if settings.ADMIN_TOKEN else 'Disabled (set ADMIN_TOKEN)'}")
+    print("=" * 50)
+    
+    yield
+    
+    loop_monitor.stop()
+    await job_queue.stop()
+    await preverification_worker.stop()
+    await evidence_index.flush()
+    await container.shutdown()
 
-print("=" * 50)
-print("🚀 Initializing TruthLens API")
-print("=" * 50)
 
 # Initialize FastAPI app
 app = FastAPI(
     title="TruthLens API",
     version="1.0.0",
-    description="AI-powered fact-checking and media verification API"
+    description="AI-powered fact-checking and media verification API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
-print("✓ FastAPI app initialized")
 
 # Configure CORS for Chrome Extension
 app.add_middleware(
@@ -27,19 +77,17 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-print("✓ CORS middleware configured")
+
+# Per-request cProfile for admins (X-Profile: 1); a no-op without ADMIN_TOKEN
+app.add_middleware(ProfilingMiddleware)
 
 # Include routers
 app.include_router(fact_check_router)
 app.include_router(media_router)
-print("✓ API routers registered")
-
-print("=" * 50)
-print(f"✅ TruthLens API Ready")
-print(f"📍 Model: {settings.GEMINI_MODEL}")
-print(f"🔍 Search: Brave Search API")
-print(f"🤖 Media Detection: {'Enabled (AI or Not)' if settings.AIORNOT_API_KEY else 'Disabled'}")
-print("=" * 50)
+app.include_router(jobs_router)
+app.include_router(metrics_router)
+app.include_router(ws_router)
+app.include_router(admin_router)
 
 
 @app.get("/")
@@ -60,7 +108,11 @@ async def health():
     """Health check endpoint."""
     return {
         "status": "healthy",
-        "model": settings.GEMINI_MODEL,
+        "model": settings.GEMINI_SYNTHESIS_MODELS[0],
+        "model_tiers": {
+            "extraction": settings.GEMINI_EXTRACTION_MODEL,
+            "synthesis": settings.GEMINI_SYNTHESIS_MODELS
+        },
         "search": "brave",
         "media_detection": bool(settings.AIORNOT_API_KEY)
     }
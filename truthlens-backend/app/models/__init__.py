@@ -1,20 +1,30 @@
 """Pydantic models for request/response validation."""
 from app.models.fact_check import (
+    ClaimVerdict,
+    ClusterVerifyRequest,
     FactCheckRequest,
     FactCheckResponse,
     Source,
     TTSRequest
 )
+from app.models.internal import SearchHit, Verdict
+from app.models.jobs import BatchFactCheckRequest, JobResponse
 from app.models.media_check import (
     MediaCheckRequest,
     MediaCheckResponse
 )
 
 __all__ = [
+    "ClaimVerdict",
+    "ClusterVerifyRequest",
     "FactCheckRequest",
     "FactCheckResponse",
     "Source",
     "TTSRequest",
     "MediaCheckRequest",
-    "MediaCheckResponse"
+    "MediaCheckResponse",
+    "SearchHit",
+    "Verdict",
+    "BatchFactCheckRequest",
+    "JobResponse"
 ]
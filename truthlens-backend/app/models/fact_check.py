@@ -6,6 +6,13 @@ from typing import List, Optional
 class FactCheckRequest(BaseModel):
     """Request model for fact-checking."""
     text: str
+    priority: Optional[str] = None  # interactive / background / batch (or X-Priority header)
+
+
+class ClusterVerifyRequest(BaseModel):
+    """Fact-check forwarded by the replica that received it to the one owning the claim."""
+    text: str
+    use_cache: bool = True
 
 
 class TTSRequest(BaseModel):
@@ -22,6 +29,15 @@ class Source(BaseModel):
     published_date: Optional[str] = None
 
 
+class ClaimVerdict(BaseModel):
+    """Verdict for one atomic claim of a multi-claim post."""
+    claim: str
+    label: str
+    explanation: str
+    sources: List[Source]
+    confidence: float
+
+
 class FactCheckResponse(BaseModel):
     """Response model for fact-checking."""
     label: str  # True, False, Misleading, Unverifiable
@@ -29,6 +45,8 @@ class FactCheckResponse(BaseModel):
     sources: List[Source]
     confidence: float  # 0.0 to 1.0 (internal only)
     bias: Optional[str] = None  # None / Potential / Likely
+    claim_hash: Optional[str] = None  # Key for GET /api/verdicts/{claim_hash}
+    claims: Optional[List[ClaimVerdict]] = None  # Per-claim breakdown (multi-claim mode only)
 
 
 # Update forward references
@@ -0,0 +1,74 @@
+"""Compact internal types used inside the fact-check pipeline."""
+from typing import List, Optional
+from app.models.fact_check import FactCheckResponse, Source
+
+
+class SearchHit:
+    """
+    A search result as it moves through the pipeline.
+
+    Slotted so the many hits per request stay small, and converted to an
+    API `Source` at most once (memoized) instead of being re-copied.
+    """
+    __slots__ = ("title", "url", "content", "published_date", "page_text", "_source")
+
+    def __init__(
+        self,
+        title: str,
+        url: str,
+        content: str = "",
+        published_date: Optional[str] = None
+    ):
+        self.title = title
+        self.url = url
+        self.content = content
+        self.published_date = published_date
+        self.page_text: Optional[str] = None  # Extracted article text, if fetched
+        self._source: Optional[Source] = None
+
+    @classmethod
+    def from_brave(cls, result: dict) -> "SearchHit":
+        """Build a hit from one Brave `web.results` item."""
+        return cls(
+            title=result.get("title", "N/A"),
+            url=result.get("url", ""),
+            content=result.get("description", ""),
+            published_date=result.get("age", None)
+        )
+
+    def to_source(self) -> Source:
+        """API representation (validated fields are plain strings, so skip validation)."""
+        if self._source is None:
+            self._source = Source.model_construct(
+                title=self.title,
+                url=self.url,
+                snippet=self.content[:200],
+                published_date=self.published_date
+            )
+        return self._source
+
+    def __repr__(self) -> str:
+        return f"SearchHit({self.url!r})"
+
+
+class Verdict:
+    """Parsed Gemini synthesis output, before source selection."""
+    __slots__ = ("label", "explanation", "confidence", "bias", "source_indices")
+
+    def __init__(self):
+        self.label = "Unverifiable"
+        self.explanation = "Unable to determine accuracy."
+        self.confidence = 0.5
+        self.bias: Optional[str] = None
+        self.source_indices: List[int] = []
+
+    def to_response(self, sources: List[Source]) -> FactCheckResponse:
+        """Build the API response once, without re-validating known-good fields."""
+        return FactCheckResponse.model_construct(
+            label=self.label,
+            explanation=self.explanation,
+            sources=sources,
+            confidence=self.confidence,
+            bias=self.bias,
+            claim_hash=None
+        )
@@ -0,0 +1,24 @@
+"""Models for asynchronous jobs."""
+from typing import Any, List, Optional
+from pydantic import BaseModel, Field
+
+
+class BatchFactCheckRequest(BaseModel):
+    """Request model for a batch fact-check job."""
+    texts: List[str] = Field(min_length=1)
+
+
+class JobResponse(BaseModel):
+    """State of an asynchronous job (result is set once it is done)."""
+    id: str
+    kind: str  # "check-media" or "fact-check-batch"
+    status: str  # queued, running, done, failed
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    expires_at: float
+    attempts: int = 0
+    progress: Optional[float] = None  # Share of a running batch finished
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    deduplicated: bool = False  # An identical earlier submission was returned
@@ -0,0 +1,341 @@
+"""
+Production profiling for the admin surface (/api/admin, see routers/admin.py).
+
+Three tools, all stdlib and safe to leave installed:
+    SamplingProfiler   time-boxed stack sampling of every thread in this
+                       worker, returned as collapsed stacks (flamegraph.pl,
+                       speedscope, inferno)
+    ProfilingMiddleware  cProfile of a single request sent with
+                       `X-Profile: 1` and the admin token
+    LoopLagMonitor     heartbeat on the event loop plus a watchdog thread
+                       that captures the loop's stack while it is stalled
+
+Everything is gated on ADMIN_TOKEN; without it the middleware passes
+requests straight through and the admin routes answer 404.
+"""
+import cProfile
+import hmac
+import io
+import marshal
+import os
+import pstats
+import secrets
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, OrderedDict, deque
+from typing import Dict, List, Optional
+from app.config import settings
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """Whether a token matches ADMIN_TOKEN (always False when none is configured)."""
+    if not settings.ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode())
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+# Frame labels by code object (labels are built once per function)
+_labels: Dict[object, str] = {}
+
+
+def _short_path(filename: str) -> str:
+    """Path relative to the longest sys.path entry containing it."""
+    best = ""
+    for entry in sys.path:
+        if entry and filename.startswith(entry) and len(entry) > len(best):
+            best = entry
+    return filename[len(best):].lstrip(os.sep) if best else filename
+
+
+def _label(code) -> str:
+    label = _labels.get(code)
+    if label is None:
+        label = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+        _labels[code] = label
+    return label
+
+
+def collapse_stack(thread_name: str, frame) -> str:
+    """One line of collapsed-stack output: thread;outermost;...;innermost."""
+    labels = []
+    while frame is not None:
+        labels.append(_label(frame.f_code))
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ";".join(reversed(labels))
+
+
+class ProfilerBusyError(Exception):
+    """Raised when a sampling profile is already running in this worker."""
+
+
+class SamplingProfiler:
+    """
+    Wall-clock stack sampler.
+
+    Every interval it snapshots the stack of each thread, so blocked time
+    (socket waits in the executor threads, the loop idling in select)
+    shows up alongside CPU time. One profile runs at a time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def sample(self, seconds: float, interval: float, only_thread: Optional[int] = None) -> str:
+        """
+        Sample for `seconds` (blocking; run it in a worker thread).
+
+        Args:
+            seconds: Profile duration
+            interval: Seconds between samples
+            only_thread: Thread ident to sample (None = every thread)
+
+        Returns:
+            Collapsed stacks, "frame;frame;... count" per line, heaviest first
+
+        Raises:
+            ProfilerBusyError: Another profile is running
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running in this worker")
+        try:
+            me = threading.get_ident()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            counts: Counter = Counter()
+            end = time.monotonic() + seconds
+            while time.monotonic() < end:
+                for ident, frame in sys._current_frames().items():
+                    if ident == me or (only_thread is not None and ident != only_thread):
+                        continue
+                    name = names.get(ident)
+                    if name is None:
+                        names = {thread.ident: thread.name for thread in threading.enumerate()}
+                        name = names.get(ident, f"thread-{ident}")
+                    counts[collapse_stack(name, frame)] += 1
+                time.sleep(interval)
+            return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+        finally:
+            self._lock.release()
+
+
+class RequestProfile:
+    """
+    cProfile data of one request.
+
+    Only the event loop thread is profiled, and a suspended coroutine
+    accrues no time, so the profile holds the request's work on the loop
+    (routing, validation, parsing, serialization, and anything blocking
+    the loop). The rest of the wall time was spent awaiting: queueing,
+    quota waits and upstream calls in the executor threads.
+    """
+
+    def __init__(self, profile_id: str, method: str, path: str, duration: float, profile: cProfile.Profile):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.duration = duration
+        self.profile = profile
+        self.loop_time = pstats.Stats(profile).total_tt
+        self.recorded_at = time.time()
+
+    def text(self, sort: str = "cumulative", limit: int = 60) -> str:
+        """pstats report, heaviest functions first."""
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    def dump(self) -> bytes:
+        """Binary pstats dump (what cProfile -o writes; opens in snakeviz)."""
+        return marshal.dumps(pstats.Stats(self.profile).stats)
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "duration_ms": round(self.duration * 1000, 1),
+            "on_loop_ms": round(self.loop_time * 1000, 1),
+            "awaiting_ms": round(max(0.0, self.duration - self.loop_time) * 1000, 1),
+            "recorded_at": self.recorded_at,
+        }
+
+
+class RequestProfiles:
+    """The most recent per-request profiles, by id."""
+
+    def __init__(self, keep: int):
+        self.keep = keep
+        self._profiles: "OrderedDict[str, RequestProfile]" = OrderedDict()
+        self.active = False  # cProfile can only hook one profile per thread
+
+    def add(self, entry: RequestProfile):
+        self._profiles[entry.id] = entry
+        while len(self._profiles) > self.keep:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> List[dict]:
+        return [entry.summary() for entry in reversed(self._profiles.values())]
+
+
+class ProfilingMiddleware:
+    """
+    Profile one HTTP request with cProfile.
+
+    Opt in with `X-Profile: 1` plus `X-Admin-Token`; the response gets an
+    `X-Profile-Id` header naming the dump at /api/admin/profiles/{id}.
+    The profiler hooks the event loop thread, so the dump also contains
+    whatever other requests ran on the loop meanwhile (profile on a quiet
+    worker for a clean picture). While one request is being profiled
+    others are served unprofiled with `X-Profile: busy`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.ADMIN_TOKEN:
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        if headers.get(b"x-profile", b"").lower() not in (b"1", b"true"):
+            return await self.app(scope, receive, send)
+        if not is_admin(headers.get(b"x-admin-token", b"").decode("latin-1")):
+            return await self.app(scope, receive, send)
+
+        if request_profiles.active:
+            return await self.app(scope, receive, self._with_header(send, b"x-profile", b"busy"))
+
+        profile_id = secrets.token_hex(8)
+        profile = cProfile.Profile()
+        request_profiles.active = True
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, self._with_header(send, b"x-profile-id", profile_id.encode()))
+        finally:
+            profile.disable()
+            request_profiles.active = False
+            request_profiles.add(RequestProfile(
+                profile_id, scope["method"], scope["path"], time.perf_counter() - start, profile
+            ))
+
+    @staticmethod
+    def _with_header(send, name: bytes, value: bytes):
+        async def wrapped(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(name, value)]
+            await send(message)
+        return wrapped
+
+
+class LoopLagMonitor:
+    """
+    Event-loop stall detector.
+
+    A heartbeat callback reschedules itself every LOOP_MONITOR_INTERVAL
+    and records how late it ran. A watchdog thread notices a heartbeat
+    that is more than LOOP_STALL_THRESHOLD overdue and captures the loop
+    thread's stack while the stall is still going on; the stall (its
+    length and that stack) is recorded when the loop comes back.
+    """
+
+    def __init__(self, interval: float, threshold: float, keep: int):
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls: deque = deque(maxlen=keep)
+        self.stall_count = 0
+        self.max_lag = 0.0
+        self._lags: deque = deque(maxlen=1000)
+        self._lock = threading.Lock()
+        self._open_stall: Optional[dict] = None
+        self._loop = None
+        self._loop_thread: Optional[int] = None
+        self._due = 0.0
+        self._handle = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self, loop):
+        """Start monitoring a running loop (call from the loop's thread)."""
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self._due = time.monotonic()
+        self._stopped.clear()
+        self._handle = loop.call_soon(self._heartbeat)
+        self._thread = threading.Thread(target=self._watch, name="truthlens-loop-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._handle is not None:
+            self._handle.cancel()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def _heartbeat(self):
+        now = time.monotonic()
+        lag = max(0.0, now - self._due)
+        self._lags.append(lag)
+        with self._lock:
+            stall, self._open_stall = self._open_stall, None
+        if lag >= self.threshold:
+            stall = stall or {"at": time.time() - lag, "stack": []}
+            stall["lag_ms"] = round(lag * 1000, 1)
+            self.stalls.append(stall)
+            self.stall_count += 1
+            self.max_lag = max(self.max_lag, lag)
+            where = stall["stack"][-1] if stall["stack"] else "unknown (stall ended before capture)"
+            print(f"🐢 Event loop stalled {lag * 1000:.0f} ms in {where}")
+        self._due = now + self.interval
+        self._handle = self._loop.call_later(self.interval, self._heartbeat)
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval / 2):
+            overdue = time.monotonic() - self._due
+            if overdue < self.threshold:
+                continue
+            with self._lock:
+                if self._open_stall is not None:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is None:
+                    continue
+                stack = [
+                    f"{_short_path(entry.filename)}:{entry.lineno} in {entry.name}"
+                    for entry in traceback.extract_stack(frame, limit=settings.LOOP_STALL_STACK_DEPTH)
+                ]
+                self._open_stall = {"at": time.time() - overdue, "stack": stack}
+
+    def snapshot(self) -> dict:
+        lags = list(self._lags)
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "lag_p50_ms": round(_percentile(lags, 0.50) * 1000, 1),
+            "lag_p99_ms": round(_percentile(lags, 0.99) * 1000, 1),
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "stalls": self.stall_count,
+            "recent_stalls": list(reversed(self.stalls)),
+        }
+
+
+# Global profiling state of this worker
+sampling_profiler = SamplingProfiler()
+request_profiles = RequestProfiles(settings.PROFILE_KEEP_REQUESTS)
+loop_monitor = LoopLagMonitor(
+    settings.LOOP_MONITOR_INTERVAL,
+    settings.LOOP_STALL_THRESHOLD,
+    settings.LOOP_STALLS_KEPT
+)
@@ -1,8 +1,16 @@
 """API route handlers."""
+from app.routers.admin import router as admin_router
 from app.routers.fact_check import router as fact_check_router
+from app.routers.jobs import router as jobs_router
 from app.routers.media import router as media_router
+from app.routers.metrics import router as metrics_router
+from app.routers.ws import router as ws_router
 
 __all__ = [
+    "admin_router",
     "fact_check_router",
-    "media_router"
+    "jobs_router",
+    "media_router",
+    "metrics_router",
+    "ws_router"
 ]
@@ -0,0 +1,126 @@
+"""
+Admin-only profiling routes.
+
+Every route needs the `X-Admin-Token` header to match ADMIN_TOKEN; with no
+token configured the whole surface answers 404.
+"""
+import asyncio
+import os
+import threading
+import time
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+from app.config import settings
+from app.container import container
+from app.profiling import (
+    ProfilerBusyError,
+    is_admin,
+    loop_monitor,
+    request_profiles,
+    sampling_profiler
+)
+
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Reject requests without the admin token (hide the routes if none is set)."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=401, detail="Admin token required")
+
+
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/profile")
+async def profile(
+    seconds: float = Query(10.0, gt=0),
+    interval_ms: float = Query(settings.PROFILE_SAMPLE_INTERVAL * 1000, ge=1),
+    thread: str = Query("all", pattern="^(all|loop)$")
+):
+    """
+    Sample the stacks of this worker for a few seconds.
+
+    Sampling runs on a separate thread, so the worker keeps serving (and
+    the profile shows it doing so). Load the result into flamegraph.pl,
+    speedscope or inferno.
+
+    Args:
+        seconds: Profile duration (at most PROFILE_MAX_SECONDS)
+        interval_ms: Milliseconds between samples
+        thread: "loop" for the event loop thread only, "all" for every
+            thread (executor threads show upstream waits)
+
+    Returns:
+        Collapsed stacks as text/plain, one "frame;frame;... count" per line
+    """
+    seconds = min(seconds, settings.PROFILE_MAX_SECONDS)
+    only_thread = threading.get_ident() if thread == "loop" else None
+    loop = asyncio.get_running_loop()
+    try:
+        collapsed = await loop.run_in_executor(
+            container.executor("profiler"),
+            sampling_profiler.sample, seconds, interval_ms / 1000.0, only_thread
+        )
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    filename = f"truthlens-{os.getpid()}-{int(time.time())}.collapsed"
+    return PlainTextResponse(
+        collapsed,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+@router.get("/profiles")
+async def profiles():
+    """
+    List the per-request cProfile dumps kept in memory.
+
+    Send any HTTP request with `X-Profile: 1` (plus the admin token) to
+    profile it; its response carries the `X-Profile-Id` listed here.
+    """
+    return {"profiles": request_profiles.list()}
+
+
+@router.get("/profiles/{profile_id}")
+async def request_profile(
+    profile_id: str,
+    format: str = Query("text", pattern="^(text|pstats)$"),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|ncalls)$"),
+    limit: int = Query(60, ge=1, le=1000)
+):
+    """
+    Serve one per-request profile.
+
+    Args:
+        profile_id: The request's X-Profile-Id
+        format: "text" for a pstats report, "pstats" for the binary dump
+            (snakeviz, `python -m pstats`)
+        sort: Report order
+        limit: Functions in the report
+    """
+    entry = request_profiles.get(profile_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "pstats":
+        return Response(
+            content=entry.dump(),
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f"attachment; filename=request-{profile_id}.prof"}
+        )
+    return PlainTextResponse(entry.text(sort, limit))
+
+
+@router.get("/loop-lag")
+async def loop_lag():
+    """
+    Report event-loop lag.
+
+    Returns:
+        Heartbeat lateness percentiles, the stall count and the most recent
+        stalls, each with its length and the loop thread's stack captured
+        while it was blocked (innermost frame last)
+    """
+    return loop_monitor.snapshot()
@@ -1,96 +1,294 @@
 """Fact-checking API routes."""
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import Response
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+import asyncio
+import re
 import time
-from app.models import FactCheckRequest, FactCheckResponse, TTSRequest
-from app.services import FactCheckService, SearchService, TTSService
+from typing import Awaitable, Optional, TypeVar
+from app.config import settings
+from app.models import ClusterVerifyRequest, FactCheckRequest, FactCheckResponse, TTSRequest
+from app.services import (
+    FORWARDED_HEADER,
+    TTSService,
+    VerificationService,
+    QuotaExceededError,
+    SchedulerRejectedError,
+    cluster,
+    parse_deadline,
+    parse_priority,
+    trending_tracker,
+    verdict_cache
+)
 
 router = APIRouter(prefix="/api", tags=["fact-check"])
 
+T = TypeVar("T")
+
+# Status sent (to nobody) when the client hung up before the response was ready
+CLIENT_CLOSED_REQUEST = 499
+
+
+async def _until_disconnected(http_request: Request, work: Awaitable[T]) -> Optional[T]:
+    """
+    Await work, cancelling it if the client disconnects first.
+    
+    The request body has already been read, so the next ASGI message is
+    http.disconnect, which arrives as soon as the client goes away.
+    
+    Returns:
+        The work's result, or None if the client disconnected
+    """
+    task = asyncio.ensure_future(work)
+    
+    async def disconnected():
+        while (await http_request.receive())["type"] != "http.disconnect":
+            pass
+    
+    watcher = asyncio.ensure_future(disconnected())
+    try:
+        await asyncio.wait([task, watcher], return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    finally:
+        watcher.cancel()
+    
+    if task.done():
+        return task.result()
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    return None
+
 
 @router.post("/fact-check", response_model=FactCheckResponse)
-async def fact_check(request: FactCheckRequest):
+async def fact_check(
+    request: FactCheckRequest,
+    http_request: Request,
+    response: Response,
+    x_priority: Optional[str] = Header(None),
+    x_deadline: Optional[str] = Header(None)
+):
     """
     Main fact-checking endpoint.
     
+    Verdicts are served from the cache when fresh; otherwise the pipeline
+    is admitted through the priority scheduler. The priority class
+    comes from the request's `priority` field or the `X-Priority` header
+    (interactive, background/prefetch, batch); `X-Deadline` is an optional
+    absolute client deadline in Unix epoch milliseconds, capped by the
+    server default for the priority class (REQUEST_DEADLINES); a deadline
+    that cannot be met is answered with 504.
+    
+    If the client disconnects first, the pipeline is cancelled (unless
+    another request shares it); whatever it had already paid for is kept
+    for the next request for the same post.
+    
+    The response carries `claim_hash` and a `Location` header pointing at
+    the cacheable GET /api/verdicts/{claim_hash} resource.
+    
     Process:
     1. Extract core claim using Gemini AI
     2. Search for sources using Brave Search with extracted claim
     3. Synthesize fact-check result using Gemini AI
     """
+    priority = parse_priority(request.priority or x_priority)
+    deadline = parse_deadline(x_deadline)
+    
     try:
-        tweet_text = request.text.strip()
-        
-        if not tweet_text:
-            return FactCheckResponse(
-                label="Unverifiable",
-                explanation="No text content to fact-check.",
-                sources=[],
-                confidence=0.0
-            )
-        
-        # Step 1: Extract the core claim using Gemini
-        print(f"📝 Original text: {tweet_text[:100]}...")
-        extracted_claim = await FactCheckService.extract_claim(tweet_text)
+        trending_tracker.record(request.text)
+        result = await _until_disconnected(
+            http_request,
+            VerificationService.verify(request.text, priority, deadline)
+        )
+        if result is None:
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
         
-        # Step 2: Search for relevant sources using extracted claim
-        print(f"🔍 Searching for: {extracted_claim[:100]}...")
-        search_start = time.time()
-        search_results = await SearchService.search_claim(extracted_claim)
-        search_time = time.time() - search_start
-        print(f"⏱️  Brave search took: {search_time:.2f}s")
+        if result.claim_hash:
+            response.headers["Location"] = f"/api/verdicts/{result.claim_hash}"
+            entry = verdict_cache.peek(result.claim_hash)
+            if entry is not None and entry.response is result:
+                response.headers["ETag"] = entry.etag
+        return result
         
-        if not search_results:
-            return FactCheckResponse(
-                label="Unverifiable",
-                explanation="No reliable sources found to verify this claim.",
-                sources=[],
-                confidence=0.0
+    except SchedulerRejectedError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except QuotaExceededError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(int(e.retry_after) + 1)}
+        )
+    except Exception as e:
+        print(f"Error in fact_check: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.post("/cluster/verify", response_model=FactCheckResponse, include_in_schema=False)
+async def cluster_verify(
+    request: ClusterVerifyRequest,
+    http_request: Request,
+    x_priority: Optional[str] = Header(None),
+    x_deadline: Optional[str] = Header(None),
+    x_cluster_secret: Optional[str] = Header(None)
+):
+    """
+    Fact-check a post forwarded by another replica (cluster mode).
+    
+    The claim is answered here even if this replica's view of the ring
+    differs (e.g. it has just marked a peer unreachable), so a request is
+    forwarded at most once. A disconnect from the forwarding replica
+    cancels the run like any other client going away.
+    """
+    if not cluster.enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not cluster.authorized(x_cluster_secret):
+        raise HTTPException(status_code=401, detail="Cluster secret required")
+    
+    cluster.served_for_peers += 1
+    try:
+        if request.use_cache:
+            trending_tracker.record(request.text)  # Pre-verification runs where the verdict is cached
+        result = await _until_disconnected(
+            http_request,
+            VerificationService.verify(
+                request.text,
+                parse_priority(x_priority),
+                parse_deadline(x_deadline),
+                use_cache=request.use_cache,
+                route=False
             )
-        
-        # Step 3: Synthesize the fact-check using AI with original text
-        synthesis_start = time.time()
-        result = await FactCheckService.synthesize_fact_check(
-            extracted_claim, tweet_text, search_results
         )
-        synthesis_time = time.time() - synthesis_start
-        print(f"⏱️  Gemini synthesis took: {synthesis_time:.2f}s")
-        
+        if result is None:
+            return Response(status_code=CLIENT_CLOSED_REQUEST)
         return result
         
+    except SchedulerRejectedError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except QuotaExceededError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(int(e.retry_after) + 1)}
+        )
     except Exception as e:
-        print(f"Error in fact_check: {str(e)}")
+        print(f"Error in cluster_verify: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against a strong ETag."""
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == etag:
+            return True
+    return False
+
+
+@router.get("/verdicts/{claim_hash}", response_model=FactCheckResponse)
+async def get_verdict(
+    claim_hash: str,
+    http_request: Request,
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Serve a stored verdict by the content hash of its normalized claim text.
+    
+    Responses carry a strong ETag and Cache-Control with max-age set to the
+    verdict's remaining lifetime, so browsers and CDNs can cache them and
+    revalidate with If-None-Match (answered with 304). A verdict past its
+    TTL is still served during the stale-while-revalidate window while it
+    is recomputed in the background. In cluster mode a verdict owned by
+    another replica is fetched from it.
+    
+    Args:
+        claim_hash: Hash returned by POST /api/fact-check
+        
+    Returns:
+        The stored FactCheckResponse, or 304 Not Modified
+    """
+    if not re.fullmatch(r"[0-9a-f]{64}", claim_hash):
+        raise HTTPException(status_code=404, detail="Verdict not found or expired")
+    entry = verdict_cache.peek(claim_hash)
+    now = time.time()
+    if entry is None or now >= entry.expires_at + settings.VERDICT_STALE_WHILE_REVALIDATE:
+        if cluster.enabled and FORWARDED_HEADER not in http_request.headers:
+            owner = cluster.owner(claim_hash)
+            if owner != cluster.self_url:
+                forwarded = await cluster.forward_get(
+                    owner,
+                    f"/api/verdicts/{claim_hash}",
+                    {"If-None-Match": if_none_match} if if_none_match else {}
+                )
+                if forwarded is not None and forwarded.status_code in (200, 304, 404):
+                    return Response(
+                        content=forwarded.content,
+                        status_code=forwarded.status_code,
+                        media_type=forwarded.headers.get("content-type"),
+                        headers={
+                            name: forwarded.headers[name]
+                            for name in ("ETag", "Cache-Control") if name in forwarded.headers
+                        }
+                    )
+        raise HTTPException(status_code=404, detail="Verdict not found or expired")
+    
+    max_age = max(0, int(entry.expires_at - now))
+    if max_age == 0:
+        VerificationService.schedule_refresh(entry.text)
+    
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": (
+            f"public, max-age={max_age}, "
+            f"stale-while-revalidate={settings.VERDICT_STALE_WHILE_REVALIDATE}"
+        )
+    }
+    if if_none_match and _etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
 @router.post("/text-to-speech")
 async def text_to_speech(request: TTSRequest):
     """
     Generate text-to-speech audio for a fact check result.
     
     This endpoint takes a claim and its fact check result, formats it into
-    a speech-friendly narrative, and returns MP3 audio data.
+    a speech-friendly narrative, and streams the audio as it is
+    synthesized: MP3 from ElevenLabs, or WAV from the local engine when
+    it takes over (see TTS_BACKEND_POLICY and the X-TTS-Backend header).
     """
     try:
         print(f"🔊 TTS request for claim: {request.claim[:50]}...")
         
-        # Generate the audio
-        audio_data = await TTSService.generate_fact_check_speech(
+        # Start the audio (waits only for the first chunk)
+        stream = await TTSService.stream_fact_check_speech(
             request.claim,
             request.result
         )
         
-        print(f"✓ Generated {len(audio_data)} bytes of audio")
-        
-        # Return the audio as MP3
-        return Response(
-            content=audio_data,
-            media_type="audio/mpeg",
+        return StreamingResponse(
+            stream,
+            media_type=stream.media_type,
             headers={
-                "Content-Disposition": "inline; filename=fact-check.mp3"
-            }
+                "Content-Disposition": f"inline; filename=fact-check.{stream.extension}",
+                "X-TTS-Backend": stream.backend.name
+            },
+            # Runs even if the client left before the body was iterated
+            background=BackgroundTask(stream.close)
         )
         
+    except QuotaExceededError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(int(e.retry_after) + 1)}
+        )
     except Exception as e:
         print(f"Error in text_to_speech: {str(e)}")
         raise HTTPException(status_code=500, detail=f"TTS error: {str(e)}")
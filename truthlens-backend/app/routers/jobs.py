@@ -0,0 +1,79 @@
+"""Asynchronous job routes (long-running media checks and batch fact-checks)."""
+from fastapi import APIRouter, HTTPException, Query, Response
+from app.config import settings
+from app.models import BatchFactCheckRequest, JobResponse, MediaCheckRequest
+from app.services import SchedulerRejectedError, job_queue
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+async def _submit(kind: str, payload: dict, response: Response) -> JobResponse:
+    """Queue a job and point the client at it (202, Location)."""
+    try:
+        job = await job_queue.submit(kind, payload)
+    except SchedulerRejectedError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": "5"})
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    response.status_code = 202
+    response.headers["Location"] = f"/api/jobs/{job.id}"
+    return job
+
+
+@router.post("/check-media", response_model=JobResponse, status_code=202)
+async def submit_media_check(request: MediaCheckRequest, response: Response):
+    """
+    Queue an AI media check.
+
+    Answers at once with the job (202 and a Location header); poll it with
+    GET /api/jobs/{id} or subscribe on /ws. The same media submitted while
+    an earlier job for it is queued, running or holds its result returns
+    that job (`deduplicated`).
+
+    Args:
+        request: MediaCheckRequest with media_url and media_type
+
+    Returns:
+        JobResponse (status "queued", or the earlier job's state)
+    """
+    return await _submit("check-media", request.model_dump(), response)
+
+
+@router.post("/fact-check-batch", response_model=JobResponse, status_code=202)
+async def submit_fact_check_batch(request: BatchFactCheckRequest, response: Response):
+    """
+    Queue fact-checks of many posts at batch priority.
+
+    The result is {"results": [...]} in submission order: a
+    FactCheckResponse per post, or {"error", "status"} for a post that
+    could not be checked. `progress` reports the share finished while
+    the job runs.
+
+    Args:
+        request: Up to JOBS_MAX_BATCH post texts
+
+    Returns:
+        JobResponse (status "queued", or the earlier job's state)
+    """
+    if len(request.texts) > settings.JOBS_MAX_BATCH:
+        raise HTTPException(status_code=422, detail=f"At most {settings.JOBS_MAX_BATCH} texts per job")
+    return await _submit("fact-check-batch", request.model_dump(), response)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, wait: float = Query(0.0, ge=0)):
+    """
+    Report a job's state, with its result once done.
+
+    Args:
+        job_id: Id returned on submission
+        wait: Seconds to hold the request open until the job finishes
+            (long-poll; at most JOBS_MAX_WAIT)
+
+    Returns:
+        JobResponse; 404 once the job has expired (JOBS_TTL)
+    """
+    job = await job_queue.get(job_id, min(wait, settings.JOBS_MAX_WAIT))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
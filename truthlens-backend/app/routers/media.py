@@ -1,7 +1,7 @@
 """AI media detection API routes."""
 from fastapi import APIRouter, HTTPException
 from app.models import MediaCheckRequest, MediaCheckResponse
-from app.services import MediaCheckService
+from app.services import MediaCheckError, MediaCheckService, QuotaExceededError
 
 router = APIRouter(prefix="/api", tags=["media"])
 
@@ -11,6 +11,9 @@ async def check_media(request: MediaCheckRequest):
     """
     Check if an image or video is AI-generated using Hive API.
     
+    Holds the request open until the check finishes; POST
+    /api/jobs/check-media queues it instead and answers at once.
+    
     Args:
         request: MediaCheckRequest with media_url and media_type
         
@@ -24,8 +27,14 @@ async def check_media(request: MediaCheckRequest):
         )
         return result
         
-    except ValueError as e:
-        raise HTTPException(status_code=503, detail=str(e))
+    except QuotaExceededError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(int(e.retry_after) + 1)}
+        )
+    except MediaCheckError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         print(f"Error in check_media: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Media check error: {str(e)}")
@@ -0,0 +1,179 @@
+"""
+Operational metrics routes.
+
+Like /api/admin, every route needs the `X-Admin-Token` header to match
+ADMIN_TOKEN; with no token configured the whole surface answers 404.
+"""
+from fastapi import APIRouter, Depends
+from app.config import settings
+from app.routers.admin import require_admin
+from app.services import (
+    brave_keys,
+    checkworthiness_gate,
+    cluster,
+    elevenlabs_backend,
+    evidence_index,
+    gemini_keys,
+    job_queue,
+    local_backend,
+    model_tiers,
+    page_cache,
+    partial_results,
+    pipeline_savings,
+    phrase_cache,
+    preverification_worker,
+    quota_manager,
+    request_scheduler,
+    verdict_cache
+)
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/quota")
+async def quota():
+    """
+    Report remaining client-side quota per upstream and API key.
+    
+    Returns:
+        Token bucket state (available tokens, waiters, grants, rejections)
+        keyed by upstream name and key id (masked key + digest)
+    """
+    return quota_manager.snapshot()
+
+
+@router.get("/keys")
+async def keys():
+    """
+    Report per-key health and usage for the pooled upstreams.
+    
+    Returns:
+        Selection strategy and per-key counters (in-flight, requests,
+        errors, 429s, cooldown) keyed by upstream and masked API key
+    """
+    return {
+        "gemini": gemini_keys.snapshot(),
+        "brave": brave_keys.snapshot()
+    }
+
+
+@router.get("/scheduler")
+async def scheduler():
+    """
+    Report request scheduler state.
+    
+    Returns:
+        In-flight count plus per-priority queue depth, admissions,
+        deadline drops, load shedding and queue wait percentiles
+    """
+    return request_scheduler.snapshot()
+
+
+@router.get("/deadlines")
+async def deadlines():
+    """
+    Report work saved by deadlines and client disconnects.
+    
+    Returns:
+        Runs cancelled (every client gone) or stopped at their deadline,
+        pipeline stages and upstream calls that never ran, stages answered
+        from a partial result, results of abandoned calls that were still
+        cached, and the partial-result cache
+    """
+    return {
+        "default_deadlines": settings.REQUEST_DEADLINES,
+        "savings": pipeline_savings.snapshot(),
+        "partial_results": partial_results.snapshot()
+    }
+
+
+@router.get("/models")
+async def models():
+    """
+    Report Gemini usage per pipeline stage and model tier.
+    
+    Returns:
+        Calls, failures, latency percentiles, tokens and list-price cost
+        per stage and model, plus the synthesis cascade: verdicts finished
+        on each tier, escalations by reason, how often the stronger model
+        changed the label, and escalations skipped for lack of time
+    """
+    return model_tiers.snapshot()
+
+
+@router.get("/cluster")
+async def cluster_state():
+    """
+    Report cluster mode from this replica's point of view.
+    
+    Returns:
+        The ring's replicas, requests for claims owned here, requests
+        answered for other replicas and answered here because the owner
+        was unreachable, per-peer reachability, forwards and latency, plus
+        this replica's verdict cache (sum hits over replicas for the
+        cluster-wide hit rate)
+    """
+    return {**cluster.snapshot(), "verdict_cache": verdict_cache.snapshot()}
+
+
+@router.get("/cache")
+async def cache():
+    """
+    Report verdict cache, evidence page cache, TTS phrase cache and
+    pre-verification state.
+    
+    Returns:
+        Cache sizes and hit rates, page fetch/revalidation counters, local
+        evidence index usage, TTS characters synthesized vs served from
+        cached clips, plus worker counters and the current trending claims
+        with time left before their verdict expires
+    """
+    return {
+        "verdict_cache": verdict_cache.snapshot(),
+        "evidence_pages": page_cache.snapshot(),
+        "evidence_index": evidence_index.snapshot(),
+        "tts_phrases": phrase_cache.snapshot(),
+        "preverification": preverification_worker.snapshot()
+    }
+
+
+@router.get("/jobs")
+async def jobs():
+    """
+    Report the asynchronous job queue.
+    
+    Returns:
+        Jobs waiting and running, stored jobs by status, submissions
+        (new, deduplicated, rejected as queue full), outcomes and retries,
+        plus queue wait and run time percentiles
+    """
+    return await job_queue.snapshot()
+
+
+@router.get("/checkworthiness")
+async def checkworthiness():
+    """
+    Report the check-worthiness gate.
+    
+    Returns:
+        Posts scored, posts short-circuited as having no checkable claim,
+        and the skip threshold in use
+    """
+    return checkworthiness_gate.snapshot()
+
+
+@router.get("/tts")
+async def tts():
+    """
+    Report text-to-speech backends.
+    
+    Returns:
+        Backend selection policy plus per-backend availability, in-flight
+        narrations, narrations served and failures (fallbacks)
+    """
+    return {
+        "policy": settings.TTS_BACKEND_POLICY,
+        "backends": {
+            backend.name: backend.snapshot() for backend in (elevenlabs_backend, local_backend)
+        }
+    }
@@ -0,0 +1,202 @@
+"""
+Multiplexed WebSocket channel for the extension.
+
+One connection carries many concurrent fact-check, media-check and TTS
+requests. Client messages are JSON objects with a client-chosen `id`:
+
+    {"id": "7", "type": "fact-check", "text": "...", "priority": "interactive", "deadline": 1767225600000}
+    {"id": "8", "type": "check-media", "media_url": "...", "media_type": "image"}
+    {"id": "9", "type": "text-to-speech", "claim": "...", "result": {...}}
+    {"id": "10", "type": "job", "job_id": "..."}
+    {"id": "7", "type": "cancel"}
+
+`deadline` is optional, in Unix epoch milliseconds like the X-Deadline header.
+A `job` request subscribes to an asynchronous job (see /api/jobs): its
+result is the job once it is done or failed.
+
+The server answers each request with zero or more partial results, then
+exactly one final message:
+
+    {"id": "7", "type": "progress", "stage": "claim", "data": {"claim": "..."}}
+    {"id": "7", "type": "result", "data": {...}}
+    {"id": "7", "type": "error", "status": 429, "detail": "...", "retry_after": 3}
+    {"id": "7", "type": "cancelled"}
+
+TTS audio streams as it is synthesized: each chunk is an
+{"id": "9", "type": "audio", "media_type": "audio/mpeg"} message immediately
+followed by one binary frame (the pair is never split by other requests'
+messages), and {"id": "9", "type": "audio-end", "bytes": n} ends the stream.
+"""
+import asyncio
+from typing import Dict, Optional
+import orjson
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from app.config import settings
+from app.models import FactCheckRequest, MediaCheckRequest, TTSRequest
+from app.services import (
+    MediaCheckError,
+    MediaCheckService,
+    QuotaExceededError,
+    SchedulerRejectedError,
+    TTSService,
+    VerificationService,
+    job_queue,
+    parse_deadline,
+    parse_priority,
+    progress_listener,
+    trending_tracker
+)
+
+router = APIRouter(tags=["websocket"])
+
+
+class _Connection:
+    """Per-socket state: in-flight request tasks and the bounded send queue."""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.tasks: Dict[str, asyncio.Task] = {}
+        # Frames waiting to be written; a slow reader fills it and stalls producers
+        self.outbox: asyncio.Queue = asyncio.Queue(maxsize=settings.WS_SEND_QUEUE)
+
+    async def send(self, message: dict, binary: Optional[bytes] = None):
+        """Queue a final message (waits while the client is not reading)."""
+        await self.outbox.put((orjson.dumps(message), binary))
+
+    def send_progress(self, request_id: str, stage: str, data: dict):
+        """Queue a partial result, dropping it if the client is falling behind."""
+        try:
+            self.outbox.put_nowait((orjson.dumps({"id": request_id, "type": "progress", "stage": stage, "data": data}), None))
+        except asyncio.QueueFull:
+            pass
+
+    async def writer(self):
+        """Drain the send queue onto the socket."""
+        while True:
+            text, binary = await self.outbox.get()
+            await self.websocket.send_text(text.decode())
+            if binary is not None:
+                await self.websocket.send_bytes(binary)
+
+
+async def _run_request(conn: _Connection, request_id: str, kind: str, message: dict):
+    """Execute one request and send its final message."""
+    try:
+        if kind == "fact-check":
+            request = FactCheckRequest.model_validate(message)
+            progress_listener.set(lambda stage, data: conn.send_progress(request_id, stage, data))
+            trending_tracker.record(request.text)
+            deadline = message.get("deadline")
+            result = await VerificationService.verify(
+                request.text,
+                parse_priority(request.priority),
+                parse_deadline(str(deadline)) if deadline else None
+            )
+            await conn.send({"id": request_id, "type": "result", "data": result.model_dump()})
+
+        elif kind == "check-media":
+            request = MediaCheckRequest.model_validate(message)
+            result = await MediaCheckService.check_media(request.media_url, request.media_type)
+            await conn.send({"id": request_id, "type": "result", "data": result.model_dump()})
+
+        elif kind == "text-to-speech":
+            request = TTSRequest.model_validate(message)
+            stream = await TTSService.stream_fact_check_speech(request.claim, request.result)
+            header = {"id": request_id, "type": "audio", "media_type": stream.media_type}
+            total = 0
+            async for chunk in stream:
+                total += len(chunk)
+                await conn.send(header, binary=chunk)
+            await conn.send({"id": request_id, "type": "audio-end", "bytes": total})
+
+        elif kind == "job":
+            job = await job_queue.get(str(message.get("job_id", "")))
+            while job is not None and job.status not in ("done", "failed"):
+                job = await job_queue.get(job.id, settings.JOBS_MAX_WAIT)
+            if job is None:
+                await conn.send({"id": request_id, "type": "error", "status": 404, "detail": "Job not found or expired"})
+            else:
+                await conn.send({"id": request_id, "type": "result", "data": job.model_dump()})
+
+    except asyncio.CancelledError:
+        if conn.tasks.get(request_id) is asyncio.current_task():
+            # Cancelled by the client (not by disconnect): confirm it
+            await conn.send({"id": request_id, "type": "cancelled"})
+        raise
+    except ValidationError as e:
+        await conn.send({"id": request_id, "type": "error", "status": 422, "detail": str(e)})
+    except QuotaExceededError as e:
+        await conn.send({
+            "id": request_id, "type": "error", "status": 429,
+            "detail": str(e), "retry_after": int(e.retry_after) + 1
+        })
+    except (SchedulerRejectedError, MediaCheckError) as e:
+        await conn.send({"id": request_id, "type": "error", "status": e.status_code, "detail": str(e)})
+    except ValueError as e:
+        await conn.send({"id": request_id, "type": "error", "status": 503, "detail": str(e)})
+    except Exception as e:
+        print(f"Error in ws {kind} request: {str(e)}")
+        await conn.send({"id": request_id, "type": "error", "status": 500, "detail": f"Internal server error: {str(e)}"})
+    finally:
+        if conn.tasks.get(request_id) is asyncio.current_task():
+            del conn.tasks[request_id]
+
+
+@router.websocket("/ws")
+async def websocket_channel(websocket: WebSocket):
+    """
+    Multiplexed request channel (protocol in the module docstring).
+
+    Each request runs as its own task, so many can be in flight at once;
+    `cancel` (or closing the socket) cancels the task, which releases its
+    scheduler slot and stops upstream work nobody will see. At most
+    WS_MAX_IN_FLIGHT requests run per connection; more are refused with
+    a 429 error rather than queued.
+    """
+    await websocket.accept()
+    conn = _Connection(websocket)
+    writer = asyncio.create_task(conn.writer())
+
+    try:
+        while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                break
+            try:
+                message = orjson.loads(frame.get("text") or frame.get("bytes") or b"")
+            except orjson.JSONDecodeError:
+                await conn.send({"type": "error", "status": 400, "detail": "Messages must be JSON objects"})
+                continue
+
+            if not isinstance(message, dict) or not message.get("id") or not message.get("type"):
+                await conn.send({"type": "error", "status": 400, "detail": "Messages need an id and a type"})
+                continue
+            request_id, kind = str(message["id"]), message["type"]
+
+            if kind == "cancel":
+                task = conn.tasks.get(request_id)
+                if task is not None:
+                    task.cancel()
+            elif kind not in ("fact-check", "check-media", "text-to-speech", "job"):
+                await conn.send({"id": request_id, "type": "error", "status": 400, "detail": f"Unknown type: {kind}"})
+            elif request_id in conn.tasks:
+                await conn.send({"id": request_id, "type": "error", "status": 409, "detail": "Request id already in flight"})
+            elif len(conn.tasks) >= settings.WS_MAX_IN_FLIGHT:
+                await conn.send({
+                    "id": request_id, "type": "error", "status": 429,
+                    "detail": f"Too many in-flight requests (max {settings.WS_MAX_IN_FLIGHT})", "retry_after": 1
+                })
+            else:
+                conn.tasks[request_id] = asyncio.create_task(_run_request(conn, request_id, kind, message))
+
+    except WebSocketDisconnect:
+        pass
+    finally:
+        # Nobody is listening any more: stop all work for this client
+        tasks = list(conn.tasks.values())
+        conn.tasks.clear()
+        for task in tasks:
+            task.cancel()
+        writer.cancel()
+        await asyncio.gather(*tasks, writer, return_exceptions=True)
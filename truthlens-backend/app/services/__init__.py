@@ -1,12 +1,63 @@
 """Business logic services."""
+from app.services.checkworthiness import checkworthiness_gate
+from app.services.cluster import FORWARDED_HEADER, cluster
+from app.services.deadline import DeadlineExceededError, pipeline_savings
+from app.services.evidence_index import evidence_index
+from app.services.evidence_service import EvidenceService, page_cache
 from app.services.fact_check_service import FactCheckService
-from app.services.media_check_service import MediaCheckService
+from app.services.media_check_service import MediaCheckError, MediaCheckService
+from app.services.model_tiers import model_tiers
 from app.services.search_service import SearchService
-from app.services.tts_service import TTSService
+from app.services.quota_service import Priority, QuotaExceededError, quota_manager
+from app.services.key_pool import brave_keys, gemini_keys
+from app.services.scheduler import (
+    SchedulerRejectedError,
+    parse_deadline,
+    parse_priority,
+    request_scheduler
+)
+from app.services.verdict_cache import claim_hash, partial_results, verdict_cache
+from app.services.verification_service import VerificationService, progress_listener
+from app.services.jobs import JOB_HANDLERS, JobQueueFullError, job_queue
+from app.services.trending_service import preverification_worker, trending_tracker
+from app.services.tts_backends import local_backend
+from app.services.tts_service import TTSService, elevenlabs_backend, phrase_cache
 
 __all__ = [
+    "checkworthiness_gate",
+    "FORWARDED_HEADER",
+    "cluster",
+    "DeadlineExceededError",
+    "pipeline_savings",
+    "evidence_index",
+    "EvidenceService",
+    "page_cache",
     "FactCheckService",
+    "MediaCheckError",
     "MediaCheckService",
+    "model_tiers",
     "SearchService",
-    "TTSService"
+    "TTSService",
+    "phrase_cache",
+    "elevenlabs_backend",
+    "local_backend",
+    "Priority",
+    "QuotaExceededError",
+    "quota_manager",
+    "brave_keys",
+    "gemini_keys",
+    "SchedulerRejectedError",
+    "parse_deadline",
+    "parse_priority",
+    "request_scheduler",
+    "claim_hash",
+    "verdict_cache",
+    "partial_results",
+    "VerificationService",
+    "progress_listener",
+    "JOB_HANDLERS",
+    "JobQueueFullError",
+    "job_queue",
+    "preverification_worker",
+    "trending_tracker"
 ]
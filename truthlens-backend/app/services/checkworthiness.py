@@ -0,0 +1,185 @@
+"""
+Check-worthiness gate: a CPU-only classifier that spots posts with no
+checkable factual claim (jokes, opinions, questions, reactions) before any
+upstream call is made.
+
+The model is logistic regression over hashed word n-grams plus a handful
+of rule features, stored as sparse weights in checkworthiness_model.json
+(trained and calibrated by scripts/checkworthiness_eval.py). Scoring a
+post takes a few tens of microseconds.
+"""
+import json
+import math
+import random
+import re
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.config import settings
+
+MODEL_PATH = Path(__file__).with_name("checkworthiness_model.json")
+HASH_BITS = 18
+
+_URL_RE = re.compile(r"https?://\S+")
+_MENTION_RE = re.compile(r"@\w+")
+_TOKEN_RE = re.compile(r"[a-z][a-z']*|\d[\d,.]*%?|[$€£%?!]")
+_CAPITALIZED_RE = re.compile(r"(?<![.!?]\s)(?<!^)\b[A-Z][a-zA-Z]+")
+
+QUESTION_WORDS = {"who", "what", "why", "how", "which", "anyone", "does", "is", "can", "should", "would"}
+OPINION_MARKERS = ("i think", "i feel", "imo", "in my opinion", "my opinion", "hot take", "unpopular opinion",
+                   "i love", "i hate", "i miss", "i can't", "i'm so", "i'd rather", "honestly")
+LAUGHTER = {"lol", "lmao", "lmfao", "haha", "hahaha", "rofl", "omg", "ugh", "wow"}
+REPORTING_WORDS = {"said", "says", "announced", "confirmed", "confirms", "reported", "according", "study",
+                   "officials", "scientists", "researchers", "percent", "million", "billion", "trillion", "record"}
+
+
+def _features(text: str) -> List[str]:
+    """Named features of a post: word uni/bigrams plus rule indicators."""
+    stripped = _MENTION_RE.sub(" ", _URL_RE.sub(" ", text))
+    lowered = stripped.lower()
+    tokens = _TOKEN_RE.findall(lowered.replace("#", " "))
+    words = [token for token in tokens if token[0].isalpha()]
+
+    features = ["bias"]
+    features.extend("w:" + token for token in tokens)
+    features.extend(f"b:{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+    if any(token[0].isdigit() for token in tokens):
+        features.append("r:number")
+    if any(token in ("$", "€", "£", "%") or token.endswith("%") for token in tokens):
+        features.append("r:quantity")
+    if lowered.rstrip().endswith("?"):
+        features.append("r:question")
+    if words and words[0] in QUESTION_WORDS:
+        features.append("r:question_start")
+    if any(marker in lowered for marker in OPINION_MARKERS):
+        features.append("r:opinion")
+    if LAUGHTER.intersection(words):
+        features.append("r:laughter")
+    if REPORTING_WORDS.intersection(words):
+        features.append("r:reporting")
+    # No feature for short posts: "X is dead" is as checkable as a long one
+    if len(words) > 12:
+        features.append("r:long")
+    if len(_CAPITALIZED_RE.findall(stripped)) >= 2:
+        features.append("r:entities")
+    if words and words[0] in ("i", "i'm", "me", "my", "we"):
+        features.append("r:first_person")
+    return features
+
+
+def _hash(feature: str) -> int:
+    return zlib.crc32(feature.encode("utf-8")) & ((1 << HASH_BITS) - 1)
+
+
+def vectorize(text: str) -> List[int]:
+    """Hashed feature buckets of a post (repeats count more than once)."""
+    return [_hash(feature) for feature in _features(text)]
+
+
+class CheckWorthinessModel:
+    """Sparse logistic regression over hashed features."""
+
+    def __init__(self, weights: Optional[Dict[int, float]] = None, threshold: float = 0.85):
+        self.weights = weights or {}
+        self.threshold = threshold  # Minimum P(not checkable) to short-circuit
+
+    def probability(self, text: str) -> float:
+        """P(the post contains a checkable factual claim)."""
+        # Nothing but links, mentions, emoji or punctuation
+        if not re.search(r"[A-Za-z0-9]", _MENTION_RE.sub(" ", _URL_RE.sub(" ", text))):
+            return 0.0
+        weights = self.weights
+        z = sum(weights.get(bucket, 0.0) for bucket in vectorize(text))
+        return 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z))))
+
+    @classmethod
+    def train(
+        cls,
+        examples: Iterable[Tuple[str, bool]],
+        epochs: int = 40,
+        learning_rate: float = 0.2,
+        l2: float = 1e-4,
+        seed: int = 13
+    ) -> "CheckWorthinessModel":
+        """Fit weights by SGD on (text, checkable) pairs."""
+        data = [(vectorize(text), 1.0 if checkable else 0.0) for text, checkable in examples]
+        rng = random.Random(seed)
+        weights: Dict[int, float] = {}
+        for epoch in range(epochs):
+            rng.shuffle(data)
+            rate = learning_rate / (1.0 + epoch * 0.1)
+            for buckets, label in data:
+                z = sum(weights.get(bucket, 0.0) for bucket in buckets)
+                error = 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z)))) - label
+                for bucket in buckets:
+                    weight = weights.get(bucket, 0.0)
+                    weights[bucket] = weight - rate * (error + l2 * weight)
+        return cls({bucket: weight for bucket, weight in weights.items() if abs(weight) > 1e-6})
+
+    def save(self, path: Path = MODEL_PATH):
+        with open(path, "w") as f:
+            json.dump({
+                "hash_bits": HASH_BITS,
+                "threshold": self.threshold,
+                "weights": {str(bucket): round(weight, 5) for bucket, weight in sorted(self.weights.items())},
+            }, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: Path = MODEL_PATH) -> "CheckWorthinessModel":
+        with open(path) as f:
+            data = json.load(f)
+        if data["hash_bits"] != HASH_BITS:
+            raise ValueError(f"{path} was trained with {data['hash_bits']} hash bits, expected {HASH_BITS}")
+        weights = {int(bucket): weight for bucket, weight in data["weights"].items()}
+        return cls(weights, data["threshold"])
+
+
+class CheckWorthinessGate:
+    """Lazily loaded model plus counters for the /api/metrics endpoints."""
+
+    def __init__(self, path: Path = MODEL_PATH):
+        self.path = path
+        self._model: Optional[CheckWorthinessModel] = None
+        self.checked = 0
+        self.skipped = 0
+
+    @property
+    def model(self) -> CheckWorthinessModel:
+        if self._model is None:
+            self._model = CheckWorthinessModel.load(self.path)
+        return self._model
+
+    @property
+    def threshold(self) -> float:
+        """CHECKWORTHY_THRESHOLD if set, else the model's calibrated threshold."""
+        return settings.CHECKWORTHY_THRESHOLD or self.model.threshold
+
+    def should_skip(self, text: str) -> Tuple[bool, float]:
+        """
+        Decide whether a post can be answered without the pipeline.
+
+        Args:
+            text: The original tweet/post text
+
+        Returns:
+            (skip, P(checkable))
+        """
+        probability = self.model.probability(text)
+        skip = 1.0 - probability >= self.threshold
+        self.checked += 1
+        if skip:
+            self.skipped += 1
+        return skip, probability
+
+    def snapshot(self) -> dict:
+        return {
+            "checked": self.checked,
+            "skipped": self.skipped,
+            "skip_rate": round(self.skipped / self.checked, 3) if self.checked else 0.0,
+            "threshold": self.threshold if self._model else None,
+        }
+
+
+# Global gate
+checkworthiness_gate = CheckWorthinessGate()
@@ -0,0 +1,227 @@
+"""
+Cluster mode: replicas partition verdicts by claim.
+
+Every replica lists the same CLUSTER_PEERS and places them on a
+consistent-hash ring. The claim hash (of the normalized post text) picks
+the replica that owns the claim, and VerificationService.verify forwards
+the request there over pooled keep-alive HTTP. Each claim is therefore
+cached, and its concurrent requests coalesced, on exactly one replica,
+whichever replica the load balancer sent the client to.
+
+A replica that cannot be reached is routed around for CLUSTER_PEER_COOLDOWN
+seconds; the ring hands its claims to the next replica, and every other
+claim keeps its owner.
+"""
+import bisect
+import hashlib
+import hmac
+import time
+from collections import deque
+from typing import Dict, List, Optional
+import httpx
+from app.config import settings
+from app.container import container
+from app.models import FactCheckResponse
+from app.services.quota_service import Priority, QuotaExceededError
+from app.services.scheduler import SchedulerRejectedError
+
+# Header marking replica-to-replica requests (never routed again)
+FORWARDED_HEADER = "X-Cluster-Forwarded"
+SECRET_HEADER = "X-Cluster-Secret"
+
+
+def _percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _ring_point(value: str) -> int:
+    return int(hashlib.sha256(value.encode()).hexdigest()[:16], 16)
+
+
+class PeerUnavailableError(Exception):
+    """Raised when the owning replica cannot be reached (the caller answers locally)."""
+
+
+class HashRing:
+    """Consistent-hash ring of replica URLs with CLUSTER_VNODES points each."""
+
+    def __init__(self, nodes: List[str], vnodes: int):
+        self.nodes = list(nodes)
+        points = sorted(
+            (_ring_point(f"{node}#{i}"), node)
+            for node in self.nodes for i in range(vnodes)
+        )
+        self._points = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def owners(self, key: str):
+        """Replicas in ring order from the key's position (each listed once)."""
+        if not self._points:
+            return
+        start = bisect.bisect(self._points, int(key[:16], 16)) % len(self._points)
+        seen = set()
+        for i in range(len(self._points)):
+            node = self._owners[(start + i) % len(self._points)]
+            if node not in seen:
+                seen.add(node)
+                yield node
+                if len(seen) == len(self.nodes):
+                    return
+
+
+class PeerState:
+    """Reachability and traffic of one other replica."""
+
+    def __init__(self):
+        self.forwarded = 0
+        self.failures = 0
+        self.down_until = 0.0
+        self.latencies: deque = deque(maxlen=500)
+
+    def snapshot(self, now: float) -> dict:
+        latencies = list(self.latencies)
+        return {
+            "reachable": now >= self.down_until,
+            "cooldown_remaining": round(max(0.0, self.down_until - now), 2),
+            "forwarded": self.forwarded,
+            "failures": self.failures,
+            "latency_p50": round(_percentile(latencies, 0.50), 3),
+            "latency_p95": round(_percentile(latencies, 0.95), 3),
+        }
+
+
+class ClusterRouter:
+    """Claim ownership and request forwarding for this replica."""
+
+    def __init__(self, peers: List[str], self_url: Optional[str], vnodes: int):
+        self.self_url = self_url
+        self.enabled = len(peers) > 1 and self_url in peers
+        self.ring = HashRing(peers, vnodes)
+        self._peers: Dict[str, PeerState] = {peer: PeerState() for peer in peers if peer != self_url}
+        self.owned = 0  # Requests for claims this replica owns
+        self.served_for_peers = 0  # Forwarded requests answered here
+        self.fallbacks = 0  # Requests answered here because the owner was unreachable
+
+    def owner(self, key: str) -> str:
+        """The first reachable replica on the ring for a claim hash."""
+        now = time.time()
+        for node in self.ring.owners(key):
+            if node == self.self_url or now >= self._peers[node].down_until:
+                return node
+        return self.self_url
+
+    def authorized(self, secret: Optional[str]) -> bool:
+        """Whether a replica-to-replica request carries CLUSTER_SECRET (never, if none is set)."""
+        if not settings.CLUSTER_SECRET:
+            return False
+        return bool(secret) and hmac.compare_digest(secret.encode(), settings.CLUSTER_SECRET.encode())
+
+    async def forward_verify(
+        self,
+        peer: str,
+        text: str,
+        priority: Priority,
+        deadline: float,
+        use_cache: bool
+    ) -> FactCheckResponse:
+        """
+        Have the owning replica fact-check a post.
+
+        Cancelling the call closes the connection, which cancels the run on
+        the owner like any client disconnect.
+
+        Raises:
+            PeerUnavailableError: The owner could not be reached or failed
+            SchedulerRejectedError: The owner shed the request (503) or could
+                not meet the deadline (504)
+            QuotaExceededError: The owner ran out of upstream quota (429)
+        """
+        state = self._peers[peer]
+        headers = {
+            FORWARDED_HEADER: "1",
+            "X-Priority": priority.name.lower(),
+            "X-Deadline": str(int(deadline * 1000)),
+        }
+        if settings.CLUSTER_SECRET:
+            headers[SECRET_HEADER] = settings.CLUSTER_SECRET
+        start = time.time()
+        try:
+            response = await container.cluster_client().post(
+                f"{peer}/api/cluster/verify",
+                json={"text": text, "use_cache": use_cache},
+                headers=headers,
+                timeout=httpx.Timeout(max(0.1, deadline - start) + 1.0, connect=settings.CLUSTER_CONNECT_TIMEOUT)
+            )
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            self._mark_down(peer, state)
+            raise PeerUnavailableError(f"Replica {peer} unreachable: {type(e).__name__}")
+        except httpx.TimeoutException:
+            state.failures += 1
+            raise SchedulerRejectedError(f"Replica {peer} did not answer before the deadline", 504)
+        except httpx.HTTPError as e:
+            state.failures += 1
+            raise PeerUnavailableError(f"Replica {peer} failed: {type(e).__name__}")
+
+        if response.status_code in (503, 504):
+            try:
+                detail = response.json()["detail"]
+            except (ValueError, KeyError):
+                detail = f"Rejected by replica {peer}"
+            raise SchedulerRejectedError(detail, response.status_code)
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.headers.get("Retry-After", "1"))
+            except ValueError:
+                retry_after = 1.0
+            raise QuotaExceededError(f"replica {peer}", retry_after)
+        if response.status_code != 200:
+            state.failures += 1
+            raise PeerUnavailableError(f"Replica {peer} answered {response.status_code}")
+        state.forwarded += 1
+        state.latencies.append(time.time() - start)
+        return FactCheckResponse.model_validate_json(response.content)
+
+    async def forward_get(self, peer: str, path: str, headers: Dict[str, str]) -> Optional[httpx.Response]:
+        """Proxy a read to the owning replica (None if it cannot be reached)."""
+        state = self._peers[peer]
+        headers = {**headers, FORWARDED_HEADER: "1"}
+        try:
+            response = await container.cluster_client().get(
+                f"{peer}{path}",
+                headers=headers,
+                timeout=httpx.Timeout(settings.SEARCH_TIMEOUT, connect=settings.CLUSTER_CONNECT_TIMEOUT)
+            )
+        except (httpx.ConnectError, httpx.ConnectTimeout):
+            self._mark_down(peer, state)
+            return None
+        except httpx.HTTPError:
+            state.failures += 1
+            return None
+        state.forwarded += 1
+        return response
+
+    @staticmethod
+    def _mark_down(peer: str, state: PeerState):
+        state.failures += 1
+        if time.time() >= state.down_until:
+            print(f"⚠️  Replica {peer} unreachable; routing around it for {settings.CLUSTER_PEER_COOLDOWN:.0f}s")
+        state.down_until = time.time() + settings.CLUSTER_PEER_COOLDOWN
+
+    def snapshot(self) -> dict:
+        now = time.time()
+        return {
+            "enabled": self.enabled,
+            "self": self.self_url,
+            "replicas": self.ring.nodes,
+            "owned": self.owned,
+            "served_for_peers": self.served_for_peers,
+            "fallbacks": self.fallbacks,
+            "peers": {peer: state.snapshot(now) for peer, state in self._peers.items()},
+        }
+
+
+# Global cluster router of this replica
+cluster = ClusterRouter(settings.CLUSTER_PEERS, settings.CLUSTER_SELF, settings.CLUSTER_VNODES)
@@ -0,0 +1,212 @@
+"""
+Request deadlines and cancellation for the fact-check pipeline.
+
+Every pipeline run carries a RequestBudget: an absolute deadline (the
+client's X-Deadline, capped by the server default for its priority class)
+and whether the run has been abandoned. Stages read it through the
+current_budget ContextVar to size their time box, and the upstream
+wrappers call ensure_live() before starting a call, so abandoned work
+never issues a new one.
+
+A call that is already on the wire has been paid for (quota and, for the
+executor-bound Gemini and Brave clients, a thread that cannot be
+interrupted), so run_stage lets it land and hands the result to a `keep`
+callback instead of throwing it away.
+"""
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Coroutine, Dict, Optional, TypeVar
+from app.config import settings
+from app.services.quota_service import Priority
+from app.services.scheduler import SchedulerRejectedError
+
+T = TypeVar("T")
+
+# Pipeline stages in order (each reserves STAGE_MIN_SECONDS for the ones after it)
+STAGES = ("extract", "search", "evidence", "synthesize")
+
+# Upstream called by each stage, for counting calls avoided
+_STAGE_UPSTREAM = {"extract": "gemini", "search": "brave", "synthesize": "gemini"}
+
+
+class DeadlineExceededError(SchedulerRejectedError):
+    """Raised when too little time is left before the deadline to run a stage."""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        super().__init__(f"Deadline leaves too little time for {stage}", 504)
+
+
+def effective_deadline(client_deadline: Optional[float], priority: Priority) -> float:
+    """The client's deadline, capped by the server default for the priority class."""
+    default = time.time() + settings.REQUEST_DEADLINES[priority.name.lower()]
+    return min(client_deadline, default) if client_deadline else default
+
+
+class RequestBudget:
+    """Deadline and cancellation state of one pipeline run."""
+
+    __slots__ = ("deadline", "stage", "abandoned", "degraded")
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self.stage = "queued"  # Last stage started
+        self.abandoned = False
+        self.degraded = False  # A stage fell back after an upstream failure
+
+    def extend(self, deadline: float):
+        """Push the deadline out for a later request sharing this run."""
+        self.deadline = max(self.deadline, deadline)
+
+    def stage_budget(self, stage: str) -> float:
+        """Seconds the stage may take while leaving each later stage its minimum."""
+        later = STAGES[STAGES.index(stage) + 1:]
+        return self.deadline - time.time() - sum(settings.STAGE_MIN_SECONDS[s] for s in later)
+
+    def require(self, stage: str) -> float:
+        """
+        Time box for a stage that cannot be skipped.
+
+        Raises:
+            DeadlineExceededError: Less than the stage's minimum is left
+        """
+        budget = self.stage_budget(stage)
+        if budget < settings.STAGE_MIN_SECONDS[stage]:
+            raise DeadlineExceededError(stage)
+        return budget
+
+
+# Budget of the pipeline run the current task belongs to (None outside the pipeline)
+current_budget: ContextVar[Optional[RequestBudget]] = ContextVar("current_budget", default=None)
+
+
+def mark_degraded(stage: str):
+    """
+    Record that a stage fell back instead of doing its job (e.g. the claim
+    is the raw post because Gemini failed), so the run's verdict and
+    partial results are not cached. No-op outside the pipeline.
+    """
+    budget = current_budget.get()
+    if budget is not None and not budget.degraded:
+        budget.degraded = True
+        print(f"⚠️  {stage} degraded; this run's results will not be cached")
+
+
+def time_left() -> Optional[float]:
+    """Seconds before the current run's deadline (None outside the pipeline)."""
+    budget = current_budget.get()
+    return budget.deadline - time.time() if budget is not None else None
+
+
+def ensure_live():
+    """
+    Check, before starting an upstream call, that its result is still wanted.
+
+    Raises:
+        asyncio.CancelledError: The run was abandoned (client gone or deadline hit)
+    """
+    budget = current_budget.get()
+    if budget is not None and budget.abandoned:
+        raise asyncio.CancelledError()
+
+
+async def run_stage(
+    stage: str,
+    work: Coroutine[Any, Any, T],
+    keep: Optional[Callable[[T], Optional[bool]]] = None
+) -> T:
+    """
+    Run a pipeline stage within the current budget.
+
+    If the stage times out or its caller is cancelled, the run is marked
+    abandoned. With `keep`, the stage is then left to finish (it starts no
+    new upstream call) and keep() stores its result, returning False if it
+    was not worth storing; without it the stage is cancelled outright.
+
+    Raises:
+        DeadlineExceededError: Not enough time to start, or the time box ran out
+        asyncio.CancelledError: The caller was cancelled
+    """
+    budget = current_budget.get()
+    if budget is None:
+        return await work
+    try:
+        timeout = budget.require(stage)
+    except DeadlineExceededError:
+        work.close()
+        raise
+    budget.stage = stage
+
+    task = asyncio.ensure_future(work)
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), timeout)
+    except (asyncio.CancelledError, asyncio.TimeoutError) as e:
+        budget.abandoned = True
+        if keep is None:
+            task.cancel()
+        else:
+            task.add_done_callback(lambda done: _keep_late_result(stage, done, keep))
+        if isinstance(e, asyncio.TimeoutError):
+            raise DeadlineExceededError(stage) from None
+        raise
+
+
+def _keep_late_result(stage: str, task: asyncio.Task, keep: Callable):
+    if task.cancelled() or task.exception() is not None:
+        return
+    try:
+        if keep(task.result()) is not False:
+            pipeline_savings.late_results_kept[stage] += 1
+    except Exception as e:
+        print(f"Error keeping late {stage} result: {str(e)}")
+
+
+class PipelineSavings:
+    """Counters of pipeline work not done because nobody would see it."""
+
+    def __init__(self):
+        self.cancelled = 0  # Runs abandoned because every client went away
+        self.deadline_exceeded = 0  # Runs stopped because the deadline could not be met
+        self.stages_skipped: Dict[str, int] = {stage: 0 for stage in STAGES}
+        self.stages_resumed: Dict[str, int] = {stage: 0 for stage in STAGES}
+        self.calls_avoided: Dict[str, int] = {"gemini": 0, "brave": 0}
+        self.late_results_kept: Dict[str, int] = {stage: 0 for stage in STAGES}
+
+    def record_abandoned(self, reached: str, deadline: bool):
+        """Count a run stopped while in stage `reached` ("queued" = before any stage)."""
+        if deadline:
+            self.deadline_exceeded += 1
+        else:
+            self.cancelled += 1
+        start = 0 if reached == "queued" else STAGES.index(reached) + 1
+        for stage in STAGES[start:]:
+            self._skip(stage, self.stages_skipped)
+
+    def record_skipped(self, stage: str):
+        """Count an optional stage left out for lack of time."""
+        self._skip(stage, self.stages_skipped)
+
+    def record_resumed(self, stage: str):
+        """Count a stage answered from a cached partial result."""
+        self._skip(stage, self.stages_resumed)
+
+    def _skip(self, stage: str, counters: Dict[str, int]):
+        counters[stage] += 1
+        upstream = _STAGE_UPSTREAM.get(stage)
+        if upstream is not None:
+            self.calls_avoided[upstream] += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "cancelled": self.cancelled,
+            "deadline_exceeded": self.deadline_exceeded,
+            "stages_skipped": dict(self.stages_skipped),
+            "stages_resumed": dict(self.stages_resumed),
+            "upstream_calls_avoided": dict(self.calls_avoided),
+            "late_results_kept": dict(self.late_results_kept),
+        }
+
+
+# Global work-saved counters
+pipeline_savings = PipelineSavings()
@@ -0,0 +1,283 @@
+"""
+Local full-text evidence index (SQLite FTS5).
+
+Holds ClaimReview-style fact-check records and the sources behind past
+verdicts, so recurring claims can be answered without a live Brave search.
+Records are bulk-imported with scripts/import_evidence.py from JSONL where
+each line is either a flat record
+    {"claim": ..., "url": ..., "title": ..., "rating": ..., "publisher": ..., "date": ..., "content": ...}
+a schema.org ClaimReview
+    {"claimReviewed": ..., "url": ..., "reviewRating": {"alternateName": ...}, "author": {"name": ...}, ...}
+or a Google Fact Check Tools claim
+    {"text": ..., "claimReview": [{"url": ..., "title": ..., "textualRating": ..., "publisher": {"name": ...}}]}
+"""
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+from app.config import settings
+from app.container import container
+from app.models import FactCheckResponse, SearchHit
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS evidence (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    claim TEXT NOT NULL,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    rating TEXT,
+    publisher TEXT,
+    published_date TEXT,
+    origin TEXT NOT NULL,
+    added_at REAL NOT NULL,
+    UNIQUE (url, claim)
+);
+CREATE INDEX IF NOT EXISTS evidence_origin ON evidence (origin, added_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS evidence_fts USING fts5(
+    claim, title, content, content='evidence', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS evidence_ai AFTER INSERT ON evidence BEGIN
+    INSERT INTO evidence_fts(rowid, claim, title, content) VALUES (new.id, new.claim, new.title, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS evidence_ad AFTER DELETE ON evidence BEGIN
+    INSERT INTO evidence_fts(evidence_fts, rowid, claim, title, content)
+    VALUES ('delete', old.id, old.claim, old.title, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS evidence_au AFTER UPDATE ON evidence BEGIN
+    INSERT INTO evidence_fts(evidence_fts, rowid, claim, title, content)
+    VALUES ('delete', old.id, old.claim, old.title, old.content);
+    INSERT INTO evidence_fts(rowid, claim, title, content) VALUES (new.id, new.claim, new.title, new.content);
+END;
+"""
+
+UPSERT = """
+INSERT INTO evidence (url, claim, title, content, rating, publisher, published_date, origin, added_at)
+VALUES (:url, :claim, :title, :content, :rating, :publisher, :published_date, :origin, :added_at)
+ON CONFLICT (url, claim) DO UPDATE SET
+    title = excluded.title, content = excluded.content, rating = excluded.rating,
+    publisher = excluded.publisher, published_date = excluded.published_date, added_at = excluded.added_at
+"""
+
+# Verdict labels whose sources are worth keeping as evidence
+RECORDED_LABELS = ("True", "False", "Misleading")
+
+
+def _words(text: str) -> Set[str]:
+    return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def _record(claim, url, title=None, content=None, rating=None, publisher=None, published_date=None,
+            origin="import") -> Optional[dict]:
+    """Normalize one record, or None if it lacks a claim or URL."""
+    if not claim or not url:
+        return None
+    publisher = publisher or urlparse(url).netloc
+    if not content and rating:
+        content = f'{publisher} rated the claim "{claim}" as {rating}.'
+    return {
+        "url": url,
+        "claim": claim.strip(),
+        "title": (title or claim).strip(),
+        "content": (content or "").strip(),
+        "rating": rating,
+        "publisher": publisher,
+        "published_date": published_date,
+        "origin": origin,
+        "added_at": time.time(),
+    }
+
+
+def parse_records(obj: dict) -> Iterator[dict]:
+    """Yield normalized records from a flat, ClaimReview or Fact Check Tools object."""
+    if "claimReview" in obj:
+        for review in obj.get("claimReview") or []:
+            record = _record(
+                obj.get("text"), review.get("url"), review.get("title"), None,
+                review.get("textualRating"), (review.get("publisher") or {}).get("name"),
+                review.get("reviewDate")
+            )
+            if record:
+                yield record
+    elif "claimReviewed" in obj:
+        record = _record(
+            obj.get("claimReviewed"), obj.get("url"), obj.get("name") or obj.get("headline"),
+            obj.get("reviewBody") or obj.get("description"),
+            (obj.get("reviewRating") or {}).get("alternateName"),
+            (obj.get("author") or {}).get("name"), obj.get("datePublished")
+        )
+        if record:
+            yield record
+    else:
+        record = _record(
+            obj.get("claim"), obj.get("url"), obj.get("title"), obj.get("content") or obj.get("text"),
+            obj.get("rating") or obj.get("label"), obj.get("publisher"),
+            obj.get("date") or obj.get("published_date")
+        )
+        if record:
+            yield record
+
+
+class EvidenceIndex:
+    """
+    SQLite FTS5 index of evidence records.
+
+    Queries run in the "index" thread pool on per-thread connections; the
+    database is in WAL mode, so background writes never block readers.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._pending: List[dict] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._pruned_at = 0.0
+        self.queries = 0
+        self.local_answers = 0
+        self.merged = 0
+        self.records_written = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def write(self, records: Iterable[dict], batch_size: int = 1000) -> int:
+        """Upsert records synchronously (bulk import and the background flusher)."""
+        conn = self._connection()
+        written = 0
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                with conn:
+                    conn.executemany(UPSERT, batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            with conn:
+                conn.executemany(UPSERT, batch)
+            written += len(batch)
+        self.records_written += written
+        return written
+
+    def query(self, terms: Set[str], limit: int) -> List[Tuple[float, SearchHit, str]]:
+        """
+        Best-matching records for a set of query terms (blocking).
+
+        Sources of past verdicts older than EVIDENCE_INDEX_VERDICT_TTL are
+        left out, like Brave leaves out results older than SEARCH_FRESHNESS.
+
+        Returns:
+            (coverage, hit, origin) triples, best first, where coverage is
+            the share of query terms found in the record's claim or title
+            and origin is "import" or "verdict"
+        """
+        if not terms:
+            return []
+        match = " OR ".join(f'"{term}"' for term in sorted(terms))
+        rows = self._connection().execute(
+            """
+            SELECT e.url, e.claim, e.title, e.content, e.publisher, e.published_date, e.origin
+            FROM evidence_fts JOIN evidence e ON e.id = evidence_fts.rowid
+            WHERE evidence_fts MATCH ? AND (e.origin != 'verdict' OR e.added_at > ?)
+            ORDER BY bm25(evidence_fts, 2.0, 1.0, 0.5)
+            LIMIT ?
+            """,
+            (match, time.time() - settings.EVIDENCE_INDEX_VERDICT_TTL, limit * 4)
+        ).fetchall()
+
+        scored, seen_urls = [], set()
+        for url, claim, title, content, publisher, published_date, origin in rows:
+            if url in seen_urls:
+                continue
+            seen_urls.add(url)
+            coverage = len(terms & _words(f"{claim} {title}")) / len(terms)
+            hit = SearchHit(title=title, url=url, content=content, published_date=published_date)
+            scored.append((coverage, hit, origin))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return scored[:limit]
+
+    def prune(self, now: float) -> int:
+        """Delete past-verdict sources older than EVIDENCE_INDEX_VERDICT_TTL (blocking)."""
+        conn = self._connection()
+        with conn:
+            return conn.execute(
+                "DELETE FROM evidence WHERE origin = 'verdict' AND added_at <= ?",
+                (now - settings.EVIDENCE_INDEX_VERDICT_TTL,)
+            ).rowcount
+
+    async def search(self, terms: Set[str], limit: int) -> List[Tuple[float, SearchHit, str]]:
+        """Async wrapper around query(); an unavailable index yields no matches."""
+        self.queries += 1
+        loop = asyncio.get_event_loop()
+        try:
+            return await loop.run_in_executor(container.executor("index"), self.query, terms, limit)
+        except sqlite3.Error as e:
+            print(f"Error querying evidence index: {str(e)}")
+            return []
+
+    def add(self, records: Iterable[dict]):
+        """Queue records for a background write; returns immediately."""
+        self._pending.extend(records)
+        if self._pending and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    def add_verdict(self, claim: str, hits: List[SearchHit], response: FactCheckResponse):
+        """Index the sources a conclusive verdict was based on, under its claim."""
+        if response.label not in RECORDED_LABELS:
+            return
+        cited = {source.url for source in response.sources}
+        self.add(
+            record for record in (
+                _record(claim, hit.url, hit.title, hit.content, published_date=hit.published_date, origin="verdict")
+                for hit in hits if hit.url in cited
+            ) if record
+        )
+
+    async def flush(self):
+        """Write queued records in the index thread pool."""
+        loop = asyncio.get_event_loop()
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                await loop.run_in_executor(container.executor("index"), self.write, batch)
+            except sqlite3.Error as e:
+                print(f"Error updating evidence index: {str(e)}")
+        now = time.time()
+        if now - self._pruned_at >= settings.EVIDENCE_INDEX_PRUNE_INTERVAL:
+            self._pruned_at = now
+            try:
+                await loop.run_in_executor(container.executor("index"), self.prune, now)
+            except sqlite3.Error as e:
+                print(f"Error pruning evidence index: {str(e)}")
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM evidence").fetchone()[0]
+
+    def snapshot(self) -> dict:
+        return {
+            "path": self.path,
+            "queries": self.queries,
+            "local_answers": self.local_answers,
+            "merged": self.merged,
+            "records_written": self.records_written,
+            "pending_writes": len(self._pending),
+        }
+
+
+# Global evidence index
+evidence_index = EvidenceIndex(settings.EVIDENCE_INDEX_PATH)
+
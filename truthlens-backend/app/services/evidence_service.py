@@ -0,0 +1,340 @@
+"""Evidence enrichment: fetch top source pages and extract their article text."""
+import asyncio
+import codecs
+import ipaddress
+import socket
+import time
+from collections import OrderedDict
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+import httpx
+from app.config import settings
+from app.container import container
+from app.models import SearchHit
+
+USER_AGENT = "Mozilla/5.0 (compatible; TruthLensBot/1.0; +https://github.com/truthlens)"
+
+# Ports evidence pages may be fetched from (None: the scheme's default)
+_ALLOWED_PORTS = (None, 80, 443)
+
+
+class UnsafeURLError(ValueError):
+    """Raised for a page URL that does not point at the public web."""
+
+
+async def check_public_url(url: httpx.URL):
+    """
+    Refuse URLs that could reach this host or its private network.
+
+    Source URLs come from search results and the pages' own redirects, so
+    only http(s) on the standard ports is fetched, and only when every
+    address the host resolves to is globally routable.
+
+    Raises:
+        UnsafeURLError: The URL fails any of these checks
+    """
+    if url.scheme not in ("http", "https") or url.port not in _ALLOWED_PORTS or not url.host:
+        raise UnsafeURLError(f"Refusing to fetch {url}")
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            url.host, url.port or (443 if url.scheme == "https" else 80), type=socket.SOCK_STREAM
+        )
+    except socket.gaierror as e:
+        raise UnsafeURLError(f"Cannot resolve {url.host}: {e}")
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if address.version == 6 and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+        if not address.is_global:
+            raise UnsafeURLError(f"Refusing to fetch {url.host}: resolves to non-public {address}")
+
+
+class ArticleTextExtractor(HTMLParser):
+    """
+    Incremental HTML-to-text extractor for news articles.
+
+    Fed chunk by chunk as the page streams in. Keeps paragraph-like blocks
+    of real prose, drops scripts and page chrome (nav, header, footer...),
+    and prefers text inside <article>/<main> when the page has enough of it.
+    """
+
+    SKIP_TAGS = {
+        "script", "style", "noscript", "template", "svg", "iframe",
+        "nav", "header", "footer", "aside", "form", "button", "select"
+    }
+    BLOCK_TAGS = {
+        "p", "div", "section", "article", "main", "li", "blockquote", "pre",
+        "h1", "h2", "h3", "h4", "h5", "h6", "td", "br", "tr", "figcaption"
+    }
+    MIN_BLOCK_CHARS = 40  # Shorter blocks are menus, bylines, buttons...
+    ARTICLE_MIN_CHARS = 200  # Less article text than this and the rest of the page is used too
+
+    def __init__(self, max_chars: int):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self._skip_depth = 0
+        self._article_depth = 0
+        self._block: List[str] = []
+        self._article: List[str] = []
+        self._article_chars = 0
+        self._article_closed = False
+        self._other: List[str] = []
+        self._other_chars = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self._flush()
+            if tag in ("article", "main"):
+                self._article_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in self.BLOCK_TAGS:
+            self._flush()
+            if tag in ("article", "main"):
+                self._article_depth = max(0, self._article_depth - 1)
+                if not self._article_depth and self._article_chars >= self.ARTICLE_MIN_CHARS:
+                    self._article_closed = True
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            words = data.split()
+            if words:
+                self._block.append(" ".join(words))
+
+    def _flush(self):
+        if not self._block:
+            return
+        block = " ".join(self._block)
+        self._block = []
+        if len(block) < self.MIN_BLOCK_CHARS:
+            return
+        if self._article_depth:
+            self._article.append(block)
+            self._article_chars += len(block)
+        elif self._other_chars < self.max_chars:
+            self._other.append(block)
+            self._other_chars += len(block)
+
+    @property
+    def done(self) -> bool:
+        """True once the article is complete (or long enough) to stop reading."""
+        return self._article_closed or self._article_chars >= self.max_chars
+
+    def text(self) -> str:
+        """The extracted text, capped at max_chars."""
+        self._flush()
+        blocks = self._article if self._article_chars >= self.ARTICLE_MIN_CHARS else self._article + self._other
+        return "\n".join(blocks)[:self.max_chars]
+
+
+class PageEntry:
+    """Extracted text of one page plus the validators needed to revalidate it."""
+    __slots__ = ("text", "etag", "last_modified", "fetched_at", "expires_at")
+
+    def __init__(self, text: str, etag: Optional[str], last_modified: Optional[str], ttl: float):
+        self.text = text
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = time.time()
+        self.expires_at = self.fetched_at + ttl
+
+
+class PageCache:
+    """LRU cache of extracted page text keyed by URL."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, PageEntry]" = OrderedDict()
+        self.hits = 0
+        self.fetches = 0
+        self.revalidations = 0
+        self.not_modified = 0
+        self.failures = 0
+        self.truncated = 0
+        self.bytes_read = 0
+
+    def get(self, url: str) -> Optional[PageEntry]:
+        """Return a fresh entry (marking it recently used), or None."""
+        entry = self._entries.get(url)
+        if entry is None or entry.expires_at <= time.time():
+            return None
+        self._entries.move_to_end(url)
+        self.hits += 1
+        return entry
+
+    def peek(self, url: str) -> Optional[PageEntry]:
+        """Return an entry, expired or not, without touching LRU order or stats."""
+        return self._entries.get(url)
+
+    def put(self, url: str, entry: PageEntry) -> PageEntry:
+        """Store an entry, evicting the least recently used one if full."""
+        self._entries[url] = entry
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def snapshot(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "fetches": self.fetches,
+            "revalidations": self.revalidations,
+            "not_modified": self.not_modified,
+            "failures": self.failures,
+            "truncated": self.truncated,
+            "bytes_read": self.bytes_read,
+        }
+
+
+# Global page cache
+page_cache = PageCache(settings.EVIDENCE_CACHE_MAX_ENTRIES)
+
+# In-flight fetches by URL, so concurrent claims citing one page share a download
+_in_flight: Dict[str, asyncio.Task] = {}
+
+# Created on first use (needs a running event loop on Python < 3.10)
+_fetch_slots: Optional[asyncio.Semaphore] = None
+
+
+class EvidenceService:
+    """Service that enriches search hits with the text of their source pages."""
+
+    @staticmethod
+    async def enrich(hits: List[SearchHit], time_budget: Optional[float] = None) -> int:
+        """
+        Attach extracted article text to the top-ranked hits.
+
+        Pages are fetched concurrently (bounded globally), but the caller
+        waits at most EVIDENCE_TIME_BUDGET seconds; fetches still running
+        then finish in the background and land in the cache for the next
+        claim that cites them. Hits without page text keep their snippet.
+
+        Args:
+            hits: Search hits, best first (modified in place)
+            time_budget: Seconds to wait, if less than EVIDENCE_TIME_BUDGET
+
+        Returns:
+            Number of hits that received page text
+        """
+        if not settings.EVIDENCE_ENABLED:
+            return 0
+
+        pending: Dict[str, List[SearchHit]] = {}
+        for hit in hits[:settings.EVIDENCE_MAX_PAGES]:
+            if hit.page_text is not None or not hit.url.startswith(("http://", "https://")):
+                continue
+            entry = page_cache.get(hit.url)
+            if entry is not None:
+                hit.page_text = entry.text or None
+            else:
+                pending.setdefault(hit.url, []).append(hit)
+
+        if pending:
+            tasks = {url: EvidenceService._fetch_shared(url) for url in pending}
+            timeout = settings.EVIDENCE_TIME_BUDGET
+            if time_budget is not None:
+                timeout = min(timeout, time_budget)
+            await asyncio.wait(list(tasks.values()), timeout=timeout)
+            for url, task in tasks.items():
+                if task.done() and not task.cancelled() and task.exception() is None:
+                    for hit in pending[url]:
+                        hit.page_text = task.result().text or None
+
+        return sum(1 for hit in hits if hit.page_text)
+
+    @staticmethod
+    def _fetch_shared(url: str) -> asyncio.Task:
+        """Start (or join) the fetch of one URL."""
+        task = _in_flight.get(url)
+        if task is None:
+            task = asyncio.create_task(EvidenceService._fetch(url))
+            _in_flight[url] = task
+            task.add_done_callback(lambda _: _in_flight.pop(url, None))
+        return task
+
+    @staticmethod
+    async def _fetch(url: str) -> PageEntry:
+        """Fetch (or revalidate) one page and cache its extracted text."""
+        global _fetch_slots
+        if _fetch_slots is None:
+            _fetch_slots = asyncio.Semaphore(settings.EVIDENCE_MAX_CONCURRENT)
+
+        stale = page_cache.peek(url)
+        headers = {"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"}
+        if stale is not None and (stale.etag or stale.last_modified):
+            if stale.etag:
+                headers["If-None-Match"] = stale.etag
+            if stale.last_modified:
+                headers["If-Modified-Since"] = stale.last_modified
+            page_cache.revalidations += 1
+
+        try:
+            async with _fetch_slots:
+                return await asyncio.wait_for(
+                    EvidenceService._download(url, headers, stale),
+                    timeout=settings.EVIDENCE_PAGE_TIMEOUT
+                )
+        except Exception as e:
+            print(f"Error fetching evidence page {url}: {str(e) or type(e).__name__}")
+            return EvidenceService._failed(url, stale)
+
+    @staticmethod
+    def _failed(url: str, stale: Optional[PageEntry]) -> PageEntry:
+        """Remember a failed fetch for a while (keeping stale text if there was any)."""
+        page_cache.failures += 1
+        text = stale.text if stale is not None else ""
+        return page_cache.put(url, PageEntry(text, None, None, settings.EVIDENCE_FAILURE_TTL))
+
+    @staticmethod
+    async def _download(url: str, headers: dict, stale: Optional[PageEntry]) -> PageEntry:
+        """Fetch the page, following redirects by hand so every hop passes check_public_url."""
+        target = httpx.URL(url)
+        for _ in range(settings.EVIDENCE_MAX_REDIRECTS + 1):
+            await check_public_url(target)
+            async with container.http_client().stream(
+                "GET", target, headers=headers, follow_redirects=False
+            ) as response:
+                if not response.has_redirect_location:
+                    return await EvidenceService._read(url, response, stale)
+                target = response.url.join(response.headers["location"])
+        raise UnsafeURLError(f"More than {settings.EVIDENCE_MAX_REDIRECTS} redirects")
+
+    @staticmethod
+    async def _read(url: str, response: httpx.Response, stale: Optional[PageEntry]) -> PageEntry:
+        """Stream the page through the extractor under the byte budget."""
+        if response.status_code == 304 and stale is not None:
+            page_cache.not_modified += 1
+            entry = PageEntry(stale.text, stale.etag, stale.last_modified, settings.EVIDENCE_CACHE_TTL)
+            return page_cache.put(url, entry)
+
+        content_type = response.headers.get("content-type", "")
+        if response.status_code != 200 or "html" not in content_type:
+            return EvidenceService._failed(url, stale)
+
+        page_cache.fetches += 1
+        decoder = codecs.getincrementaldecoder(response.charset_encoding or "utf-8")(errors="replace")
+        extractor = ArticleTextExtractor(settings.EVIDENCE_MAX_CHARS)
+        received = 0
+        async for chunk in response.aiter_bytes():
+            received += len(chunk)
+            extractor.feed(decoder.decode(chunk))
+            if extractor.done:
+                break
+            if received >= settings.EVIDENCE_MAX_BYTES:
+                page_cache.truncated += 1
+                break
+        page_cache.bytes_read += received
+
+        entry = PageEntry(
+            extractor.text(),
+            response.headers.get("etag"),
+            response.headers.get("last-modified"),
+            settings.EVIDENCE_CACHE_TTL
+        )
+        return page_cache.put(url, entry)
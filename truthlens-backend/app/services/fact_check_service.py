@@ -1,31 +1,67 @@
 """Fact-checking service using Gemini AI."""
-import google.generativeai as genai
 import asyncio
 import time
+import re
 from typing import List
-from concurrent.futures import ThreadPoolExecutor
 from app.config import settings
-from app.models import FactCheckResponse, Source
-
-# Configure Gemini
-genai.configure(api_key=settings.GEMINI_API_KEY)
-model = genai.GenerativeModel(settings.GEMINI_MODEL)
-print(f"✓ Gemini model configured: {settings.GEMINI_MODEL}")
-
-# Thread pool for async operations
-executor = ThreadPoolExecutor(max_workers=settings.MAX_WORKERS)
+from app.container import container
+from app.models import ClaimVerdict, FactCheckResponse, SearchHit, Verdict
+from app.services.deadline import ensure_live, mark_degraded, time_left
+from app.services.key_pool import gemini_keys
+from app.services.model_tiers import escalation_reason, model_tiers
+from app.services.quota_service import Priority
 
 
 class FactCheckService:
     """Service for fact-checking claims using AI."""
     
     @staticmethod
-    async def extract_claim(text: str) -> str:
+    async def _generate(prompt: str, priority: Priority, model_name: str, stage: str):
+        """
+        Run a Gemini completion on the next available pooled API key.
+        
+        A key that returns 429 is put into cooldown and the call is retried
+        once on another key. No call is started once the pipeline run has
+        been abandoned. Calls are accounted per stage and model.
+        """
+        from google.api_core.exceptions import ResourceExhausted
+        
+        loop = asyncio.get_event_loop()
+        rate_limited_keys = set()
+        attempts = min(settings.KEY_POOL_MAX_ATTEMPTS, len(gemini_keys))
+        for attempt in range(attempts):
+            async with gemini_keys.lease(priority, exclude=rate_limited_keys) as api_key:
+                ensure_live()
+                model = container.gemini_model(api_key, model_name)
+                call_start = time.time()
+                try:
+                    response = await loop.run_in_executor(
+                        container.executor("gemini"),
+                        lambda: model.generate_content(
+                            prompt, request_options={"timeout": settings.GEMINI_TIMEOUT}
+                        )
+                    )
+                except ResourceExhausted:
+                    model_tiers.record_failure(stage, model_name)
+                    gemini_keys.report_rate_limited(api_key)
+                    rate_limited_keys.add(api_key)
+                    if attempt == attempts - 1:
+                        raise
+                    continue
+                except Exception:
+                    model_tiers.record_failure(stage, model_name)
+                    raise
+                model_tiers.record_call(stage, model_name, time.time() - call_start, prompt, response)
+                return response
+    
+    @staticmethod
+    async def extract_claim(text: str, priority: Priority = Priority.INTERACTIVE) -> str:
         """
         Extract the core factual claim from a tweet or text using Gemini.
         
         Args:
             text: The original tweet/post text
+            priority: Priority class used for quota admission
             
         Returns:
             Extracted claim as a searchable query
@@ -54,11 +90,9 @@ Return ONLY the extracted claim text, nothing else.
 """
         
         try:
-            loop = asyncio.get_event_loop()
             extract_start = time.time()
-            response = await loop.run_in_executor(
-                executor,
-                lambda: model.generate_content(prompt)
+            response = await FactCheckService._generate(
+                prompt, priority, settings.GEMINI_EXTRACTION_MODEL, "extract"
             )
             extract_time = time.time() - extract_start
             print(f"⏱️  Gemini claim extraction took: {extract_time:.2f}s")
@@ -72,13 +106,81 @@ Return ONLY the extracted claim text, nothing else.
             
         except Exception as e:
             print(f"Error extracting claim: {str(e)}")
+            mark_degraded("extract")
             return text  # Fallback to original text
     
+    @staticmethod
+    async def extract_claims(
+        text: str,
+        priority: Priority = Priority.INTERACTIVE,
+        max_claims: int = None
+    ) -> List[str]:
+        """
+        Decompose a tweet or text into atomic, independently checkable claims.
+        
+        Args:
+            text: The original tweet/post text
+            priority: Priority class used for quota admission
+            max_claims: Upper bound on claims returned (default: MAX_CLAIMS)
+            
+        Returns:
+            Claims as searchable queries, most significant first
+        """
+        max_claims = max_claims or settings.MAX_CLAIMS
+        prompt = f"""
+<context>
+ROLE: Claim Extraction Specialist
+TASK: Split the text below into separate atomic factual claims that can each be fact-checked.
+</context>
+
+<text>
+"{text}"
+</text>
+
+<instructions>
+1. Identify each distinct factual claim (ignore opinions, questions, or commentary)
+2. Make every claim self-contained: resolve pronouns and keep the entities it is about
+3. Phrase each as a clear, searchable query (remove hashtags, mentions, links)
+4. Return at most {max_claims} claims, most significant first
+5. If no factual claim exists, return the original text
+6. Keep each claim concise (under 100 characters if possible)
+</instructions>
+
+<output_format>
+Return ONLY the claims, one claim per line, with no numbering or other text.
+</output_format>
+"""
+        
+        try:
+            extract_start = time.time()
+            response = await FactCheckService._generate(
+                prompt, priority, settings.GEMINI_EXTRACTION_MODEL, "extract"
+            )
+            extract_time = time.time() - extract_start
+            print(f"⏱️  Gemini claim decomposition took: {extract_time:.2f}s")
+            
+            claims = []
+            for line in response.text.strip().split('\n'):
+                # Remove list markers and quotes if Gemini added them
+                claim = re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", line).strip().strip('"').strip("'").strip()
+                if claim and claim not in claims:
+                    claims.append(claim)
+            
+            claims = claims[:max_claims]
+            print(f"📝 Extracted {len(claims)} claim(s): {claims}")
+            return claims if claims else [text]
+            
+        except Exception as e:
+            print(f"Error extracting claims: {str(e)}")
+            mark_degraded("extract")
+            return [text]  # Fallback to original text
+    
     @staticmethod
     async def synthesize_fact_check(
         claim: str,
         original_tweet: str,
-        search_results: List[dict]
+        search_results: List[SearchHit],
+        priority: Priority = Priority.INTERACTIVE
     ) -> FactCheckResponse:
         """
         Analyze search results and generate a fact-check verdict using Gemini.
@@ -87,14 +189,16 @@ Return ONLY the extracted claim text, nothing else.
             claim: The extracted claim to check
             original_tweet: The original tweet text
             search_results: List of search results to analyze
+            priority: Priority class used for quota admission
             
         Returns:
             FactCheckResponse with label, explanation, sources, confidence, bias
         """
         # Format search results for the prompt (use up to 8 for analysis)
         sources_text = "\n\n".join([
-            f"Source {i+1}:\nTitle: {result.get('title', 'N/A')}\nURL: {result.get('url', 'N/A')}\nContent: {result.get('content', 'N/A')[:1000]}"
-            for i, result in enumerate(search_results[:8])
+            f"Source {i+1}:\nTitle: {hit.title}\nURL: {hit.url}\nContent: {hit.content[:1000]}"
+            + (f"\nArticle text: {hit.page_text}" if hit.page_text else "")
+            for i, hit in enumerate(search_results[:8])
         ])
         
         prompt = f"""
@@ -136,94 +240,184 @@ CONFIDENCE: [0.0 - 1.0]
 """
         
         try:
-            loop = asyncio.get_event_loop()
-            gemini_start = time.time()
-            response = await loop.run_in_executor(
-                executor,
-                lambda: model.generate_content(prompt)
-            )
-            gemini_time = time.time() - gemini_start
-            print(f"⏱️  Gemini API call took: {gemini_time:.2f}s")
-            
-            # Parse the response
-            response_text = response.text.strip()
-            lines = response_text.split('\n')
-            
-            label = "Unverifiable"
-            explanation = "Unable to determine accuracy."
-            confidence = 0.5
-            bias = None
-            selected_source_indices = []
-            
-            for line in lines:
-                if line.startswith("LABEL:"):
-                    label_raw = line.replace("LABEL:", "").strip().upper()
-                    # Map to consistent format
-                    if "TRUE" in label_raw and "FALSE" not in label_raw:
-                        label = "True"
-                    elif "FALSE" in label_raw:
-                        label = "False"
-                    elif "MISLEADING" in label_raw:
-                        label = "Misleading"
-                    else:
-                        label = "Unverifiable"
-                elif line.startswith("EXPLANATION:"):
-                    explanation = line.replace("EXPLANATION:", "").strip()
-                    # Remove markdown formatting
-                    explanation = explanation.replace("**", "").replace("__", "").replace("*", "").replace("_", "")
-                elif line.startswith("SOURCES:"):
-                    sources_str = line.replace("SOURCES:", "").strip()
-                    try:
-                        # Parse comma-separated source numbers
-                        selected_source_indices = [int(s.strip()) - 1 for s in sources_str.split(",") if s.strip().isdigit()]
-                    except:
-                        selected_source_indices = []
-                elif line.startswith("BIAS:"):
-                    bias = line.replace("BIAS:", "").strip()
-                elif line.startswith("CONFIDENCE:"):
-                    try:
-                        confidence = float(line.replace("CONFIDENCE:", "").strip())
-                    except:
-                        confidence = 0.5
+            verdict = await FactCheckService._cascade(prompt, priority)
             
             # Format sources - use Gemini's selected sources, or fallback to first 3
-            if selected_source_indices and len(selected_source_indices) > 0:
+            if verdict.source_indices:
                 # Use only the sources Gemini selected
-                sources = []
-                for idx in selected_source_indices[:3]:  # Limit to top 3
-                    if 0 <= idx < len(search_results):
-                        result = search_results[idx]
-                        sources.append(Source(
-                            title=result.get("title", "Source"),
-                            url=result.get("url", ""),
-                            snippet=result.get("content", "")[:200],
-                            published_date=result.get("published_date")
-                        ))
-            else:
-                # Fallback to first 3 sources
                 sources = [
-                    Source(
-                        title=result.get("title", "Source"),
-                        url=result.get("url", ""),
-                        snippet=result.get("content", "")[:200],
-                        published_date=result.get("published_date")
-                    )
-                    for result in search_results[:settings.MAX_SOURCES]
+                    search_results[idx].to_source()
+                    for idx in verdict.source_indices[:3]  # Limit to top 3
+                    if 0 <= idx < len(search_results)
                 ]
+            else:
+                # Fallback to first 3 sources
+                sources = [hit.to_source() for hit in search_results[:settings.MAX_SOURCES]]
             
-            return FactCheckResponse(
-                label=label,
-                explanation=explanation,
-                sources=sources,
-                confidence=confidence,
-                bias=bias
-            )
+            return verdict.to_response(sources)
             
         except Exception as e:
             print(f"Error synthesizing fact-check: {str(e)}")
+            mark_degraded("synthesize")  # A multi-claim verdict combined without this claim is partial
             return FactCheckResponse(
                 label="Error",
                 explanation="An error occurred while analyzing this claim.",
                 sources=[],
                 confidence=0.0
             )
+    
+    @staticmethod
+    async def _cascade(prompt: str, priority: Priority) -> Verdict:
+        """
+        Synthesize on the fastest model tier, escalating unreliable verdicts.
+        
+        A verdict with a label in CASCADE_ESCALATE_LABELS or confidence below
+        CASCADE_CONFIDENCE_THRESHOLD is re-run on the next tier of
+        GEMINI_SYNTHESIS_MODELS, as long as CASCADE_MIN_SECONDS remain before
+        the request deadline. If the stronger call fails or runs out of time
+        the weaker verdict stands.
+        """
+        tiers = settings.GEMINI_SYNTHESIS_MODELS
+        verdict = await FactCheckService._synthesize_on(tiers[0], prompt, priority)
+        tier = 0
+        while tier + 1 < len(tiers):
+            reason = escalation_reason(verdict)
+            if reason is None:
+                break
+            left = time_left()
+            if left is not None and left < settings.CASCADE_MIN_SECONDS:
+                model_tiers.escalations_skipped += 1
+                break
+            try:
+                # Stop a little before the deadline so the weaker verdict can still be returned
+                stronger = await asyncio.wait_for(
+                    FactCheckService._synthesize_on(tiers[tier + 1], prompt, priority),
+                    left - 0.2 if left is not None else None
+                )
+            except Exception as e:
+                print(f"Escalation to {tiers[tier + 1]} failed, keeping {tiers[tier]}: {str(e) or type(e).__name__}")
+                model_tiers.escalations_skipped += 1
+                break
+            print(f"⬆️  Escalated ({reason}) {tiers[tier]} → {tiers[tier + 1]}: {verdict.label} → {stronger.label}")
+            model_tiers.record_escalation(reason, stronger.label != verdict.label)
+            verdict, tier = stronger, tier + 1
+        model_tiers.record_finished(tiers[tier])
+        return verdict
+    
+    @staticmethod
+    async def _synthesize_on(model_name: str, prompt: str, priority: Priority) -> Verdict:
+        """Run the synthesis prompt on one model and parse the verdict."""
+        gemini_start = time.time()
+        response = await FactCheckService._generate(prompt, priority, model_name, "synthesize")
+        gemini_time = time.time() - gemini_start
+        print(f"⏱️  Gemini API call ({model_name}) took: {gemini_time:.2f}s")
+        return FactCheckService.parse_verdict(response.text)
+    
+    @staticmethod
+    def parse_verdict(response_text: str) -> Verdict:
+        """
+        Parse Gemini's LABEL/EXPLANATION/SOURCES/BIAS/CONFIDENCE output.
+        
+        Args:
+            response_text: Raw model output
+            
+        Returns:
+            Verdict with defaults for any missing field
+        """
+        verdict = Verdict()
+        
+        for line in response_text.strip().split('\n'):
+            if line.startswith("LABEL:"):
+                label_raw = line.replace("LABEL:", "").strip().upper()
+                # Map to consistent format
+                if "TRUE" in label_raw and "FALSE" not in label_raw:
+                    verdict.label = "True"
+                elif "FALSE" in label_raw:
+                    verdict.label = "False"
+                elif "MISLEADING" in label_raw:
+                    verdict.label = "Misleading"
+                else:
+                    verdict.label = "Unverifiable"
+            elif line.startswith("EXPLANATION:"):
+                explanation = line.replace("EXPLANATION:", "").strip()
+                # Remove markdown formatting
+                verdict.explanation = explanation.replace("**", "").replace("__", "").replace("*", "").replace("_", "")
+            elif line.startswith("SOURCES:"):
+                sources_str = line.replace("SOURCES:", "").strip()
+                # Parse comma-separated source numbers
+                verdict.source_indices = [int(s.strip()) - 1 for s in sources_str.split(",") if s.strip().isdecimal()]
+            elif line.startswith("BIAS:"):
+                verdict.bias = line.replace("BIAS:", "").strip()
+            elif line.startswith("CONFIDENCE:"):
+                try:
+                    verdict.confidence = float(line.replace("CONFIDENCE:", "").strip())
+                except ValueError:
+                    verdict.confidence = 0.5
+        
+        return verdict
+    
+    @staticmethod
+    def combine_verdicts(claims: List[str], results: List[FactCheckResponse]) -> FactCheckResponse:
+        """
+        Combine per-claim verdicts into one tweet-level verdict.
+        
+        Claims that could not be checked do not count towards the label:
+        all checked claims True gives True, all False gives False, and any
+        mix (or a Misleading claim) gives Misleading. Confidence is the mean
+        over checked claims, scaled by the fraction of claims checked.
+        
+        Args:
+            claims: The atomic claims, most significant first
+            results: Verdict for each claim, in the same order
+            
+        Returns:
+            FactCheckResponse with the per-claim breakdown in `claims`
+        """
+        breakdown = [
+            ClaimVerdict.model_construct(
+                claim=claim,
+                label=result.label,
+                explanation=result.explanation,
+                sources=result.sources,
+                confidence=result.confidence
+            )
+            for claim, result in zip(claims, results)
+        ]
+        checked = [result for result in results if result.label in ("True", "False", "Misleading")]
+        
+        if not checked:
+            errored = all(result.label == "Error" for result in results)
+            label = "Error" if errored else "Unverifiable"
+            lead = results[0]
+            confidence = 0.0
+        else:
+            labels = {result.label for result in checked}
+            label = labels.pop() if len(labels) == 1 else "Misleading"
+            # Explain with the most significant claim behind the label (for a
+            # mix, the first claim that is not True)
+            lead = next((result for result in checked if result.label == label), None)
+            if lead is None:
+                lead = next(result for result in checked if result.label != "True")
+            confidence = sum(result.confidence for result in checked) / len(checked)
+            confidence *= len(checked) / len(results)
+        
+        # Sources of the leading claim first, then the rest, without duplicates
+        sources, seen_urls = [], set()
+        for result in [lead] + [r for r in results if r is not lead]:
+            for source in result.sources:
+                if source.url not in seen_urls and len(sources) < settings.MAX_SOURCES:
+                    seen_urls.add(source.url)
+                    sources.append(source)
+        
+        bias_rank = {"Likely": 2, "Potential": 1}
+        biases = [result.bias for result in results if result.bias in bias_rank]
+        
+        return FactCheckResponse.model_construct(
+            label=label,
+            explanation=lead.explanation,
+            sources=sources,
+            confidence=round(confidence, 2),
+            bias=max(biases, key=bias_rank.get) if biases else lead.bias,
+            claim_hash=None,
+            claims=breakdown
+        )
@@ -0,0 +1,551 @@
+"""
+Asynchronous jobs for long-running work (media checks, batch fact-checks).
+
+A submission is written to a local SQLite queue and answered with a job id
+straight away; a bounded pool of worker tasks drains the queue, so a burst
+of submissions waits in the database instead of holding HTTP workers and
+timing out. Clients poll GET /api/jobs/{id} (optionally long-polling with
+?wait=) or subscribe on /ws.
+
+The queue is durable: jobs queued or running when the process stops are
+picked up again on the next start (a running job that has used up its
+attempts is failed instead). A running job holds a lease, renewed while
+it runs; only a job whose lease has lapsed is requeued, so processes
+sharing JOBS_DB_PATH (replicas, uvicorn workers) never run one job twice,
+and the jobs a crashed process was running are taken over by the next
+sweep of any other. An identical submission (same kind and
+payload) made while an earlier one is queued, running or still holds its
+result returns the earlier job. Jobs and their results are deleted after
+JOBS_TTL.
+"""
+import asyncio
+import hashlib
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import orjson
+from app.config import settings
+from app.container import container
+from app.models import JobResponse
+from app.services.media_check_service import MediaCheckService
+from app.services.quota_service import Priority, QuotaExceededError
+from app.services.scheduler import SchedulerRejectedError
+from app.services.verification_service import VerificationService
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    dedup_key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    run_after REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    claim_token TEXT,
+    lease_until REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_dedup ON jobs (dedup_key, created_at);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, run_after);
+CREATE INDEX IF NOT EXISTS jobs_expiry ON jobs (expires_at);
+"""
+
+FINISHED = ("done", "failed")
+
+# Reports the share of a job finished so far
+ProgressCallback = Callable[[float], None]
+
+
+def _percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class JobQueueFullError(SchedulerRejectedError):
+    """Raised when JOBS_MAX_QUEUED jobs are already waiting."""
+
+    def __init__(self):
+        super().__init__(f"Job queue full ({settings.JOBS_MAX_QUEUED} waiting)", 503)
+
+
+def dedup_key(kind: str, payload: dict) -> str:
+    """Identity of a submission: its kind and canonical payload."""
+    return hashlib.sha256(kind.encode() + b"\0" + orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+class JobStore:
+    """
+    The SQLite job table (blocking; run in the "jobs" thread pool).
+
+    Connections are per thread, in WAL mode so the API's reads never wait
+    on a worker's writes, with full fsync since the table is the queue.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "claim_token" not in columns:  # Table created before leases
+                conn.execute("ALTER TABLE jobs ADD COLUMN claim_token TEXT")
+                conn.execute("ALTER TABLE jobs ADD COLUMN lease_until REAL")
+            self._local.conn = conn
+        return conn
+
+    def submit(self, kind: str, payload: dict, now: float, full: bool = False) -> Tuple[sqlite3.Row, bool]:
+        """
+        Insert a job unless an identical live one exists.
+
+        Args:
+            full: The queue has no room, so only an identical job can be returned
+
+        Returns:
+            (job row, whether it is an earlier identical job)
+
+        Raises:
+            JobQueueFullError: `full`, and no identical job exists
+        """
+        key = dedup_key(kind, payload)
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            existing = conn.execute(
+                """
+                SELECT * FROM jobs WHERE dedup_key = ? AND status != 'failed' AND expires_at > ?
+                ORDER BY created_at DESC LIMIT 1
+                """,
+                (key, now)
+            ).fetchone()
+            if existing is None:
+                if full:
+                    raise JobQueueFullError()
+                job_id = secrets.token_hex(12)
+                conn.execute(
+                    """
+                    INSERT INTO jobs (id, kind, payload, dedup_key, status, created_at, run_after, expires_at)
+                    VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)
+                    """,
+                    (job_id, kind, orjson.dumps(payload).decode(), key, now, now, now + settings.JOBS_TTL)
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if existing is not None:
+            return existing, True
+        return self.get(job_id), False
+
+    def get(self, job_id: str) -> Optional[sqlite3.Row]:
+        return self._connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+    def claim(self, job_id: str, now: float) -> Optional[sqlite3.Row]:
+        """
+        Mark a queued, unexpired job running under a new lease (None if it
+        is gone, expired or not queued, e.g. another process claimed it).
+        """
+        conn = self._connection()
+        updated = conn.execute(
+            """
+            UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ?,
+                claim_token = ?, lease_until = ?
+            WHERE id = ? AND status = 'queued' AND expires_at > ?
+            """,
+            (now, secrets.token_hex(8), now + settings.JOBS_LEASE, job_id, now)
+        ).rowcount
+        return self.get(job_id) if updated else None
+
+    def renew(self, job_id: str, token: str, now: float) -> bool:
+        """Extend a running job's lease (False if the claim was lost)."""
+        return bool(self._connection().execute(
+            "UPDATE jobs SET lease_until = ? WHERE id = ? AND status = 'running' AND claim_token = ?",
+            (now + settings.JOBS_LEASE, job_id, token)
+        ).rowcount)
+
+    def finish(self, job_id: str, token: str, status: str, result: Optional[str], error: Optional[str], now: float):
+        """Record the outcome of a claim still held; the job is kept for JOBS_TTL from now."""
+        self._connection().execute(
+            """
+            UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, expires_at = ?
+            WHERE id = ? AND status = 'running' AND claim_token = ?
+            """,
+            (status, result, error, now, now + settings.JOBS_TTL, job_id, token)
+        )
+
+    def retry(self, job_id: str, token: str, error: str, run_after: float):
+        self._connection().execute(
+            """
+            UPDATE jobs SET status = 'queued', error = ?, run_after = ?
+            WHERE id = ? AND status = 'running' AND claim_token = ?
+            """,
+            (error, run_after, job_id, token)
+        )
+
+    def recover(self, now: float, all_queued: bool) -> Tuple[List[Tuple[str, float]], int]:
+        """
+        Requeue running jobs whose lease has lapsed (their process died),
+        failing those that have had all JOBS_MAX_ATTEMPTS runs (a job that
+        crashes its worker must not rerun forever). Jobs other processes
+        are running keep their lease.
+
+        Args:
+            all_queued: Also return jobs that were already queued (at
+                start, when none of them is scheduled in this process)
+
+        Returns:
+            (queued (id, run_after) to schedule, number of jobs failed)
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            failed = conn.execute(
+                """
+                UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, expires_at = ?, claim_token = NULL
+                WHERE status = 'running' AND COALESCE(lease_until, 0) <= ? AND attempts >= ?
+                """,
+                (
+                    f"Interrupted on each of {settings.JOBS_MAX_ATTEMPTS} attempts",
+                    now, now + settings.JOBS_TTL, now, settings.JOBS_MAX_ATTEMPTS
+                )
+            ).rowcount
+            requeued = [
+                (row["id"], row["run_after"])
+                for row in conn.execute(
+                    "SELECT id, run_after FROM jobs WHERE status = 'running' AND COALESCE(lease_until, 0) <= ?", (now,)
+                )
+            ]
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', claim_token = NULL WHERE status = 'running' AND COALESCE(lease_until, 0) <= ?",
+                (now,)
+            )
+            if all_queued:
+                requeued = [
+                    (row["id"], row["run_after"])
+                    for row in conn.execute("SELECT id, run_after FROM jobs WHERE status = 'queued' ORDER BY created_at")
+                ]
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return requeued, failed
+
+    def delete_expired(self, now: float) -> int:
+        return self._connection().execute(
+            "DELETE FROM jobs WHERE expires_at <= ? AND status != 'running'", (now,)
+        ).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._connection().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        return {status: count for status, count in rows}
+
+
+async def _check_media(payload: dict, progress: ProgressCallback) -> dict:
+    result = await MediaCheckService.check_media(payload["media_url"], payload["media_type"], Priority.BACKGROUND)
+    return result.model_dump()
+
+
+async def _fact_check_batch(payload: dict, progress: ProgressCallback) -> dict:
+    """Verify every post at batch priority; a post that fails gets an error entry."""
+    texts: List[str] = payload["texts"]
+    semaphore = asyncio.Semaphore(settings.JOBS_BATCH_CONCURRENCY)
+    finished = 0
+
+    async def verify(text: str) -> dict:
+        nonlocal finished
+        async with semaphore:
+            try:
+                return (await VerificationService.verify(text, Priority.BATCH)).model_dump()
+            except (SchedulerRejectedError, QuotaExceededError) as e:
+                return {"error": str(e), "status": getattr(e, "status_code", 429)}
+            finally:
+                finished += 1
+                progress(finished / len(texts))
+
+    return {"results": await asyncio.gather(*(verify(text) for text in texts))}
+
+
+# Job kinds and their handlers
+JOB_HANDLERS: Dict[str, Callable[[dict, ProgressCallback], Awaitable[dict]]] = {
+    "check-media": _check_media,
+    "fact-check-batch": _fact_check_batch,
+}
+
+
+class JobQueue:
+    """
+    Worker pool over the job store.
+
+    Ids of runnable jobs wait in an in-memory queue (rebuilt from the store
+    on start); JOBS_WORKERS tasks take them in submission order. A failed
+    attempt is retried with exponential backoff up to JOBS_MAX_ATTEMPTS,
+    except for errors no retry can fix (bad input, missing API key).
+    """
+
+    def __init__(self, store: JobStore):
+        self.store = store
+        self._ready: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retry_handles: Set[asyncio.TimerHandle] = set()
+        self._finished: Dict[str, asyncio.Event] = {}
+        self._progress: Dict[str, float] = {}
+        self.pending = 0  # Jobs waiting for a worker (including scheduled retries)
+        self.running = 0
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.retried = 0
+        self.expired = 0
+        self._queue_waits: deque = deque(maxlen=500)
+        self._run_times: deque = deque(maxlen=500)
+
+    async def _store(self, method, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(container.executor("jobs"), method, *args)
+
+    async def start(self):
+        """Requeue jobs left over from the last run and start the workers."""
+        if not settings.JOBS_ENABLED or self._tasks:
+            return
+        self._ready = asyncio.Queue()
+        now = time.time()
+        recovered, failed = await self._store(self.store.recover, now, True)
+        self.failed += failed
+        for job_id, run_after in recovered:
+            self._schedule(job_id, max(0.0, run_after - now))
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(settings.JOBS_WORKERS)]
+        self._tasks.append(asyncio.create_task(self._sweep()))
+        print(
+            f"✓ Job workers started ({settings.JOBS_WORKERS}; {len(recovered)} job(s) recovered, "
+            f"{failed} failed after {settings.JOBS_MAX_ATTEMPTS} interrupted attempts)"
+        )
+
+    async def stop(self):
+        """Stop the workers; interrupted jobs stay in the store and rerun on the next start."""
+        for handle in self._retry_handles:
+            handle.cancel()
+        self._retry_handles.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, kind: str, payload: dict) -> JobResponse:
+        """
+        Queue a job, or return the identical one already known.
+
+        Raises:
+            ValueError: Job subsystem disabled
+            JobQueueFullError: JOBS_MAX_QUEUED jobs are already waiting (and
+                none of them is identical)
+        """
+        if self._ready is None:
+            raise ValueError("Jobs are disabled (JOBS_ENABLED=false)")
+        full = self.pending >= settings.JOBS_MAX_QUEUED
+        try:
+            row, duplicate = await self._store(self.store.submit, kind, payload, time.time(), full)
+        except JobQueueFullError:
+            self.rejected += 1
+            raise
+        if duplicate:
+            self.deduplicated += 1
+        else:
+            self.submitted += 1
+            self._schedule(row["id"], 0.0)
+        return self._response(row, deduplicated=duplicate)
+
+    async def get(self, job_id: str, wait: float = 0.0) -> Optional[JobResponse]:
+        """
+        Current state of a job.
+
+        Args:
+            job_id: Job id
+            wait: Seconds to wait for an unfinished job to finish (long-poll)
+
+        Returns:
+            The job, or None if it does not exist (or has expired)
+        """
+        row = await self._store(self.store.get, job_id)
+        if row is None or row["status"] in FINISHED or wait <= 0:
+            return self._response(row) if row is not None else None
+        event = self._finished.setdefault(job_id, asyncio.Event())
+        row = await self._store(self.store.get, job_id)
+        if row is None or row["status"] in FINISHED:
+            self._notify(job_id)  # Finished before the event existed
+            return self._response(row) if row is not None else None
+        try:
+            await asyncio.wait_for(event.wait(), wait)
+        except asyncio.TimeoutError:
+            pass
+        row = await self._store(self.store.get, job_id)
+        return self._response(row) if row is not None else None
+
+    def _response(self, row: sqlite3.Row, deduplicated: bool = False) -> JobResponse:
+        return JobResponse(
+            id=row["id"],
+            kind=row["kind"],
+            status=row["status"],
+            created_at=row["created_at"],
+            started_at=row["started_at"],
+            finished_at=row["finished_at"],
+            expires_at=row["expires_at"],
+            attempts=row["attempts"],
+            progress=self._progress.get(row["id"]) if row["status"] == "running" else None,
+            result=orjson.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            deduplicated=deduplicated
+        )
+
+    def _schedule(self, job_id: str, delay: float):
+        self.pending += 1
+        if delay <= 0:
+            self._ready.put_nowait(job_id)
+            return
+        loop = asyncio.get_running_loop()
+
+        def ready():
+            self._retry_handles.discard(handle)
+            self._ready.put_nowait(job_id)
+
+        handle = loop.call_later(delay, ready)
+        self._retry_handles.add(handle)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._ready.get()
+            self.pending -= 1
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error running job {job_id}: {str(e)}")
+
+    async def _run(self, job_id: str):
+        row = await self._store(self.store.claim, job_id, time.time())
+        if row is None:
+            self.expired += 1
+            self._notify(job_id)
+            return
+        self._queue_waits.append(row["started_at"] - row["run_after"])
+        handler = JOB_HANDLERS[row["kind"]]
+        def progress(share: float):
+            self._progress[job_id] = share
+
+        self.running += 1
+        start = time.time()
+        heartbeat = asyncio.create_task(self._renew_lease(job_id, row["claim_token"]))
+        try:
+            result = await handler(orjson.loads(row["payload"]), progress)
+        except asyncio.CancelledError:
+            raise  # Shutdown: the job stays "running" and is recovered once its lease lapses
+        except Exception as e:
+            await self._failed(row, e)
+            return
+        else:
+            await self._store(
+                self.store.finish, job_id, row["claim_token"], "done", orjson.dumps(result).decode(), None, time.time()
+            )
+            self.completed += 1
+            self._run_times.append(time.time() - start)
+            self._notify(job_id)
+        finally:
+            heartbeat.cancel()
+            self.running -= 1
+            self._progress.pop(job_id, None)
+
+    async def _renew_lease(self, job_id: str, token: str):
+        """Keep a running job's lease while it runs here."""
+        while True:
+            await asyncio.sleep(settings.JOBS_LEASE / 3)
+            try:
+                if not await self._store(self.store.renew, job_id, token, time.time()):
+                    print(f"⚠️  Job {job_id} lost its lease; its result will not be recorded")
+                    return
+            except sqlite3.Error as e:
+                print(f"Error renewing job {job_id} lease: {str(e)}")
+
+    async def _failed(self, row: sqlite3.Row, error: Exception):
+        job_id, attempts = row["id"], row["attempts"]
+        message = str(error) or type(error).__name__
+        if not isinstance(error, ValueError) and attempts < settings.JOBS_MAX_ATTEMPTS:
+            delay = settings.JOBS_RETRY_DELAY * 2 ** (attempts - 1)
+            if isinstance(error, QuotaExceededError):
+                delay = max(delay, error.retry_after)
+            await self._store(self.store.retry, job_id, row["claim_token"], message, time.time() + delay)
+            self.retried += 1
+            self._schedule(job_id, delay)
+            print(f"🔁 Job {job_id} ({row['kind']}) attempt {attempts} failed, retrying in {delay:.0f}s: {message}")
+            return
+        await self._store(self.store.finish, job_id, row["claim_token"], "failed", None, message, time.time())
+        self.failed += 1
+        self._notify(job_id)
+        print(f"❌ Job {job_id} ({row['kind']}) failed: {message}")
+
+    def _notify(self, job_id: str):
+        event = self._finished.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(settings.JOBS_SWEEP_INTERVAL)
+            try:
+                deleted = await self._store(self.store.delete_expired, time.time())
+                if deleted:
+                    print(f"🧹 Deleted {deleted} expired job(s)")
+                # Take over jobs of a process that died while running them
+                recovered, failed = await self._store(self.store.recover, time.time(), False)
+                self.failed += failed
+                for job_id, _ in recovered:
+                    self._schedule(job_id, 0.0)
+                if recovered or failed:
+                    print(f"♻️  Took over {len(recovered)} job(s) with lapsed leases ({failed} failed)")
+            except sqlite3.Error as e:
+                print(f"Error sweeping jobs: {str(e)}")
+
+    async def snapshot(self) -> dict:
+        return {
+            "enabled": self._ready is not None,
+            "workers": settings.JOBS_WORKERS,
+            "pending": self.pending,
+            "running": self.running,
+            "stored": await self._store(self.store.counts),
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "expired": self.expired,
+            "queue_wait_p50": round(_percentile(list(self._queue_waits), 0.50), 3),
+            "queue_wait_p95": round(_percentile(list(self._queue_waits), 0.95), 3),
+            "run_time_p50": round(_percentile(list(self._run_times), 0.50), 3),
+            "run_time_p95": round(_percentile(list(self._run_times), 0.95), 3),
+        }
+
+
+# Global job queue
+job_queue = JobQueue(JobStore(settings.JOBS_DB_PATH))
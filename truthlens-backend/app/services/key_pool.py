@@ -0,0 +1,139 @@
+"""Multi-key pools for spreading upstream traffic across API keys."""
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+from app.config import settings
+from app.services.quota_service import Priority, key_id, quota_manager
+
+
+class KeyState:
+    """Health and usage counters for a single API key."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.cooldown_until = 0.0
+        self.last_used: Optional[float] = None
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def snapshot(self, now: float) -> dict:
+        return {
+            "healthy": self.healthy(now),
+            "cooldown_remaining": round(max(0.0, self.cooldown_until - now), 2),
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "seconds_since_last_use": round(now - self.last_used, 1) if self.last_used else None,
+        }
+
+
+class KeyPool:
+    """
+    Pool of API keys for one upstream.
+
+    Keys are selected round-robin or least-loaded (fewest in-flight calls,
+    then most quota left), skipping keys that are cooling down after a 429.
+    Every lease also goes through the per-key token bucket in quota_manager.
+    """
+
+    def __init__(self, upstream: str, keys: List[str], strategy: str = "least_loaded"):
+        self.upstream = upstream
+        self.keys = list(keys)
+        self.strategy = strategy
+        self._state: Dict[str, KeyState] = {key: KeyState() for key in self.keys}
+        self._cycle = itertools.cycle(self.keys) if self.keys else None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def select(self, exclude: Optional[set] = None) -> str:
+        """
+        Pick the key for the next call.
+
+        Args:
+            exclude: Keys to avoid (e.g. one that just returned 429)
+
+        Returns:
+            The selected API key
+        """
+        if not self.keys:
+            raise ValueError(f"No API keys configured for {self.upstream}")
+
+        now = time.monotonic()
+        candidates = [k for k in self.keys if not exclude or k not in exclude] or self.keys
+        healthy = [k for k in candidates if self._state[k].healthy(now)]
+        if not healthy:
+            # Everything is cooling down - use the key that recovers first
+            return min(candidates, key=lambda k: self._state[k].cooldown_until)
+
+        if self.strategy == "round_robin":
+            for _ in range(len(self.keys)):
+                key = next(self._cycle)
+                if key in healthy:
+                    return key
+
+        return min(
+            healthy,
+            key=lambda k: (
+                self._state[k].in_flight,
+                -quota_manager.bucket(self.upstream, k).snapshot()["available"]
+            )
+        )
+
+    @asynccontextmanager
+    async def lease(
+        self,
+        priority: Priority = Priority.INTERACTIVE,
+        exclude: Optional[set] = None
+    ) -> AsyncIterator[str]:
+        """
+        Select a key, wait for its quota and hold it for the duration of a call.
+
+        Args:
+            priority: Priority class used for quota admission
+            exclude: Keys to avoid for this call
+
+        Yields:
+            The API key to use
+        """
+        key = self.select(exclude)
+        state = self._state[key]
+        state.in_flight += 1
+        try:
+            await quota_manager.acquire(self.upstream, key, priority)
+            state.requests += 1
+            state.last_used = time.monotonic()
+            try:
+                yield key
+            except Exception:
+                state.errors += 1
+                raise
+        finally:
+            state.in_flight -= 1
+
+    def report_rate_limited(self, key: str, retry_after: Optional[str] = None):
+        """Put a key into cooldown after the upstream returned 429."""
+        quota_manager.report_rate_limited(self.upstream, key, retry_after)
+        state = self._state.get(key)
+        if state is not None:
+            state.rate_limited += 1
+            state.cooldown_until = quota_manager.bucket(self.upstream, key).blocked_until
+
+    def snapshot(self) -> dict:
+        """Per-key health and usage metrics."""
+        now = time.monotonic()
+        return {
+            "strategy": self.strategy,
+            "keys": {key_id(k): self._state[k].snapshot(now) for k in self.keys},
+        }
+
+
+# Global key pools
+gemini_keys = KeyPool("gemini", settings.GEMINI_API_KEYS, settings.KEY_POOL_STRATEGY)
+brave_keys = KeyPool("brave", settings.BRAVE_API_KEYS, settings.KEY_POOL_STRATEGY)
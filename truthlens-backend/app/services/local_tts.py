@@ -0,0 +1,102 @@
+"""
+Local CPU speech synthesis, executed inside the "tts" process pool.
+
+Two engines produce 16-bit mono PCM:
+    espeak  eSpeak NG formant synthesizer (the `espeak-ng` binary), tiny and fast
+    piper   Piper neural voices (`pip install piper-tts`, needs an .onnx voice file)
+
+Workers only run synthesize_pcm(); it needs no app state, just the text and
+the engine settings passed with each call.
+"""
+import importlib.util
+import os
+import re
+import shutil
+import struct
+import subprocess
+from typing import Dict, Optional, Tuple
+
+# Piper voices loaded in this worker process, by model path
+_piper_voices: Dict[str, object] = {}
+
+# eSpeak voice names with an optional variant, e.g. "en-us", "mb-en1", "en+f3"
+_ESPEAK_VOICE = re.compile(r"[A-Za-z0-9_-]{1,32}(\+[A-Za-z0-9_-]{1,32})?")
+
+
+def _espeak_voice(voice: Optional[str]) -> str:
+    """
+    The eSpeak voice to use (en-us by default).
+
+    Raises:
+        ValueError: The name is not a plain voice name (it goes on the
+            command line, so nothing that could read as an option)
+    """
+    voice = voice or "en-us"
+    if voice.startswith("-") or not _ESPEAK_VOICE.fullmatch(voice):
+        raise ValueError(f"Invalid eSpeak voice: {voice!r}")
+    return voice
+
+
+def engine_available(engine: str, voice: Optional[str]) -> bool:
+    """Whether the engine (and, for Piper, its voice file) is installed and the voice is valid."""
+    if engine == "espeak":
+        try:
+            _espeak_voice(voice)
+        except ValueError as e:
+            print(f"⚠️  {e}")
+            return False
+        return bool(shutil.which("espeak-ng") or shutil.which("espeak"))
+    if engine == "piper":
+        return importlib.util.find_spec("piper") is not None and bool(voice) and os.path.exists(voice)
+    return False
+
+
+def wav_header(sample_rate: int, data_bytes: int = 0xFFFFFFFF) -> bytes:
+    """
+    WAV header for 16-bit mono PCM.
+
+    The default (maximum) data size marks a stream of unknown length, which
+    browsers play until the data ends.
+    """
+    riff_size = min(data_bytes + 36, 0xFFFFFFFF)
+    return (
+        b"RIFF" + struct.pack("<I", riff_size) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+        + b"data" + struct.pack("<I", data_bytes)
+    )
+
+
+def _espeak(voice: Optional[str], text: str) -> Tuple[int, bytes]:
+    binary = shutil.which("espeak-ng") or "espeak"
+    # The text goes in on stdin, never as an argument it could be parsed as an option
+    result = subprocess.run(
+        [binary, "--stdout", "--stdin", "-v", _espeak_voice(voice)],
+        input=text.encode(), capture_output=True, check=True, timeout=30
+    )
+    wav = result.stdout
+    sample_rate = struct.unpack_from("<I", wav, 24)[0]
+    return sample_rate, wav[wav.index(b"data", 12) + 8:]
+
+
+def _piper(voice: str, text: str) -> Tuple[int, bytes]:
+    model = _piper_voices.get(voice)
+    if model is None:
+        from piper.voice import PiperVoice  # piper-tts 1.2 API
+        model = PiperVoice.load(voice)
+        _piper_voices[voice] = model
+    pcm = b"".join(model.synthesize_stream_raw(text))
+    return model.config.sample_rate, pcm
+
+
+def synthesize_pcm(engine: str, voice: Optional[str], text: str) -> Tuple[int, bytes]:
+    """
+    Synthesize one sentence (runs in a worker process).
+
+    Returns:
+        (sample rate, 16-bit mono PCM)
+    """
+    if engine == "espeak":
+        return _espeak(voice, text)
+    if engine == "piper":
+        return _piper(voice, text)
+    raise ValueError(f"Unknown local TTS engine: {engine}")
@@ -2,31 +2,46 @@
 import requests
 import asyncio
 import time
-from concurrent.futures import ThreadPoolExecutor
 from app.config import settings
+from app.container import container
 from app.models import MediaCheckResponse
+from app.services.quota_service import Priority, quota_manager
 
-# Thread pool for async operations
-executor = ThreadPoolExecutor(max_workers=settings.MAX_WORKERS)
+
+class MediaCheckError(ValueError):
+    """Raised for a media check that cannot succeed as asked (never retried)."""
+
+    def __init__(self, message: str, status_code: int):
+        self.status_code = status_code  # 422 bad media, 502 key rejected, 503 not configured
+        super().__init__(message)
 
 
 class MediaCheckService:
     """Service for detecting AI-generated images and videos."""
     
     @staticmethod
-    async def check_media(media_url: str, media_type: str) -> MediaCheckResponse:
+    async def check_media(
+        media_url: str,
+        media_type: str,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> MediaCheckResponse:
         """
         Check if an image or video is AI-generated using AI or Not API.
         
         Args:
             media_url: URL of the image or video
             media_type: Type of media ("image" or "video")
+            priority: Priority class used for quota admission
             
         Returns:
             MediaCheckResponse with ai_generated status, confidence, and message
+            
+        Raises:
+            MediaCheckError: Not configured, invalid media, or API key rejected
+            QuotaExceededError: No AI or Not quota within the wait budget
         """
         if not settings.AIORNOT_API_KEY:
-            raise ValueError("AIORNOT_API_KEY not configured")
+            raise MediaCheckError("AIORNOT_API_KEY not configured", 503)
         
         # AI or Not only supports images, not videos
         if media_type == "video":
@@ -43,7 +58,7 @@ class MediaCheckService:
             
             # Validate URL
             if not media_url or not media_url.startswith('http'):
-                raise ValueError(f"Invalid media URL: {media_url}")
+                raise MediaCheckError(f"Invalid media URL: {media_url}", 422)
             
             print(f"📷 Image URL: {media_url}")
             
@@ -64,9 +79,11 @@ class MediaCheckService:
             print(f"📤 Request payload: {payload}")
             print(f"🌐 Endpoint: {settings.AIORNOT_API_URL}")
             
+            await quota_manager.acquire("aiornot", settings.AIORNOT_API_KEY, priority)
+            
             loop = asyncio.get_event_loop()
             response = await loop.run_in_executor(
-                executor,
+                container.executor("aiornot"),
                 lambda: requests.post(
                     settings.AIORNOT_API_URL,
                     headers=headers,
@@ -80,12 +97,17 @@ class MediaCheckService:
             if response.status_code == 403:
                 print("❌ 403 Forbidden - API key might be invalid")
                 print(f"Response body: {response.text[:500]}")
-                raise ValueError(f"AI or Not API authentication failed. Please check your API key.")
+                raise MediaCheckError("AI or Not API authentication failed. Please check your API key.", 502)
+            
+            if response.status_code == 429:
+                quota_manager.report_rate_limited(
+                    "aiornot", settings.AIORNOT_API_KEY, response.headers.get("Retry-After")
+                )
             
             if response.status_code == 400:
                 print("❌ 400 Bad Request - Invalid payload")
                 print(f"Response body: {response.text}")
-                raise ValueError(f"AI or Not API bad request. Response: {response.text}")
+                raise MediaCheckError(f"AI or Not API bad request. Response: {response.text}", 422)
             
             response.raise_for_status()
             data = response.json()
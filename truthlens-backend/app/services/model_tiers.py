@@ -0,0 +1,134 @@
+"""
+Gemini model tiers: the synthesis cascade policy and per-model accounting.
+
+Synthesis runs on the first (fastest, cheapest) model in
+GEMINI_SYNTHESIS_MODELS; a verdict that looks unreliable is re-run on the
+next tier. Every Gemini call is recorded per stage and model with its
+latency, tokens and list-price cost, so the share of requests finishing
+on the fast tier and what escalations cost are visible in
+/api/metrics/models.
+"""
+from collections import deque
+from typing import Dict, Optional, Tuple
+from app.config import settings
+from app.models import Verdict
+
+
+def _percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def escalation_reason(verdict: Verdict) -> Optional[str]:
+    """Why a verdict should be re-run on a stronger model (None = keep it)."""
+    if verdict.label in settings.CASCADE_ESCALATE_LABELS:
+        return verdict.label.lower()
+    if verdict.confidence < settings.CASCADE_CONFIDENCE_THRESHOLD:
+        return "low_confidence"
+    return None
+
+
+class ModelUsage:
+    """Calls, latency, tokens and cost of one model in one pipeline stage."""
+
+    def __init__(self, model: str):
+        self.model = model
+        self.calls = 0
+        self.failures = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.latencies: deque = deque(maxlen=500)
+
+    @property
+    def cost(self) -> float:
+        """List-price cost in USD (0 for models without a known price)."""
+        input_price, output_price = settings.GEMINI_PRICES.get(self.model, (0.0, 0.0))
+        return (self.input_tokens * input_price + self.output_tokens * output_price) / 1_000_000
+
+    def snapshot(self) -> dict:
+        latencies = list(self.latencies)
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "latency_p50": round(_percentile(latencies, 0.50), 3),
+            "latency_p95": round(_percentile(latencies, 0.95), 3),
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost_usd": round(self.cost, 6),
+            "cost_per_call_usd": round(self.cost / self.calls, 8) if self.calls else 0.0,
+        }
+
+
+class ModelTierStats:
+    """Per-model usage plus how synthesis verdicts moved through the cascade."""
+
+    def __init__(self):
+        self._usage: Dict[Tuple[str, str], ModelUsage] = {}
+        self.finished_on: Dict[str, int] = {}
+        self.escalations: Dict[str, int] = {}
+        self.label_changed = 0  # Escalations where the stronger model disagreed
+        self.escalations_skipped = 0  # Not escalated: no time left, or the stronger call failed
+
+    def usage(self, stage: str, model: str) -> ModelUsage:
+        entry = self._usage.get((stage, model))
+        if entry is None:
+            entry = ModelUsage(model)
+            self._usage[(stage, model)] = entry
+        return entry
+
+    def record_call(self, stage: str, model: str, latency: float, prompt: str, response):
+        """Account one successful Gemini call (tokens estimated if the response has no usage)."""
+        entry = self.usage(stage, model)
+        entry.calls += 1
+        entry.latencies.append(latency)
+        usage = getattr(response, "usage_metadata", None)
+        input_tokens = getattr(usage, "prompt_token_count", 0) if usage else 0
+        output_tokens = getattr(usage, "candidates_token_count", 0) if usage else 0
+        if not input_tokens:
+            input_tokens = len(prompt) // 4
+            output_tokens = len(response.text) // 4
+        entry.input_tokens += input_tokens
+        entry.output_tokens += output_tokens
+
+    def record_failure(self, stage: str, model: str):
+        self.usage(stage, model).failures += 1
+
+    def record_escalation(self, reason: str, label_changed: bool):
+        self.escalations[reason] = self.escalations.get(reason, 0) + 1
+        if label_changed:
+            self.label_changed += 1
+
+    def record_finished(self, model: str):
+        """Count a synthesis verdict as final on this tier."""
+        self.finished_on[model] = self.finished_on.get(model, 0) + 1
+
+    def snapshot(self) -> dict:
+        stages: Dict[str, dict] = {}
+        for (stage, model), entry in self._usage.items():
+            stages.setdefault(stage, {})[model] = entry.snapshot()
+        verdicts = sum(self.finished_on.values())
+        escalated = sum(self.escalations.values())
+        return {
+            "extraction_model": settings.GEMINI_EXTRACTION_MODEL,
+            "synthesis_tiers": settings.GEMINI_SYNTHESIS_MODELS,
+            "confidence_threshold": settings.CASCADE_CONFIDENCE_THRESHOLD,
+            "stages": stages,
+            "total_cost_usd": round(sum(entry.cost for entry in self._usage.values()), 6),
+            "cascade": {
+                "verdicts": verdicts,
+                "finished_on": {
+                    model: {"verdicts": count, "share": round(count / verdicts, 3)}
+                    for model, count in self.finished_on.items()
+                },
+                "escalations": dict(self.escalations),
+                "label_changed": self.label_changed,
+                "label_change_rate": round(self.label_changed / escalated, 3) if escalated else 0.0,
+                "escalations_skipped": self.escalations_skipped,
+            },
+        }
+
+
+# Global model usage counters
+model_tiers = ModelTierStats()
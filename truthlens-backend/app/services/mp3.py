@@ -0,0 +1,81 @@
+"""
+MPEG audio frame handling for joining MP3 clips without re-encoding.
+
+An MP3 stream is a sequence of self-contained frames, so clips encoded with
+the same settings can be concatenated frame by frame. Containers around
+the frames (ID3v2 header, ID3v1 trailer) and the Xing/Info/VBRI header
+frame that describes one whole file are stripped first; left in the middle
+of a joined stream they would be played as noise or cut playback short.
+"""
+from typing import List, Optional
+
+# Bitrates in kbps by (MPEG-1?, layer)
+_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Sample rates by version bits (0 = MPEG-2.5, 2 = MPEG-2, 3 = MPEG-1)
+_SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+_VBR_TAGS = (b"Xing", b"Info", b"VBRI")
+
+
+def frame_length(data: bytes, pos: int) -> Optional[int]:
+    """Length in bytes of the frame starting at pos, or None if no valid frame starts there."""
+    if pos + 4 > len(data) or data[pos] != 0xFF or data[pos + 1] & 0xE0 != 0xE0:
+        return None
+    version = (data[pos + 1] >> 3) & 0x03
+    layer = 4 - ((data[pos + 1] >> 1) & 0x03)
+    bitrate_index = data[pos + 2] >> 4
+    rate_index = (data[pos + 2] >> 2) & 0x03
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None  # Reserved values, or free-format bitrate (length unknown)
+
+    mpeg1 = version == 3
+    bitrate = _BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    padding = (data[pos + 2] >> 1) & 0x01
+    if layer == 1:
+        length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 3 and not mpeg1:
+        length = 72 * bitrate // sample_rate + padding
+    else:
+        length = 144 * bitrate // sample_rate + padding
+    return length
+
+
+def _id3v2_size(data: bytes) -> int:
+    """Size of a leading ID3v2 tag (0 if there is none)."""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]  # Syncsafe integer
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def audio_frames(data: bytes) -> bytes:
+    """
+    Return only the audio frames of an MP3 clip.
+
+    Skips ID3 tags, the VBR header frame and any bytes between frames that
+    do not parse (APE tags, junk), so the result can be concatenated
+    with other clips of the same sample rate.
+    """
+    pos = _id3v2_size(data)
+    end = len(data) - 128 if data[-128:-125] == b"TAG" else len(data)  # ID3v1 trailer
+    frames: List[memoryview] = []
+    view = memoryview(data)
+    while pos + 4 <= end:
+        length = frame_length(data, pos)
+        if length is None or pos + length > end:
+            pos += 1  # Resynchronize on the next frame header
+            continue
+        if not frames and any(tag in data[pos + 4:pos + 64] for tag in _VBR_TAGS):
+            pos += length  # Xing/Info/VBRI frame describes the whole clip
+            continue
+        frames.append(view[pos:pos + length])
+        pos += length
+    return b"".join(frames)
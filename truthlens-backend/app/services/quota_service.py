@@ -0,0 +1,217 @@
+"""Client-side quota management for paid upstream APIs."""
+import asyncio
+import hashlib
+import time
+from enum import IntEnum
+from typing import Dict, Optional, Tuple
+from app.config import settings
+
+
+class Priority(IntEnum):
+    """Request priority classes (lower value = more urgent)."""
+    INTERACTIVE = 0  # User clicked "Verify" / "Listen"
+    BACKGROUND = 1   # Speculative pre-fetches and cache refreshes
+    BATCH = 2        # Bulk pre-scoring jobs
+
+
+class QuotaExceededError(Exception):
+    """Raised when an upstream call cannot be admitted within its wait budget."""
+
+    def __init__(self, upstream: str, retry_after: float):
+        self.upstream = upstream
+        self.retry_after = retry_after
+        super().__init__(f"{upstream} quota exhausted, retry in {retry_after:.1f}s")
+
+
+def mask_key(api_key: Optional[str]) -> str:
+    """Return a log-safe identifier for an API key."""
+    if not api_key:
+        return "none"
+    api_key = api_key.strip()
+    return f"...{api_key[-4:]}" if len(api_key) > 4 else "****"
+
+
+def key_id(api_key: Optional[str]) -> str:
+    """
+    Log-safe identity of an API key for keying state and metrics: the
+    masked key plus a short digest, so keys sharing their last four
+    characters stay apart.
+    """
+    if not api_key:
+        return "none"
+    api_key = api_key.strip()
+    return f"{mask_key(api_key)}#{hashlib.sha256(api_key.encode()).hexdigest()[:8]}"
+
+
+class TokenBucket:
+    """
+    Token bucket with priority-aware admission.
+
+    Interactive requests may drain the bucket completely. Lower priorities
+    can only spend tokens above a reserved floor and always yield to more
+    urgent waiters, so bulk work absorbs the throttling.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float, reserve: float):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.reserve = reserve
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.waiting = {p: 0 for p in Priority}
+        self.granted = {p: 0 for p in Priority}
+        self.rejected = {p: 0 for p in Priority}
+        self.upstream_remaining: Optional[str] = None
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def _floor(self, priority: Priority, cost: float) -> float:
+        if priority == Priority.INTERACTIVE:
+            return 0.0
+        # Each step down in priority keeps a larger share in reserve, but a
+        # full bucket must always be able to admit the request eventually
+        return min(self.reserve * self.capacity * priority, max(0.0, self.capacity - cost))
+
+    def _wait_time(self, priority: Priority, cost: float, now: float) -> float:
+        """Seconds until this request could be admitted (0 = admit now)."""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if any(self.waiting[p] for p in Priority if p < priority):
+            return max(cost / self.rate, 0.05)
+        deficit = cost + self._floor(priority, cost) - self.tokens
+        return deficit / self.rate if deficit > 0 else 0.0
+
+    async def acquire(self, priority: Priority, cost: float, max_wait: float) -> float:
+        """
+        Wait for tokens and consume them.
+
+        Args:
+            priority: Priority class of the caller
+            cost: Number of tokens to consume
+            max_wait: Maximum seconds to wait before giving up
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            QuotaExceededError: If tokens would not be available within max_wait
+        """
+        start = time.monotonic()
+        self.waiting[priority] += 1
+        try:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._wait_time(priority, cost, now)
+                if wait <= 0:
+                    self.tokens -= cost
+                    self.granted[priority] += 1
+                    return now - start
+                if now + wait - start > max_wait:
+                    self.rejected[priority] += 1
+                    raise QuotaExceededError(self.name, wait)
+                await asyncio.sleep(min(wait, 0.25))
+        finally:
+            self.waiting[priority] -= 1
+
+    def penalize(self, retry_after: float):
+        """Drain the bucket after an upstream 429 and hold it for retry_after."""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = 0.0
+        self.blocked_until = max(self.blocked_until, now + retry_after)
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        self._refill(now)
+        return {
+            "available": round(self.tokens, 2),
+            "capacity": self.capacity,
+            "rate_per_sec": self.rate,
+            "cooldown_remaining": round(max(0.0, self.blocked_until - now), 2),
+            "upstream_reported_remaining": self.upstream_remaining,
+            "waiting": {p.name.lower(): n for p, n in self.waiting.items()},
+            "granted": {p.name.lower(): n for p, n in self.granted.items()},
+            "rejected": {p.name.lower(): n for p, n in self.rejected.items()},
+        }
+
+
+class QuotaManager:
+    """Token buckets per upstream and per API key."""
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+
+    @staticmethod
+    def _limits(upstream: str) -> Tuple[float, float]:
+        rate, burst = settings.UPSTREAM_RATE_LIMITS.get(upstream, (1.0, 1.0))
+        return float(rate), float(burst)
+
+    def bucket(self, upstream: str, api_key: Optional[str]) -> TokenBucket:
+        """Get (or lazily create) the bucket for an upstream/key pair."""
+        bucket_key = (upstream, key_id(api_key))
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            rate, burst = self._limits(upstream)
+            bucket = TokenBucket(upstream, rate, burst, settings.QUOTA_BACKGROUND_RESERVE)
+            self._buckets[bucket_key] = bucket
+        return bucket
+
+    async def acquire(
+        self,
+        upstream: str,
+        api_key: Optional[str],
+        priority: Priority = Priority.INTERACTIVE,
+        cost: float = 1.0
+    ) -> float:
+        """
+        Reserve capacity for one upstream call.
+
+        Args:
+            upstream: Upstream name ("gemini", "brave", "aiornot", "elevenlabs")
+            api_key: API key the call will be made with
+            priority: Priority class of the caller
+            cost: Tokens to consume (1 per request by default)
+
+        Returns:
+            Seconds spent waiting for quota
+        """
+        max_wait = settings.QUOTA_MAX_WAIT.get(priority.name.lower(), 0.0)
+        try:
+            waited = await self.bucket(upstream, api_key).acquire(priority, cost, max_wait)
+        except QuotaExceededError:
+            print(f"⏳ {upstream} quota exhausted for {priority.name.lower()} request")
+            raise
+        if waited > 0.05:
+            print(f"⏳ {upstream} {priority.name.lower()} request throttled for {waited:.2f}s")
+        return waited
+
+    def report_rate_limited(self, upstream: str, api_key: Optional[str], retry_after: Optional[str] = None):
+        """Record an upstream 429 so further calls back off."""
+        try:
+            delay = float(retry_after) if retry_after else settings.QUOTA_DEFAULT_COOLDOWN
+        except ValueError:
+            delay = settings.QUOTA_DEFAULT_COOLDOWN
+        print(f"⚠️  {upstream} returned 429 for key {mask_key(api_key)}, cooling down {delay:.0f}s")
+        self.bucket(upstream, api_key).penalize(delay)
+
+    def report_remaining(self, upstream: str, api_key: Optional[str], remaining: Optional[str]):
+        """Record the remaining quota advertised by the upstream, if any."""
+        if remaining:
+            self.bucket(upstream, api_key).upstream_remaining = remaining
+
+    def snapshot(self) -> dict:
+        """Remaining quota per upstream and key."""
+        report: Dict[str, dict] = {}
+        for (upstream, key), bucket in sorted(self._buckets.items()):
+            report.setdefault(upstream, {})[key] = bucket.snapshot()
+        return report
+
+
+# Global quota manager instance
+quota_manager = QuotaManager()
@@ -0,0 +1,207 @@
+"""Priority request scheduling with weighted fair queuing."""
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+from app.config import settings
+from app.services.quota_service import Priority
+
+# Aliases accepted in the X-Priority header / request "priority" field
+PRIORITY_ALIASES = {
+    "interactive": Priority.INTERACTIVE,
+    "click": Priority.INTERACTIVE,
+    "background": Priority.BACKGROUND,
+    "prefetch": Priority.BACKGROUND,
+    "batch": Priority.BATCH,
+}
+
+
+class SchedulerRejectedError(Exception):
+    """Raised when a request is not admitted (queue full or deadline passed)."""
+
+    def __init__(self, message: str, status_code: int):
+        self.status_code = status_code
+        super().__init__(message)
+
+
+def parse_priority(value: Optional[str]) -> Priority:
+    """Map a client-supplied priority name to a Priority (default: interactive)."""
+    if not value:
+        return Priority.INTERACTIVE
+    return PRIORITY_ALIASES.get(value.strip().lower(), Priority.INTERACTIVE)
+
+
+def parse_deadline(value: Optional[str]) -> Optional[float]:
+    """Parse an absolute client deadline in Unix epoch milliseconds."""
+    if not value:
+        return None
+    try:
+        return float(value) / 1000.0
+    except ValueError:
+        return None
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _Waiter:
+    __slots__ = ("priority", "deadline", "future", "enqueued")
+
+    def __init__(self, priority: Priority, deadline: Optional[float], future: asyncio.Future):
+        self.priority = priority
+        self.deadline = deadline
+        self.future = future
+        self.enqueued = time.monotonic()
+
+
+class _ClassStats:
+    __slots__ = ("admitted", "expired", "shed", "queued", "waits")
+
+    def __init__(self):
+        self.admitted = 0
+        self.expired = 0
+        self.shed = 0
+        self.queued = 0
+        self.waits = deque(maxlen=1000)
+
+
+class RequestScheduler:
+    """
+    Admission control for the fact-check pipeline.
+
+    At most `max_concurrent` requests run at once. Excess requests wait in a
+    weighted fair queue: each priority class gets service in proportion to
+    its weight, so interactive clicks overtake queued pre-fetches and batch
+    work without starving them. Requests whose client deadline has passed
+    are dropped instead of being run.
+    """
+
+    def __init__(self, max_concurrent: int, weights: Dict[str, float], max_queue: int):
+        self.max_concurrent = max_concurrent
+        self.weights = {p: float(weights.get(p.name.lower(), 1.0)) for p in Priority}
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self._queue: list = []  # Heap of (finish_tag, seq, waiter)
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._last_finish = {p: 0.0 for p in Priority}
+        self._stats = {p: _ClassStats() for p in Priority}
+
+    async def acquire(self, priority: Priority, deadline: Optional[float] = None) -> float:
+        """
+        Wait for an execution slot.
+
+        Args:
+            priority: Priority class of the request
+            deadline: Absolute client deadline (Unix seconds), if any
+
+        Returns:
+            Seconds spent queued
+
+        Raises:
+            SchedulerRejectedError: If the queue is full or the deadline passes
+        """
+        stats = self._stats[priority]
+        if deadline is not None and deadline <= time.time():
+            stats.expired += 1
+            raise SchedulerRejectedError("Client deadline already passed", 504)
+
+        if self.in_flight < self.max_concurrent and not self._queue:
+            self.in_flight += 1
+            stats.admitted += 1
+            stats.waits.append(0.0)
+            return 0.0
+
+        if stats.queued >= self.max_queue:
+            stats.shed += 1
+            raise SchedulerRejectedError(f"{priority.name.lower()} queue is full", 503)
+
+        # Virtual finish time: a class with weight w advances 1/w per request
+        finish = max(self._virtual_time, self._last_finish[priority]) + 1.0 / self.weights[priority]
+        self._last_finish[priority] = finish
+        waiter = _Waiter(priority, deadline, asyncio.get_event_loop().create_future())
+        heapq.heappush(self._queue, (finish, next(self._seq), waiter))
+        stats.queued += 1
+
+        timeout = deadline - time.time() if deadline is not None else None
+        try:
+            await asyncio.wait_for(waiter.future, timeout)
+        except asyncio.TimeoutError:
+            stats.expired += 1
+            raise SchedulerRejectedError("Client deadline passed while queued", 504)
+        except asyncio.CancelledError:
+            # Slot was granted just as the caller went away - hand it on
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release()
+            raise
+        finally:
+            stats.queued -= 1
+
+        waited = time.monotonic() - waiter.enqueued
+        stats.admitted += 1
+        stats.waits.append(waited)
+        return waited
+
+    def release(self):
+        """Free an execution slot and admit the next queued request."""
+        self.in_flight -= 1
+        while self._queue and self.in_flight < self.max_concurrent:
+            finish, _, waiter = heapq.heappop(self._queue)
+            if waiter.future.done():
+                continue  # Abandoned by its caller
+            if waiter.deadline is not None and waiter.deadline <= time.time():
+                self._stats[waiter.priority].expired += 1
+                waiter.future.set_exception(
+                    SchedulerRejectedError("Client deadline passed while queued", 504)
+                )
+                continue
+            self._virtual_time = finish
+            self.in_flight += 1
+            waiter.future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: Priority = Priority.INTERACTIVE,
+        deadline: Optional[float] = None
+    ) -> AsyncIterator[float]:
+        """Hold an execution slot for the duration of the block."""
+        waited = await self.acquire(priority, deadline)
+        try:
+            yield waited
+        finally:
+            self.release()
+
+    def snapshot(self) -> dict:
+        """Queue depth, admissions, drops and wait percentiles per class."""
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrent": self.max_concurrent,
+            "classes": {
+                p.name.lower(): {
+                    "weight": self.weights[p],
+                    "queued": s.queued,
+                    "admitted": s.admitted,
+                    "expired": s.expired,
+                    "shed": s.shed,
+                    "wait_p50": round(_percentile(list(s.waits), 0.50), 3),
+                    "wait_p95": round(_percentile(list(s.waits), 0.95), 3),
+                }
+                for p, s in self._stats.items()
+            },
+        }
+
+
+# Global scheduler for the fact-check pipeline
+request_scheduler = RequestScheduler(
+    settings.SCHEDULER_MAX_CONCURRENT,
+    settings.SCHEDULER_WEIGHTS,
+    settings.SCHEDULER_MAX_QUEUE
+)
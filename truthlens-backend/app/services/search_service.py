@@ -1,12 +1,20 @@
 """Search service for finding relevant sources."""
 import requests
 import asyncio
-from typing import List
-from concurrent.futures import ThreadPoolExecutor
+import orjson
+import re
+from typing import FrozenSet, List
 from app.config import settings
+from app.container import container
+from app.models import SearchHit
+from app.services.deadline import ensure_live
+from app.services.evidence_index import evidence_index
+from app.services.key_pool import brave_keys
+from app.services.quota_service import Priority, QuotaExceededError, quota_manager
 
-# Thread pool for async operations
-executor = ThreadPoolExecutor(max_workers=settings.MAX_WORKERS)
+
+class SearchUnavailableError(Exception):
+    """Raised when Brave Search could not be queried (transport error, timeout, 4xx/5xx)."""
 
 
 class SearchService:
@@ -15,22 +23,124 @@ class SearchService:
     # Blacklisted domains to exclude from results
     BLACKLISTED_DOMAINS = ["wikipedia.org", "en.wikipedia.org", "youtube.com", "youtu.be", "www.christianpost.com"]
     
+    # Words ignored when comparing queries for overlap
+    STOPWORDS = frozenset([
+        "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in",
+        "is", "it", "of", "on", "or", "that", "the", "this", "to", "was", "were", "will", "with"
+    ])
+    
+    @staticmethod
+    def _query_terms(query: str) -> FrozenSet[str]:
+        """Significant lowercase terms of a search query."""
+        return frozenset(
+            word for word in re.findall(r"[a-z0-9]+", query.lower())
+            if word not in SearchService.STOPWORDS
+        )
+    
+    @staticmethod
+    async def search_claims(claims: List[str], priority: Priority = Priority.INTERACTIVE) -> List[List[SearchHit]]:
+        """
+        Search for several claims concurrently, sharing overlapping searches.
+        
+        Claims whose query terms overlap by at least CLAIM_QUERY_OVERLAP
+        (Jaccard) are answered by a single search for the first of them, so
+        near-duplicate claims cost one Brave call.
+        
+        Args:
+            claims: Claims to search for, most significant first
+            priority: Priority class used for quota admission
+            
+        Returns:
+            One result list per claim, in the same order
+            
+        Raises:
+            QuotaExceededError, SearchUnavailableError: As search_brave
+        """
+        queries: List[str] = []
+        query_terms: List[FrozenSet[str]] = []
+        assignment: List[int] = []
+        for claim in claims:
+            terms = SearchService._query_terms(claim)
+            for i, existing in enumerate(query_terms):
+                union = terms | existing
+                if union and len(terms & existing) / len(union) >= settings.CLAIM_QUERY_OVERLAP:
+                    assignment.append(i)
+                    break
+            else:
+                assignment.append(len(queries))
+                queries.append(claim)
+                query_terms.append(terms)
+        
+        if len(queries) < len(claims):
+            print(f"🔗 {len(claims)} claims share {len(queries)} searches")
+        
+        results = await asyncio.gather(*(
+            SearchService.search_claim(query, priority) for query in queries
+        ))
+        return [results[i] for i in assignment]
+    
     @staticmethod
-    async def search_claim(claim: str) -> List[dict]:
+    async def search_claim(claim: str, priority: Priority = Priority.INTERACTIVE) -> List[SearchHit]:
+        """
+        Find sources for a claim, consulting the local evidence index first.
+        
+        Enough strong matches among imported fact-check records (covering
+        most of the claim's terms) answer the claim without a Brave call.
+        Sources of past verdicts never do: this pipeline's own earlier
+        conclusions must not stand in for fresh evidence (e.g. "X died" vs
+        "X did not die"); they are merged ahead of the Brave results like
+        weaker matches.
+        
+        Args:
+            claim: The claim text to search for
+            priority: Priority class used for quota admission
+            
+        Returns:
+            List of SearchHit with title, url, content, published_date
+            
+        Raises:
+            QuotaExceededError, SearchUnavailableError: As search_brave
+        """
+        if not settings.EVIDENCE_INDEX_ENABLED:
+            return await SearchService.search_brave(claim, priority)
+        
+        matches = await evidence_index.search(SearchService._query_terms(claim), settings.MAX_SOURCES)
+        strong = [
+            hit for coverage, hit, origin in matches
+            if coverage >= settings.EVIDENCE_INDEX_STRONG_MATCH and origin != "verdict"
+        ]
+        if len(strong) >= settings.EVIDENCE_INDEX_MIN_STRONG:
+            evidence_index.local_answers += 1
+            print(f"📚 Local evidence: {len(strong)} strong match(es), skipping Brave")
+            return strong
+        
+        local = [hit for coverage, hit, _ in matches if coverage >= settings.EVIDENCE_INDEX_WEAK_MATCH]
+        results = await SearchService.search_brave(claim, priority)
+        if not local:
+            return results
+        
+        evidence_index.merged += 1
+        local_urls = {hit.url for hit in local}
+        return (local + [hit for hit in results if hit.url not in local_urls])[:settings.MAX_SOURCES]
+    
+    @staticmethod
+    async def search_brave(claim: str, priority: Priority = Priority.INTERACTIVE) -> List[SearchHit]:
         """
         Search for sources using Brave Search API.
         
         Args:
             claim: The claim text to search for
+            priority: Priority class used for quota admission
             
         Returns:
-            List of search results with title, url, content, published_date
+            List of SearchHit with title, url, content, published_date
+            (empty only when Brave found nothing)
+            
+        Raises:
+            QuotaExceededError: No Brave quota within the priority's wait budget
+            SearchUnavailableError: The search failed
         """
         try:
-            headers = {
-                "Accept": "application/json",
-                "X-Subscription-Token": settings.BRAVE_API_KEY
-            }
             params = {
                 "q": claim,
                 "count": settings.SEARCH_RESULT_COUNT,
@@ -38,17 +148,33 @@ class SearchService:
             }
             
             loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                executor,
-                lambda: requests.get(
-                    settings.BRAVE_SEARCH_URL,
-                    headers=headers,
-                    params=params,
-                    timeout=settings.SEARCH_TIMEOUT
-                )
-            )
+            rate_limited_keys = set()
+            for _ in range(min(settings.KEY_POOL_MAX_ATTEMPTS, len(brave_keys))):
+                async with brave_keys.lease(priority, exclude=rate_limited_keys) as api_key:
+                    ensure_live()
+                    headers = {
+                        "Accept": "application/json",
+                        "X-Subscription-Token": api_key
+                    }
+                    response = await loop.run_in_executor(
+                        container.executor("brave"),
+                        lambda: requests.get(
+                            settings.BRAVE_SEARCH_URL,
+                            headers=headers,
+                            params=params,
+                            timeout=settings.SEARCH_TIMEOUT
+                        )
+                    )
+                    quota_manager.report_remaining(
+                        "brave", api_key, response.headers.get("X-RateLimit-Remaining")
+                    )
+                    if response.status_code != 429:
+                        break
+                    # Retry once on another key before giving up
+                    brave_keys.report_rate_limited(api_key, response.headers.get("Retry-After"))
+                    rate_limited_keys.add(api_key)
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # Parse and filter results
             results = []
@@ -62,12 +188,7 @@ class SearchService:
                         continue
                     
                     if any(domain in url_lower for domain in settings.TRUSTED_DOMAINS):
-                        results.append({
-                            "title": result.get("title", "N/A"),
-                            "url": result.get("url", ""),
-                            "content": result.get("description", ""),
-                            "published_date": result.get("age", None)
-                        })
+                        results.append(SearchHit.from_brave(result))
                         if len(results) >= settings.MAX_SOURCES:
                             break
                 
@@ -81,17 +202,14 @@ class SearchService:
                             continue
                         
                         if not any(domain in url_lower for domain in settings.TRUSTED_DOMAINS):
-                            results.append({
-                                "title": result.get("title", "N/A"),
-                                "url": result.get("url", ""),
-                                "content": result.get("description", ""),
-                                "published_date": result.get("age", None)
-                            })
+                            results.append(SearchHit.from_brave(result))
                             if len(results) >= settings.MAX_SOURCES:
                                 break
             
             return results[:settings.MAX_SOURCES]
             
+        except QuotaExceededError:
+            raise
         except Exception as e:
             print(f"Error searching claim: {str(e)}")
-            return []
+            raise SearchUnavailableError(str(e) or type(e).__name__) from e
@@ -0,0 +1,216 @@
+"""Claim frequency tracking and background pre-verification of trending claims."""
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
+from app.services.cluster import cluster
+from app.services.quota_service import Priority
+from app.services.scheduler import request_scheduler
+from app.services.verdict_cache import claim_hash, normalize_claim, verdict_cache
+from app.services.verification_service import VerificationService
+
+
+class CountMinSketch:
+    """Fixed-memory frequency estimator (overestimates, never underestimates)."""
+
+    def __init__(self, width: int, depth: int):
+        self.width = width
+        self.depth = depth
+        self.rows = [[0] * width for _ in range(depth)]
+
+    def _indexes(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8 * self.depth).digest()
+        return [
+            int.from_bytes(digest[8 * i:8 * i + 8], "little") % self.width
+            for i in range(self.depth)
+        ]
+
+    def add(self, key: str, count: int = 1) -> int:
+        """Increment a key and return its new estimated count."""
+        estimate = None
+        for row, index in zip(self.rows, self._indexes(key)):
+            row[index] += count
+            estimate = row[index] if estimate is None else min(estimate, row[index])
+        return estimate or 0
+
+    def estimate(self, key: str) -> int:
+        return min(row[index] for row, index in zip(self.rows, self._indexes(key)))
+
+    def decay(self):
+        """Halve every counter so old popularity fades."""
+        for row in self.rows:
+            for i, value in enumerate(row):
+                row[i] = value >> 1
+
+
+class TrendingTracker:
+    """
+    Heavy-hitter tracking over normalized claim text.
+
+    Counts live in a count-min sketch; a small candidate set remembers the
+    current top keys and one representative original text for each, which
+    the pre-verification worker needs to recompute the verdict.
+    """
+
+    def __init__(self, top_k: int, width: int = 2048, depth: int = 4):
+        self.top_k = top_k
+        self.capacity = top_k * 4
+        self.sketch = CountMinSketch(width, depth)
+        self._candidates: Dict[str, Tuple[int, str]] = {}  # key -> (estimate, text)
+
+    def record(self, text: str) -> str:
+        """Count one request for this text and return its cache key."""
+        key = claim_hash(text)
+        if not normalize_claim(text):
+            return key
+        estimate = self.sketch.add(key)
+        if key in self._candidates or len(self._candidates) < self.capacity:
+            self._candidates[key] = (estimate, text.strip())
+        else:
+            weakest = min(self._candidates, key=lambda k: self._candidates[k][0])
+            if estimate > self._candidates[weakest][0]:
+                del self._candidates[weakest]
+                self._candidates[key] = (estimate, text.strip())
+        return key
+
+    def top(self, k: Optional[int] = None) -> List[Tuple[str, int, str]]:
+        """Top-k (key, estimated count, text), most frequent first."""
+        ranked = sorted(
+            ((key, est, text) for key, (est, text) in self._candidates.items()),
+            key=lambda item: item[1],
+            reverse=True
+        )
+        return ranked[:k or self.top_k]
+
+    def decay(self):
+        """Age all counts so the ranking follows what is trending now."""
+        self.sketch.decay()
+        self._candidates = {
+            key: (est >> 1, text)
+            for key, (est, text) in self._candidates.items()
+            if est >> 1 > 0
+        }
+
+
+def _parse_hours(spec: str) -> List[Tuple[int, int]]:
+    """Parse "0-6,22-24" into [(0, 6), (22, 24)]."""
+    windows = []
+    for part in spec.split(","):
+        if "-" in part:
+            start, end = part.split("-", 1)
+            windows.append((int(start), int(end)))
+    return windows
+
+
+class PreverificationWorker:
+    """
+    Background task that keeps trending claims warm in the verdict cache.
+
+    Every cycle it refreshes top-K claims whose cached verdict is missing or
+    close to expiry, at background priority and within a per-cycle budget
+    (larger during off-peak hours). Cycles are skipped while the request
+    scheduler is busy so user traffic always comes first.
+    """
+
+    def __init__(self, tracker: TrendingTracker):
+        self.tracker = tracker
+        self._task: Optional[asyncio.Task] = None
+        self._last_decay = time.monotonic()
+        self.cycles = 0
+        self.refreshed = 0
+        self.failed = 0
+        self.skipped_busy = 0
+
+    def start(self):
+        if self._task is None and settings.PREVERIFY_ENABLED:
+            self._task = asyncio.create_task(self._run())
+            print("✓ Pre-verification worker started")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @staticmethod
+    def off_peak(now: Optional[datetime] = None) -> bool:
+        hour = (now or datetime.now(timezone.utc)).hour
+        return any(start <= hour < end for start, end in _parse_hours(settings.PREVERIFY_OFF_PEAK_HOURS))
+
+    def budget(self) -> int:
+        return settings.PREVERIFY_OFF_PEAK_BUDGET if self.off_peak() else settings.PREVERIFY_BUDGET_PER_CYCLE
+
+    def due(self) -> List[Tuple[str, str]]:
+        """Trending (key, text) pairs whose verdict is missing or about to expire."""
+        due = []
+        for key, count, text in self.tracker.top():
+            if count < settings.PREVERIFY_MIN_COUNT:
+                continue
+            if cluster.enabled and cluster.owner(key) != cluster.self_url:
+                continue  # Kept warm by the replica that caches it
+            remaining = verdict_cache.expires_in(key)
+            if remaining is None or remaining < settings.PREVERIFY_REFRESH_AHEAD:
+                due.append((key, text))
+        return due
+
+    async def run_cycle(self) -> int:
+        """Run one refresh pass and return the number of verdicts refreshed."""
+        self.cycles += 1
+        load = request_scheduler.in_flight / max(1, request_scheduler.max_concurrent)
+        if load > settings.PREVERIFY_MAX_LOAD:
+            self.skipped_busy += 1
+            return 0
+
+        refreshed = 0
+        for key, text in self.due()[:self.budget()]:
+            try:
+                result = await VerificationService.verify(text, Priority.BACKGROUND, use_cache=False)
+                if result.label != "Error":
+                    refreshed += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"Pre-verification failed for {key[:12]}: {str(e)}")
+        self.refreshed += refreshed
+        if refreshed:
+            print(f"🔥 Pre-verified {refreshed} trending claim(s)")
+        return refreshed
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.PREVERIFY_INTERVAL)
+            if time.monotonic() - self._last_decay >= settings.TRENDING_DECAY_INTERVAL:
+                self.tracker.decay()
+                self._last_decay = time.monotonic()
+            try:
+                await self.run_cycle()
+            except Exception as e:
+                print(f"Error in pre-verification cycle: {str(e)}")
+
+    def snapshot(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "off_peak": self.off_peak(),
+            "budget_per_cycle": self.budget(),
+            "cycles": self.cycles,
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+            "skipped_busy": self.skipped_busy,
+            "trending": [
+                {
+                    "claim_hash": key,
+                    "count": count,
+                    "expires_in": round(verdict_cache.expires_in(key) or 0.0, 1)
+                }
+                for key, count, _ in self.tracker.top()
+            ],
+        }
+
+
+# Global tracker and worker
+trending_tracker = TrendingTracker(settings.PREVERIFY_TOP_K)
+preverification_worker = PreverificationWorker(trending_tracker)
@@ -0,0 +1,164 @@
+"""
+Pluggable text-to-speech backends.
+
+A backend turns narration segments into a stream of audio chunks. The
+ElevenLabs backend (in tts_service.py) streams MP3 assembled from cached
+phrase audio; LocalBackend runs a CPU engine in the "tts" process pool and
+streams WAV, costing no quota and no network round-trip.
+TTSService.stream_fact_check_speech picks the backend order from
+TTS_BACKEND_POLICY.
+"""
+import asyncio
+import re
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, List, Optional
+from app.config import settings
+from app.container import container
+from app.services.local_tts import engine_available, synthesize_pcm, wav_header
+from app.services.quota_service import Priority
+
+
+class TTSBackend(ABC):
+    """A speech synthesizer that streams audio for narration segments."""
+
+    name: str = ""
+    media_type: str = ""
+    extension: str = ""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.narrations = 0
+        self.failures = 0
+
+    @abstractmethod
+    def available(self) -> bool:
+        """Whether the backend is configured and installed."""
+
+    @abstractmethod
+    def stream(self, segments: List[str], priority: Priority) -> AsyncIterator[bytes]:
+        """Yield audio chunks for the segments, in speaking order."""
+
+    async def open(self, segments: List[str], priority: Priority, timeout: Optional[float]) -> "SpeechStream":
+        """
+        Start a narration and wait for its first audio.
+
+        Args:
+            segments: Narration segments in speaking order
+            priority: Priority class used for quota admission
+            timeout: Seconds to wait for the first chunk (None = no limit)
+
+        Returns:
+            The stream, with its first chunk already received
+
+        Raises:
+            asyncio.TimeoutError: No audio within the timeout
+            Exception: The backend failed before producing audio
+        """
+        chunks = self.stream(segments, priority)
+        self.in_flight += 1
+        try:
+            first = await asyncio.wait_for(chunks.__anext__(), timeout)
+        except BaseException as e:
+            self.in_flight -= 1
+            if not isinstance(e, asyncio.CancelledError):
+                self.failures += 1
+            await chunks.aclose()
+            raise
+        self.narrations += 1
+        return SpeechStream(self, first, chunks)
+
+    def snapshot(self) -> dict:
+        return {
+            "available": self.available(),
+            "in_flight": self.in_flight,
+            "narrations": self.narrations,
+            "failures": self.failures,
+        }
+
+
+class SpeechStream:
+    """
+    Audio from one backend: the first chunk is in hand, the rest streams in.
+
+    The stream holds one of the backend's in-flight slots until it is read
+    to the end or closed; a response that may never be iterated (the client
+    left first) must call close() when it is done.
+    """
+
+    def __init__(self, backend: TTSBackend, first: bytes, rest: AsyncIterator[bytes]):
+        self.backend = backend
+        self.media_type = backend.media_type
+        self.extension = backend.extension
+        self._first = first
+        self._rest = rest
+        self._closed = False
+
+    async def __aiter__(self):
+        try:
+            yield self._first
+            async for chunk in self._rest:
+                yield chunk
+        finally:
+            await self.close()
+
+    async def close(self):
+        """Release the in-flight slot and stop the backend (idempotent)."""
+        if self._closed:
+            return
+        self._closed = True
+        self.backend.in_flight -= 1
+        await self._rest.aclose()
+
+    async def read(self) -> bytes:
+        """Collect the whole narration."""
+        return b"".join([chunk async for chunk in self])
+
+
+class LocalBackend(TTSBackend):
+    """
+    Piper / eSpeak NG synthesis in worker processes.
+
+    The narration is split into sentences that are synthesized in parallel
+    across the pool; the WAV header and first sentence are sent as soon as
+    that sentence is ready, and later sentences follow in order.
+    """
+
+    name = "local"
+    media_type = "audio/wav"
+    extension = "wav"
+
+    def __init__(self):
+        super().__init__()
+        self._available: Optional[bool] = None
+
+    def available(self) -> bool:
+        if self._available is None:
+            self._available = engine_available(settings.TTS_LOCAL_ENGINE, settings.TTS_LOCAL_VOICE)
+        return self._available
+
+    def warm(self):
+        """Start the worker processes now rather than on the first narration."""
+        pool = container.process_pool("tts", settings.TTS_LOCAL_WORKERS)
+        for _ in range(settings.TTS_LOCAL_WORKERS):
+            pool.submit(engine_available, settings.TTS_LOCAL_ENGINE, settings.TTS_LOCAL_VOICE)
+
+    async def stream(self, segments: List[str], priority: Priority) -> AsyncIterator[bytes]:
+        sentences = [s for s in re.split(r"(?<=[.!?:])\s+", " ".join(segments)) if s.strip()]
+        loop = asyncio.get_running_loop()
+        pool = container.process_pool("tts", settings.TTS_LOCAL_WORKERS)
+        futures = [
+            loop.run_in_executor(pool, synthesize_pcm, settings.TTS_LOCAL_ENGINE, settings.TTS_LOCAL_VOICE, sentence)
+            for sentence in sentences
+        ]
+        try:
+            for i, future in enumerate(futures):
+                sample_rate, pcm = await future
+                yield wav_header(sample_rate) + pcm if i == 0 else pcm
+        finally:
+            # Sentences not yet picked up by a worker are dropped
+            for future in futures:
+                future.cancel()
+
+
+# Global local backend
+local_backend = LocalBackend()
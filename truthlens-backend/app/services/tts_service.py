@@ -1,60 +1,151 @@
-"""Text-to-speech service using ElevenLabs."""
-import httpx
-from typing import Optional
-from datetime import datetime
+"""Text-to-speech service: ElevenLabs narration with a local engine fallback."""
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional
 from app.config import settings
+from app.container import container
 from app.models import FactCheckResponse
+from app.services.mp3 import audio_frames
+from app.services.quota_service import Priority, quota_manager
+from app.services.tts_backends import SpeechStream, TTSBackend, local_backend
+
+
+class PhraseAudioCache:
+    """
+    Byte-bounded LRU cache of synthesized narration segments.
+
+    Keyed by voice, model, output format and text; values are bare MP3
+    frames (tags stripped) ready to be concatenated.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.chars_synthesized = 0
+        self.chars_from_cache = 0
+
+    @staticmethod
+    def key(text: str, voice: str) -> str:
+        spec = f"{voice}|{settings.ELEVENLABS_MODEL_ID}|{settings.ELEVENLABS_OUTPUT_FORMAT}|{text}"
+        return hashlib.sha256(spec.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached audio (marking it recently used), or None."""
+        audio = self._entries.get(key)
+        if audio is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return audio
+
+    def put(self, key: str, audio: bytes):
+        """Store audio, evicting least recently used clips past the byte budget."""
+        if len(audio) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.bytes -= len(previous)
+        self._entries[key] = audio
+        self.bytes += len(audio)
+        while self.bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= len(evicted)
+
+    def snapshot(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "chars_synthesized": self.chars_synthesized,
+            "chars_from_cache": self.chars_from_cache,
+        }
+
+
+# Global phrase audio cache
+phrase_cache = PhraseAudioCache(settings.TTS_PHRASE_CACHE_MAX_BYTES)
+
+# In-flight segment syntheses by cache key, so concurrent narrations share them
+_in_flight: Dict[str, asyncio.Task] = {}
 
 
 class TTSService:
     """Service for generating text-to-speech audio using ElevenLabs."""
     
     @staticmethod
-    def format_fact_check_for_speech(
+    def speech_segments(
         claim: str,
         result: FactCheckResponse
-    ) -> str:
+    ) -> List[str]:
         """
-        Format a fact check result into a speech-friendly text.
+        Split the narration of a fact check result into segments.
+        
+        Boilerplate phrases, verdict sentences, source titles and ages recur
+        across narrations and are synthesized once; in practice only the
+        claim and the explanation are new. Segments are joined with spaces
+        to form the full narration.
         
         Args:
             claim: The original claim that was fact-checked
             result: The fact check response from the API
             
         Returns:
-            Formatted text ready for text-to-speech conversion
+            Narration segments in speaking order
         """
         # Start with the claim
-        speech_text = f"The tweet claims that {claim}. "
+        segments = ["The tweet claims that", f"{claim}."]
         
         # Add the fact check result
-        speech_text += f"After fact check, it has been determined that this post is {result.label.lower()}. "
+        segments.append(f"After fact check, it has been determined that this post is {result.label.lower()}.")
         
         # Add the explanation
-        speech_text += f"{result.explanation} "
+        segments.append(result.explanation)
         
         # Add source information
         if result.sources and len(result.sources) > 0:
-            speech_text += "This information is based on the following sources: "
+            segments.append("This information is based on the following sources:")
             
             for i, source in enumerate(result.sources):
                 # Add source number and title
-                speech_text += f"Source {i + 1}: {source.title}. "
+                segments.append(f"Source {i + 1}:")
+                segments.append(f"{source.title}.")
                 
                 # Add age information if available
                 if source.published_date:
-                    # Parse the published_date to get relative age
-                    age_str = source.published_date
-                    speech_text += f"Published {age_str}. "
+                    segments.append(f"Published {source.published_date}.")
         else:
-            speech_text += "No sources were found to verify this claim."
+            segments.append("No sources were found to verify this claim.")
         
-        return speech_text
+        return [segment for segment in segments if segment.strip()]
+    
+    @staticmethod
+    def format_fact_check_for_speech(
+        claim: str,
+        result: FactCheckResponse
+    ) -> str:
+        """
+        Format a fact check result into a speech-friendly text.
+        
+        Args:
+            claim: The original claim that was fact-checked
+            result: The fact check response from the API
+            
+        Returns:
+            Formatted text ready for text-to-speech conversion
+        """
+        return " ".join(TTSService.speech_segments(claim, result))
     
     @staticmethod
     async def generate_speech(
         text: str,
-        voice_id: Optional[str] = None
+        voice_id: Optional[str] = None,
+        priority: Priority = Priority.INTERACTIVE
     ) -> bytes:
         """
         Generate speech audio from text using ElevenLabs API.
@@ -62,6 +153,7 @@ class TTSService:
         Args:
             text: The text to convert to speech
             voice_id: Optional custom voice ID (uses default if not provided)
+            priority: Priority class used for quota admission
             
         Returns:
             Audio data as bytes (MP3 format)
@@ -87,27 +179,186 @@ class TTSService:
         # Request body
         payload = {
             "text": text,
-            "model_id": "eleven_multilingual_v2",  # Better quality model
+            "model_id": settings.ELEVENLABS_MODEL_ID,
             "voice_settings": {
                 "stability": 0.5,  # Balanced stability
                 "similarity_boost": 0.75  # Good clarity
             }
         }
         
+        await quota_manager.acquire("elevenlabs", settings.ELEVENLABS_API_KEY, priority)
+        
         # Make the API call
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                url,
-                headers=headers,
-                json=payload
+        response = await container.http_client().post(
+            url,
+            params={"output_format": settings.ELEVENLABS_OUTPUT_FORMAT},
+            headers=headers,
+            json=payload,
+            timeout=30.0
+        )
+        
+        if response.status_code == 429:
+            quota_manager.report_rate_limited(
+                "elevenlabs", settings.ELEVENLABS_API_KEY, response.headers.get("Retry-After")
             )
+        
+        if response.status_code != 200:
+            error_text = response.text
+            raise Exception(f"ElevenLabs API error ({response.status_code}): {error_text}")
+        
+        # Return the audio data
+        return response.content
+    
+    @staticmethod
+    async def _synthesize_segment(text: str, key: Optional[str], voice: str, priority: Priority) -> bytes:
+        """Synthesize one segment (or merged run), caching it when it has a key."""
+        audio = audio_frames(await TTSService.generate_speech(text, voice, priority))
+        if not audio:
+            raise Exception("ElevenLabs returned no MP3 audio frames")
+        phrase_cache.chars_synthesized += len(text)
+        if key is not None:
+            phrase_cache.put(key, audio)
+        return audio
+    
+    @staticmethod
+    def _segment_task(text: str, key: str, voice: str, priority: Priority) -> asyncio.Task:
+        """Start (or join) the synthesis of one cacheable segment."""
+        task = _in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(TTSService._synthesize_segment(text, key, voice, priority))
+            _in_flight[key] = task
+            task.add_done_callback(lambda _: TTSService._segment_done(key, task))
+        return task
+    
+    @staticmethod
+    def _segment_done(key: str, task: asyncio.Task):
+        _in_flight.pop(key, None)
+        # Narrations may all have given up on this segment, so nobody else sees the error
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Error synthesizing TTS segment: {str(task.exception()) or type(task.exception()).__name__}")
+    
+    @staticmethod
+    async def stream_segmented_speech(
+        segments: List[str],
+        voice_id: Optional[str] = None,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream speech for a narration from cached and freshly synthesized segments.
+        
+        Cached segments cost nothing; missing ones are synthesized
+        concurrently and cached. To bound upstream calls per narration, at
+        most TTS_MAX_SEGMENT_CALLS requests are made: past that, everything
+        from the last allowed missing segment to the end is synthesized as
+        one (uncached) run. MP3 frames are concatenated in order without
+        re-encoding. The first chunk is everything up to and including the
+        first synthesized segment (so a slow upstream shows up before any
+        audio is sent); later segments are yielded as each becomes ready.
+        
+        Args:
+            segments: Narration segments in speaking order
+            voice_id: Optional custom voice ID (uses default if not provided)
+            priority: Priority class used for quota admission
+            
+        Yields:
+            MP3 audio chunks
+        """
+        voice = voice_id or settings.ELEVENLABS_VOICE_ID
+        keys = [PhraseAudioCache.key(segment, voice) for segment in segments]
+        parts: List[Optional[bytes]] = [phrase_cache.get(key) for key in keys]
+        missing = [i for i, audio in enumerate(parts) if audio is None]
+        
+        jobs: Dict[int, asyncio.Future] = {}
+        for n, i in enumerate(missing):
+            if n == settings.TTS_MAX_SEGMENT_CALLS - 1 and n < len(missing) - 1:
+                # Over the call budget: synthesize the rest of the narration in one go
+                tail = " ".join(segments[i:])
+                jobs[i] = asyncio.create_task(TTSService._synthesize_segment(tail, None, voice, priority))
+                parts[i + 1:] = [b""] * (len(segments) - i - 1)
+                break
+            # shield: a segment shared with other narrations must outlive this one
+            jobs[i] = asyncio.shield(TTSService._segment_task(segments[i], keys[i], voice, priority))
+        
+        phrase_cache.chars_from_cache += sum(len(segments[i]) for i, audio in enumerate(parts) if audio)
+        try:
+            ready: List[bytes] = []
+            synthesized = False
+            for i, audio in enumerate(parts):
+                if audio is None:
+                    audio = await jobs[i]
+                    synthesized = True
+                ready.append(audio)
+                if synthesized:
+                    yield b"".join(ready)
+                    ready = []
+            if ready:
+                yield b"".join(ready)
+        finally:
+            for job in jobs.values():
+                if not job.done():
+                    # Abandoned narration: shared segments keep going (shielded) and get cached
+                    job.cancel()
+                elif not job.cancelled():
+                    job.exception()  # Mark retrieved so unused failures are not logged
+    
+    @staticmethod
+    async def stream_fact_check_speech(
+        claim: str,
+        result: FactCheckResponse,
+        priority: Priority = Priority.INTERACTIVE
+    ) -> SpeechStream:
+        """
+        Start narrating a fact check result on the first backend that delivers.
+        
+        Backends are tried in TTS_BACKEND_POLICY order. Every backend but
+        the last gets TTS_FIRST_AUDIO_TIMEOUT seconds to produce its first
+        audio; on timeout or error the next one takes over.
+        
+        Args:
+            claim: The original claim that was fact-checked
+            result: The fact check response from the API
+            priority: Priority class used for quota admission
             
-            if response.status_code != 200:
-                error_text = response.text
-                raise Exception(f"ElevenLabs API error ({response.status_code}): {error_text}")
+        Returns:
+            The audio stream (MP3 or WAV, see its media_type)
             
-            # Return the audio data
-            return response.content
+        Raises:
+            Exception: If no backend is available or the last one fails
+        """
+        backends = TTSService.backend_order()
+        if not backends:
+            raise Exception("No text-to-speech backend available (set ELEVENLABS_API_KEY or install a local engine)")
+        
+        segments = TTSService.speech_segments(claim, result)
+        for n, backend in enumerate(backends):
+            last = n == len(backends) - 1
+            try:
+                return await backend.open(segments, priority, None if last else settings.TTS_FIRST_AUDIO_TIMEOUT)
+            except Exception as e:
+                if last:
+                    raise
+                reason = str(e) or type(e).__name__
+                print(f"⚠️  {backend.name} TTS failed ({reason}), falling back to {backends[n + 1].name}")
+    
+    @staticmethod
+    def backend_order() -> List[TTSBackend]:
+        """
+        Available backends in the order TTS_BACKEND_POLICY tries them.
+        
+        elevenlabs_first tries the local engine first while at least
+        TTS_LOCAL_WHEN_BUSY narrations are already waiting on ElevenLabs.
+        """
+        policy = settings.TTS_BACKEND_POLICY
+        if policy == "elevenlabs":
+            order = [elevenlabs_backend]
+        elif policy == "local":
+            order = [local_backend]
+        elif policy == "local_first":
+            order = [local_backend, elevenlabs_backend]
+        else:
+            busy = 0 < settings.TTS_LOCAL_WHEN_BUSY <= elevenlabs_backend.in_flight
+            order = [local_backend, elevenlabs_backend] if busy else [elevenlabs_backend, local_backend]
+        return [backend for backend in order if backend.available()]
     
     @staticmethod
     async def generate_fact_check_speech(
@@ -122,10 +373,29 @@ class TTSService:
             result: The fact check response from the API
             
         Returns:
-            Audio data as bytes (MP3 format)
+            Audio data as bytes (MP3 or WAV, depending on the backend used)
         """
-        # Format the text for speech
-        speech_text = TTSService.format_fact_check_for_speech(claim, result)
-        
-        # Generate the audio
-        return await TTSService.generate_speech(speech_text)
+        stream = await TTSService.stream_fact_check_speech(claim, result)
+        return await stream.read()
+
+
+class ElevenLabsBackend(TTSBackend):
+    """ElevenLabs narration, assembled from cached phrase audio when TTS_SEGMENTED."""
+    
+    name = "elevenlabs"
+    media_type = "audio/mpeg"
+    extension = "mp3"
+    
+    def available(self) -> bool:
+        return bool(settings.ELEVENLABS_API_KEY)
+    
+    async def stream(self, segments: List[str], priority: Priority) -> AsyncIterator[bytes]:
+        if settings.TTS_SEGMENTED:
+            async for chunk in TTSService.stream_segmented_speech(segments, priority=priority):
+                yield chunk
+        else:
+            yield await TTSService.generate_speech(" ".join(segments), priority=priority)
+
+
+# Global ElevenLabs backend
+elevenlabs_backend = ElevenLabsBackend()
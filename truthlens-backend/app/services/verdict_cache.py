@@ -0,0 +1,160 @@
+"""In-memory TTL caches of fact-check verdicts (and partial pipeline results) keyed by normalized claim text."""
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import List, Optional
+from app.config import settings
+from app.models import FactCheckResponse, SearchHit
+
+
+def normalize_claim(text: str) -> str:
+    """
+    Normalize post text so trivially different copies share a cache key.
+
+    Lowercases, drops URLs, @mentions and punctuation, and collapses
+    whitespace.
+    """
+    text = text.lower()
+    text = re.sub(r'https?://\S+', ' ', text)
+    text = re.sub(r'@\w+', ' ', text)
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return ' '.join(text.split())
+
+
+def claim_hash(text: str) -> str:
+    """Content hash of the normalized text (used as cache and resource key)."""
+    return hashlib.sha256(normalize_claim(text).encode("utf-8")).hexdigest()
+
+
+class CacheEntry:
+    """
+    A cached verdict with the original text needed to recompute it.
+
+    The JSON body and its strong ETag are computed once at insert time so
+    conditional GETs never re-serialize.
+    """
+    __slots__ = ("text", "response", "body", "etag", "stored_at", "expires_at")
+
+    def __init__(self, text: str, response: FactCheckResponse, ttl: float):
+        self.text = text
+        self.response = response
+        self.body = response.model_dump_json().encode("utf-8")
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self.stored_at = time.time()
+        self.expires_at = self.stored_at + ttl
+
+
+class VerdictCache:
+    """LRU cache with per-entry expiry."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Return a fresh entry (marking it recently used), or None."""
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.time():
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """Return an entry, expired or not, without touching LRU order or stats."""
+        return self._entries.get(key)
+
+    def put(self, key: str, text: str, response: FactCheckResponse) -> CacheEntry:
+        """Store a verdict, evicting the least recently used entry if full."""
+        entry = CacheEntry(text, response, self.ttl)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def expires_in(self, key: str) -> Optional[float]:
+        """Seconds until the entry expires (negative if stale, None if absent)."""
+        entry = self._entries.get(key)
+        return entry.expires_at - time.time() if entry else None
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class PartialResult:
+    """Pipeline progress of an abandoned run: the extracted claim and, if reached, its sources."""
+    __slots__ = ("claim", "hits", "expires_at")
+
+    def __init__(self, claim: str, hits: Optional[List[SearchHit]], ttl: float):
+        self.claim = claim
+        self.hits = hits
+        self.expires_at = time.time() + ttl
+
+
+class PartialResultCache:
+    """
+    Claims and search hits of runs that were abandoned before a verdict.
+
+    A retry of the same post (the user scrolls back, or the client retries
+    with a longer deadline) resumes from here instead of paying for
+    extraction and search again.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, PartialResult]" = OrderedDict()
+        self.saved = 0
+        self.resumed = 0
+
+    def put(self, key: str, claim: str, hits: Optional[List[SearchHit]] = None):
+        """Record progress, keeping hits already stored for the same claim."""
+        existing = self._entries.get(key)
+        if hits is None and existing is not None and existing.claim == claim:
+            hits = existing.hits
+        self._entries[key] = PartialResult(claim, hits, self.ttl)
+        self._entries.move_to_end(key)
+        self.saved += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: str) -> Optional[PartialResult]:
+        """Remove and return fresh progress for a run that is starting again."""
+        entry = self._entries.pop(key, None)
+        if entry is None or entry.expires_at <= time.time():
+            return None
+        self.resumed += 1
+        return entry
+
+    def discard(self, key: str):
+        self._entries.pop(key, None)
+
+    def snapshot(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "saved": self.saved,
+            "resumed": self.resumed,
+        }
+
+
+# Global verdict cache
+verdict_cache = VerdictCache(settings.VERDICT_CACHE_MAX_ENTRIES, settings.VERDICT_CACHE_TTL)
+
+# Global partial-result cache
+partial_results = PartialResultCache(settings.PARTIAL_RESULT_MAX_ENTRIES, settings.PARTIAL_RESULT_TTL)
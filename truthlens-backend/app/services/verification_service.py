@@ -0,0 +1,417 @@
+"""End-to-end fact-check pipeline shared by the API and background workers."""
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Set
+from app.config import settings
+from app.models import FactCheckResponse, SearchHit
+from app.services.checkworthiness import checkworthiness_gate
+from app.services.cluster import PeerUnavailableError, cluster
+from app.services.deadline import (
+    DeadlineExceededError,
+    RequestBudget,
+    current_budget,
+    effective_deadline,
+    pipeline_savings,
+    run_stage
+)
+from app.services.evidence_index import evidence_index
+from app.services.evidence_service import EvidenceService
+from app.services.fact_check_service import FactCheckService
+from app.services.quota_service import Priority
+from app.services.scheduler import SchedulerRejectedError, request_scheduler
+from app.services.search_service import SearchService, SearchUnavailableError
+from app.services.verdict_cache import claim_hash, partial_results, verdict_cache
+
+# References to fire-and-forget refresh tasks (so they are not garbage collected)
+_background_refreshes: Set[asyncio.Task] = set()
+
+# Per-request listener for partial results, called as listener(stage, payload).
+# Set by streaming transports (the /ws channel); plain HTTP leaves it unset.
+progress_listener: ContextVar[Optional[Callable[[str, dict], None]]] = ContextVar("progress_listener", default=None)
+
+
+def _search_failed() -> FactCheckResponse:
+    """Verdict for a post whose sources could not be searched (an "Error", never cached)."""
+    return FactCheckResponse(
+        label="Error",
+        explanation="Source search is unavailable right now, please try again later.",
+        sources=[],
+        confidence=0.0
+    )
+
+
+def _report_progress(stage: str, payload: Callable[[], dict]):
+    """Send a partial result to the listener, if any (payload is built lazily)."""
+    listener = progress_listener.get()
+    if listener is not None:
+        listener(stage, payload())
+
+
+class _Flight:
+    """
+    A pipeline run shared by every concurrent request for the same claim.
+
+    The run is a task of its own, so one client going away does not stop
+    it for the others; it is cancelled when its last waiter leaves.
+    """
+
+    def __init__(self, key: str, budget: RequestBudget):
+        self.key = key
+        self.budget = budget
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.listeners: List[Callable[[str, dict], None]] = []
+
+    def report(self, stage: str, data: dict):
+        """Progress listener of the run: fans out to every waiter's listener."""
+        for listener in list(self.listeners):
+            listener(stage, data)
+
+    async def wait(self) -> FactCheckResponse:
+        listener = progress_listener.get()
+        if listener is not None:
+            self.listeners.append(listener)
+        self.waiters += 1
+        try:
+            return await asyncio.shield(self.task)
+        finally:
+            self.waiters -= 1
+            if listener is not None:
+                self.listeners.remove(listener)
+            if self.waiters == 0 and not self.task.done():
+                # Nobody is waiting for the verdict any more
+                if _in_flight.get(self.key) is self:
+                    del _in_flight[self.key]
+                self.task.cancel()
+
+
+# In-flight pipelines by claim hash, so concurrent identical requests share one run
+_in_flight: Dict[str, _Flight] = {}
+
+
+class VerificationService:
+    """Service that runs (or serves from cache) the full fact-check pipeline."""
+    
+    @staticmethod
+    async def verify(
+        text: str,
+        priority: Priority = Priority.INTERACTIVE,
+        deadline: Optional[float] = None,
+        use_cache: bool = True,
+        route: bool = True
+    ) -> FactCheckResponse:
+        """
+        Fact-check a post, using the verdict cache when possible.
+        
+        Cancelling the call (client disconnect) cancels the pipeline unless
+        another request is waiting for the same claim.
+        
+        In cluster mode a claim owned by another replica is answered there
+        (with no progress reports), unless that replica is unreachable.
+        
+        Args:
+            text: The original tweet/post text
+            priority: Priority class for scheduling and quota admission
+            deadline: Absolute client deadline (Unix seconds), if any; capped
+                by the REQUEST_DEADLINES default for the priority class
+            use_cache: Set False to force a fresh verdict (cache refresh)
+            route: Set False to answer here even if another replica owns
+                the claim (requests forwarded by that replica)
+            
+        Returns:
+            FactCheckResponse for the post
+            
+        Raises:
+            SchedulerRejectedError: Queue full (503), or the deadline passed
+                or cannot be met (504, DeadlineExceededError)
+        """
+        tweet_text = text.strip()
+        
+        if not tweet_text:
+            return FactCheckResponse(
+                label="Unverifiable",
+                explanation="No text content to fact-check.",
+                sources=[],
+                confidence=0.0
+            )
+        
+        key = claim_hash(tweet_text)
+        if route and cluster.enabled:
+            owner = cluster.owner(key)
+            if owner == cluster.self_url:
+                cluster.owned += 1
+            else:
+                try:
+                    return await cluster.forward_verify(
+                        owner, tweet_text, priority, effective_deadline(deadline, priority), use_cache
+                    )
+                except PeerUnavailableError as e:
+                    cluster.fallbacks += 1
+                    print(f"⚠️  {e}; verifying locally")
+        
+        if use_cache:
+            cached = verdict_cache.get(key)
+            if cached is not None:
+                print(f"⚡ Verdict cache hit: {key[:12]}")
+                return cached.response
+        
+        # Jokes, opinions, questions and reactions never reach the upstreams
+        if settings.CHECKWORTHY_ENABLED:
+            skip, probability = checkworthiness_gate.should_skip(tweet_text)
+            if skip:
+                print(f"🚫 No checkable claim (p={probability:.2f}): {tweet_text[:60]}")
+                return FactCheckResponse(
+                    label="Unverifiable",
+                    explanation="No checkable factual claim found (opinion, question or reaction).",
+                    sources=[],
+                    confidence=round(1.0 - probability, 2)
+                )
+        
+        # Coalesce with an identical pipeline that is already running
+        deadline = effective_deadline(deadline, priority)
+        flight = _in_flight.get(key)
+        if flight is None:
+            flight = _Flight(key, RequestBudget(deadline))
+            flight.task = asyncio.create_task(VerificationService._run_flight(flight, tweet_text, priority))
+            _in_flight[key] = flight
+        else:
+            flight.budget.extend(deadline)
+        return await flight.wait()
+    
+    @staticmethod
+    async def _run_flight(flight: _Flight, tweet_text: str, priority: Priority) -> FactCheckResponse:
+        """Run the pipeline for a flight and cache its verdict (unless the run was degraded)."""
+        current_budget.set(flight.budget)
+        progress_listener.set(flight.report)
+        try:
+            async with request_scheduler.slot(priority, flight.budget.deadline):
+                result = await VerificationService._run_pipeline(flight.key, tweet_text, priority)
+        except asyncio.CancelledError:
+            pipeline_savings.record_abandoned(flight.budget.stage, deadline=False)
+            raise
+        except SchedulerRejectedError as e:
+            if e.status_code == 504:
+                pipeline_savings.record_abandoned(flight.budget.stage, deadline=True)
+            raise
+        finally:
+            if _in_flight.get(flight.key) is flight:
+                del _in_flight[flight.key]
+        
+        result.claim_hash = flight.key
+        if result.label != "Error" and not flight.budget.degraded:
+            verdict_cache.put(flight.key, tweet_text, result)
+        return result
+    
+    @staticmethod
+    def _keep_late_verdict(
+        key: str,
+        tweet_text: str,
+        claim: str,
+        search_results: List[SearchHit],
+        budget: RequestBudget,
+        result: FactCheckResponse
+    ) -> bool:
+        """Cache a verdict that arrived after its run was abandoned."""
+        if result.label == "Error" or budget.degraded:
+            return False
+        result.claim_hash = key
+        verdict_cache.put(key, tweet_text, result)
+        partial_results.discard(key)
+        if settings.EVIDENCE_INDEX_ENABLED:
+            evidence_index.add_verdict(claim, search_results, result)
+        return True
+    
+    @staticmethod
+    def schedule_refresh(text: str):
+        """Recompute a verdict in the background at background priority."""
+        task = asyncio.create_task(
+            VerificationService.verify(text, Priority.BACKGROUND, use_cache=False)
+        )
+        _background_refreshes.add(task)
+        task.add_done_callback(_background_refreshes.discard)
+    
+    @staticmethod
+    async def _run_pipeline(key: str, tweet_text: str, priority: Priority) -> FactCheckResponse:
+        """
+        Process:
+        1. Extract core claim using Gemini AI
+        2. Search for sources using Brave Search with extracted claim
+        3. Fetch the top source pages for fuller evidence (time-boxed)
+        4. Synthesize fact-check result using Gemini AI
+        
+        Each stage runs within what is left of the request deadline. A run
+        that is abandoned keeps its claim and sources in partial_results
+        (and a verdict that lands late in the verdict cache), and the next
+        run for the same post resumes from there. A degraded run (a stage
+        fell back after an upstream failure) keeps and caches nothing.
+        """
+        if settings.MULTI_CLAIM_ENABLED:
+            return await VerificationService._run_multi_claim_pipeline(tweet_text, priority)
+        
+        extracted_claim: Optional[str] = None
+        search_results: Optional[List[SearchHit]] = None
+        budget = current_budget.get()
+        
+        def keep_partial(claim: str, hits: Optional[List[SearchHit]] = None) -> bool:
+            # Only resume from what the stages really produced: not a raw-text
+            # fallback claim, and not an empty hit list
+            if budget.degraded:
+                return False
+            partial_results.put(key, claim, hits or None)
+            return True
+        
+        partial = partial_results.pop(key)
+        if partial is not None:
+            print(f"♻️  Resuming abandoned run: {key[:12]}")
+            extracted_claim, search_results = partial.claim, partial.hits
+            pipeline_savings.record_resumed("extract")
+            if search_results is not None:
+                pipeline_savings.record_resumed("search")
+        
+        try:
+            # Step 1: Extract the core claim using Gemini
+            if extracted_claim is None:
+                print(f"📝 Original text: {tweet_text[:100]}...")
+                extracted_claim = await run_stage(
+                    "extract",
+                    FactCheckService.extract_claim(tweet_text, priority),
+                    keep=keep_partial
+                )
+            claim = extracted_claim
+            _report_progress("claim", lambda: {"claim": claim})
+            
+            # Step 2: Search for relevant sources using extracted claim
+            if search_results is None:
+                print(f"🔍 Searching for: {claim[:100]}...")
+                search_start = time.time()
+                try:
+                    search_results = await run_stage(
+                        "search",
+                        SearchService.search_claim(claim, priority),
+                        keep=lambda hits: bool(hits) and keep_partial(claim, hits)
+                    )
+                except SearchUnavailableError:
+                    keep_partial(claim)  # A retry starts again from the search
+                    return _search_failed()
+                search_time = time.time() - search_start
+                print(f"⏱️  Brave search took: {search_time:.2f}s")
+            hits = search_results
+            _report_progress("sources", lambda: {"sources": [hit.to_source().model_dump() for hit in hits]})
+            
+            if not hits:
+                return FactCheckResponse(
+                    label="Unverifiable",
+                    explanation="No reliable sources found to verify this claim.",
+                    sources=[],
+                    confidence=0.0
+                )
+            
+            # Step 3: Enrich the top sources with their article text
+            await VerificationService._enrich([hits])
+            
+            # Step 4: Synthesize the fact-check using AI with original text
+            synthesis_start = time.time()
+            result = await run_stage(
+                "synthesize",
+                FactCheckService.synthesize_fact_check(claim, tweet_text, hits, priority),
+                keep=lambda late: VerificationService._keep_late_verdict(key, tweet_text, claim, hits, budget, late)
+            )
+            synthesis_time = time.time() - synthesis_start
+            print(f"⏱️  Gemini synthesis took: {synthesis_time:.2f}s")
+        
+        except (asyncio.CancelledError, DeadlineExceededError):
+            # Keep what this run has paid for, so a retry picks up from here
+            if extracted_claim is not None:
+                keep_partial(extracted_claim, search_results)
+            raise
+        
+        # Keep the cited sources for the next time this claim comes up
+        if settings.EVIDENCE_INDEX_ENABLED and not budget.degraded:
+            evidence_index.add_verdict(claim, hits, result)
+        
+        return result
+    
+    @staticmethod
+    async def _enrich(claim_results: List[List[SearchHit]]):
+        """
+        Fetch source pages for every claim's hits, in the time synthesis can
+        spare (pages cited twice are fetched once). Skipped when there is
+        none left.
+        """
+        budget = current_budget.get()
+        time_budget = budget.stage_budget("evidence") if budget is not None else None
+        if time_budget is not None:
+            if time_budget <= 0:
+                pipeline_savings.record_skipped("evidence")
+                return
+            budget.stage = "evidence"
+        
+        evidence_start = time.time()
+        enriched = await asyncio.gather(*(
+            EvidenceService.enrich(search_results, time_budget) for search_results in claim_results
+        ))
+        evidence_time = time.time() - evidence_start
+        print(f"⏱️  Evidence fetch took: {evidence_time:.2f}s ({sum(enriched)} page(s))")
+    
+    @staticmethod
+    async def _run_multi_claim_pipeline(tweet_text: str, priority: Priority) -> FactCheckResponse:
+        """
+        Multi-claim variant of the pipeline.
+        
+        The post is decomposed into up to MAX_CLAIMS atomic claims; their
+        searches and syntheses each run concurrently, so wall time stays
+        close to a single-claim check. Per-claim verdicts are then combined
+        into the tweet-level label. Stages run within the request deadline
+        like the single-claim pipeline, but an abandoned run keeps nothing.
+        """
+        # Step 1: Decompose the post into atomic claims
+        print(f"📝 Original text: {tweet_text[:100]}...")
+        claims = await run_stage("extract", FactCheckService.extract_claims(tweet_text, priority))
+        _report_progress("claims", lambda: {"claims": claims})
+        
+        # Step 2: Search for every claim at once (overlapping queries share a search)
+        search_start = time.time()
+        try:
+            claim_results = await run_stage("search", SearchService.search_claims(claims, priority))
+        except SearchUnavailableError:
+            return _search_failed()
+        search_time = time.time() - search_start
+        print(f"⏱️  Brave search for {len(claims)} claim(s) took: {search_time:.2f}s")
+        _report_progress("sources", lambda: {"sources": [
+            [hit.to_source().model_dump() for hit in search_results] for search_results in claim_results
+        ]})
+        
+        # Step 3: Enrich every claim's top sources
+        await VerificationService._enrich(claim_results)
+        
+        # Step 4: Synthesize a verdict per claim concurrently
+        async def check(claim: str, search_results) -> FactCheckResponse:
+            if not search_results:
+                return FactCheckResponse(
+                    label="Unverifiable",
+                    explanation="No reliable sources found to verify this claim.",
+                    sources=[],
+                    confidence=0.0
+                )
+            return await FactCheckService.synthesize_fact_check(
+                claim, tweet_text, search_results, priority
+            )
+        
+        async def check_all() -> List[FactCheckResponse]:
+            return await asyncio.gather(*(
+                check(claim, search_results) for claim, search_results in zip(claims, claim_results)
+            ))
+        
+        synthesis_start = time.time()
+        verdicts = await run_stage("synthesize", check_all())
+        synthesis_time = time.time() - synthesis_start
+        print(f"⏱️  Gemini synthesis for {len(claims)} claim(s) took: {synthesis_time:.2f}s")
+        
+        if settings.EVIDENCE_INDEX_ENABLED and not current_budget.get().degraded:
+            for claim, search_results, verdict in zip(claims, claim_results, verdicts):
+                evidence_index.add_verdict(claim, search_results, verdict)
+        
+        if len(claims) == 1:
+            return verdicts[0]
+        return FactCheckService.combine_verdicts(claims, verdicts)
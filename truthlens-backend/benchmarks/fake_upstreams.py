@@ -0,0 +1,217 @@
+"""
+Local stand-ins for Gemini, Brave Search, AI or Not and ElevenLabs.
+
+Each upstream has a configurable latency distribution and error rate so the
+API can be load-tested without spending real quota. Point the API at it with:
+
+    GEMINI_API_ENDPOINT=http://127.0.0.1:9100
+    BRAVE_SEARCH_URL=http://127.0.0.1:9100/res/v1/web/search
+    AIORNOT_API_URL=http://127.0.0.1:9100/v1/reports/image
+    ELEVENLABS_API_URL=http://127.0.0.1:9100/v1/text-to-speech
+
+Run standalone:
+    python -m benchmarks.fake_upstreams --port 9100 --gemini 400:0.4 --brave 250:0.5:0.01
+"""
+import argparse
+import asyncio
+import math
+import random
+import re
+from typing import Dict
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+
+class UpstreamProfile:
+    """Log-normal latency (median, sigma) plus an error rate."""
+
+    def __init__(self, median_ms: float, sigma: float = 0.5, error_rate: float = 0.0):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+
+    @classmethod
+    def parse(cls, spec: str) -> "UpstreamProfile":
+        """Parse "median_ms[:sigma[:error_rate]]", e.g. "400:0.4:0.01"."""
+        parts = [float(p) for p in spec.split(":")]
+        return cls(*parts)
+
+    def sample_delay(self) -> float:
+        """Delay in seconds drawn from the latency distribution."""
+        if self.sigma <= 0:
+            return self.median_ms / 1000.0
+        return random.lognormvariate(math.log(self.median_ms), self.sigma) / 1000.0
+
+    def should_fail(self) -> bool:
+        return random.random() < self.error_rate
+
+    def describe(self) -> str:
+        return f"median={self.median_ms:.0f}ms sigma={self.sigma} errors={self.error_rate:.1%}"
+
+
+# Defaults roughly match observed production latencies
+PROFILES: Dict[str, UpstreamProfile] = {
+    "gemini": UpstreamProfile(450, 0.4),
+    "brave": UpstreamProfile(300, 0.5),
+    "aiornot": UpstreamProfile(1200, 0.5),
+    "elevenlabs": UpstreamProfile(700, 0.4),
+}
+
+TTS_MS_PER_CHAR = 2.0  # Extra ElevenLabs latency per character of text
+STRONG_MODEL_SLOWDOWN = 1.8  # Gemini latency multiplier for non-"lite" models (the cascade's upper tiers)
+
+TRUSTED = ["reuters.com", "apnews.com", "bbc.com", "npr.org", "snopes.com", "politifact.com"]
+OTHER = ["example-news.com", "localdaily.net", "blogsphere.org", "citywire.io"]
+LABELS = ["TRUE", "FALSE", "MISLEADING", "UNVERIFIABLE"]
+
+app = FastAPI(title="TruthLens fake upstreams")
+
+
+async def _simulate(name: str):
+    """Sleep for a sampled latency; return an error response if one is drawn."""
+    profile = PROFILES[name]
+    await asyncio.sleep(profile.sample_delay())
+    if profile.should_fail():
+        status = random.choice([429, 500, 503])
+        headers = {"Retry-After": "1"} if status == 429 else {}
+        return JSONResponse({"error": f"simulated {name} failure"}, status_code=status, headers=headers)
+    return None
+
+
+@app.post("/v1beta/models/{model_action:path}")
+async def gemini_generate(model_action: str, request: Request):
+    """Gemini REST generateContent stand-in (non-lite models are slower and more confident)."""
+    error = await _simulate("gemini")
+    if error:
+        return error
+    strong = "lite" not in model_action
+    if strong:
+        await asyncio.sleep(PROFILES["gemini"].sample_delay() * (STRONG_MODEL_SLOWDOWN - 1))
+    body = await request.json()
+    prompt = body["contents"][-1]["parts"][0]["text"]
+
+    if "Claim Extraction Specialist" in prompt:
+        match = re.search(r'<text>\s*"(.*?)"\s*</text>', prompt, re.S)
+        text = match.group(1) if match else "claim"
+        if "one claim per line" in prompt:
+            # Decomposition: one claim per sentence
+            limit = re.search(r"at most (\d+) claims", prompt)
+            sentences = [part.strip() for part in re.split(r"(?<=[.!?])\s+", text) if part.strip()]
+            text = "\n".join(sentence[:100] for sentence in sentences[:int(limit.group(1)) if limit else 3])
+        else:
+            text = text[:100]
+    else:
+        sources = ",".join(str(i) for i in random.sample(range(1, 6), 3))
+        label = random.choice(LABELS[:3] if strong else LABELS)
+        confidence = random.uniform(0.7, 0.98) if strong else random.uniform(0.4, 0.95)
+        text = (
+            f"LABEL: {label}\n"
+            f"EXPLANATION: Simulated verdict citing Reuters coverage.\n"
+            f"SOURCES: {sources}\n"
+            f"BIAS: {random.choice(['None', 'Potential', 'Likely'])}\n"
+            f"CONFIDENCE: {confidence:.2f}"
+        )
+
+    prompt_tokens = len(prompt) // 4
+    output_tokens = len(text) // 4
+    return {
+        "candidates": [{
+            "content": {"parts": [{"text": text}], "role": "model"},
+            "finishReason": "STOP",
+            "index": 0,
+        }],
+        "usageMetadata": {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": output_tokens,
+            "totalTokenCount": prompt_tokens + output_tokens,
+        },
+    }
+
+
+@app.get("/res/v1/web/search")
+async def brave_search(q: str = "", count: int = 20):
+    """Brave web search stand-in."""
+    error = await _simulate("brave")
+    if error:
+        return error
+    results = []
+    for i in range(count):
+        domain = TRUSTED[i % len(TRUSTED)] if i % 3 == 0 else OTHER[i % len(OTHER)]
+        results.append({
+            "title": f"Report {i + 1} on {q[:40]}",
+            "url": f"https://www.{domain}/article/{abs(hash((q, i))) % 10**8}",
+            "description": f"Coverage of {q[:80]}. " * 3,
+            "age": f"{(i % 6) + 1} days ago",
+        })
+    return JSONResponse(
+        {"web": {"results": results}},
+        headers={"X-RateLimit-Remaining": "1, 1999"}
+    )
+
+
+@app.post("/v1/reports/image")
+async def aiornot_report(request: Request):
+    """AI or Not image report stand-in."""
+    error = await _simulate("aiornot")
+    if error:
+        return error
+    await request.json()
+    verdict = random.choice(["ai", "human"])
+    confidence = random.uniform(0.55, 0.99)
+    return {
+        "report": {
+            "verdict": verdict,
+            "ai": {"confidence": confidence if verdict == "ai" else 1 - confidence},
+            "human": {"confidence": confidence if verdict == "human" else 1 - confidence},
+        }
+    }
+
+
+@app.post("/v1/text-to-speech/{voice_id}")
+async def elevenlabs_tts(voice_id: str, request: Request):
+    """ElevenLabs text-to-speech stand-in (returns a tagged clip of silent MPEG frames)."""
+    error = await _simulate("elevenlabs")
+    if error:
+        return error
+    body = await request.json()
+    text = body.get("text", "")
+    # Synthesis time grows with the length of the text
+    await asyncio.sleep(len(text) * TTS_MS_PER_CHAR / 1000.0)
+    # ~16 KB of 128 kbps audio per second of speech, ~15 characters per second
+    frames = max(1, len(text) // 15) * 38
+    frame = b"\xff\xfb\x90\x64" + b"\x00" * 413  # 128 kbps / 44.1 kHz MPEG-1 Layer III
+    id3 = b"ID3\x04\x00\x00\x00\x00\x00\x17" + b"TSSE\x00\x00\x00\x0d\x00\x00\x03Lavf60.3.100"
+    info = frame[:36] + b"Info" + b"\x00" * (len(frame) - 40)  # Whole-clip VBR header frame
+    return Response(content=id3 + info + frame * frames, media_type="audio/mpeg")
+
+
+@app.get("/health")
+async def health():
+    return {name: profile.describe() for name, profile in PROFILES.items()}
+
+
+def configure(args: argparse.Namespace):
+    """Apply CLI overrides to the upstream profiles."""
+    for name in PROFILES:
+        spec = getattr(args, name)
+        if spec:
+            PROFILES[name] = UpstreamProfile.parse(spec)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    for name in PROFILES:
+        parser.add_argument(f"--{name}", help="median_ms[:sigma[:error_rate]]")
+    args = parser.parse_args()
+    configure(args)
+
+    import uvicorn
+    for name, profile in PROFILES.items():
+        print(f"  {name:<11} {profile.describe()}")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+"""
+Load generator for the TruthLens API.
+
+Replays a tweet corpus against /api/fact-check, /api/check-media and
+/api/text-to-speech and reports p50/p95/p99 latency and RPS per endpoint.
+Reports are JSON so runs can be compared across commits.
+
+Offline run (spawns the fake upstreams and the API locally):
+    python -m benchmarks.load_test --spawn --duration 30 --concurrency 20 --output base.json
+
+Compare against a previous run:
+    python -m benchmarks.load_test --spawn --duration 30 --compare base.json
+
+Several replicas behind a round-robin "load balancer", in cluster mode or
+(with --no-cluster) as independent caches:
+    python -m benchmarks.load_test --spawn --replicas 3 --duration 30
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "data" / "tweets.jsonl"
+# Admin token for reading /api/metrics (spawned replicas are started with it)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "bench-admin-token")
+
+TTS_RESULT = {
+    "label": "False",
+    "explanation": "Reuters reports the claim is not supported by official data.",
+    "sources": [
+        {"title": "Fact check: claim lacks evidence", "url": "https://www.reuters.com/fact-check/1", "published_date": "2 days ago"},
+        {"title": "What the data shows", "url": "https://apnews.com/article/2", "published_date": "1 week ago"},
+    ],
+    "confidence": 0.82,
+    "bias": "None",
+}
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile (q in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def load_corpus(path: Path) -> List[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse "fact-check=8,check-media=1,text-to-speech=1"."""
+    mix = {}
+    for part in spec.split(","):
+        name, weight = part.split("=")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+class Workload:
+    """Picks requests from the corpus with Zipf-skewed popularity."""
+
+    def __init__(self, corpus: List[dict], mix: Dict[str, float], zipf: float, unique: bool):
+        self.corpus = corpus
+        self.media = [t for t in corpus if t.get("media")]
+        self.endpoints = list(mix)
+        self.endpoint_weights = [mix[e] for e in self.endpoints]
+        self.tweet_weights = [1.0 / (rank + 1) ** zipf for rank in range(len(corpus))]
+        self.unique = unique
+        self._counter = 0
+
+    def _tweet(self) -> dict:
+        return random.choices(self.corpus, weights=self.tweet_weights)[0]
+
+    def next_request(self) -> tuple:
+        """Return (endpoint, path, json_body)."""
+        endpoint = random.choices(self.endpoints, weights=self.endpoint_weights)[0]
+        tweet = self._tweet()
+        text = tweet["text"]
+        if self.unique:
+            self._counter += 1
+            text = f"{text} [{self._counter}]"
+
+        if endpoint == "check-media" and self.media:
+            item = random.choice(self.media)["media"][0]
+            return endpoint, "/api/check-media", {"media_url": item["url"], "media_type": item["type"]}
+        if endpoint == "text-to-speech":
+            return endpoint, "/api/text-to-speech", {"claim": text, "result": TTS_RESULT}
+        return "fact-check", "/api/fact-check", {"text": text}
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, endpoint: str, latency: float, status: Optional[int]):
+        self.latencies[endpoint].append(latency)
+        self.statuses[endpoint][str(status) if status else "exception"] += 1
+        if status is None or status >= 400:
+            self.errors[endpoint] += 1
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        all_latencies = []
+        for endpoint, values in sorted(self.latencies.items()):
+            all_latencies.extend(values)
+            endpoints[endpoint] = self._summary(values, self.errors[endpoint], elapsed)
+            endpoints[endpoint]["statuses"] = dict(self.statuses[endpoint])
+        return {
+            "overall": self._summary(all_latencies, sum(self.errors.values()), elapsed),
+            "endpoints": endpoints,
+        }
+
+    @staticmethod
+    def _summary(values: List[float], errors: int, elapsed: float) -> dict:
+        ms = [v * 1000 for v in values]
+        return {
+            "requests": len(values),
+            "errors": errors,
+            "error_rate": round(errors / len(values), 4) if values else 0.0,
+            "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(ms, 50), 1),
+            "p95_ms": round(percentile(ms, 95), 1),
+            "p99_ms": round(percentile(ms, 99), 1),
+            "max_ms": round(max(ms), 1) if ms else 0.0,
+        }
+
+
+async def _send(clients, workload: Workload, recorder: Recorder):
+    endpoint, path, body = workload.next_request()
+    client = next(clients)
+    start = time.perf_counter()
+    status = None
+    try:
+        response = await client.post(path, json=body)
+        await response.aread()
+        status = response.status_code
+    except httpx.HTTPError:
+        pass
+    recorder.record(endpoint, time.perf_counter() - start, status)
+
+
+async def run_closed_loop(clients, workload, recorder, concurrency: int, duration: float):
+    """`concurrency` users, each sending the next request as soon as the last returns."""
+    end = time.perf_counter() + duration
+
+    async def user():
+        while time.perf_counter() < end:
+            await _send(clients, workload, recorder)
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+
+
+async def run_open_loop(clients, workload, recorder, rps: float, duration: float):
+    """Poisson arrivals at `rps`, independent of response times."""
+    end = time.perf_counter() + duration
+    tasks = []
+    while time.perf_counter() < end:
+        tasks.append(asyncio.create_task(_send(clients, workload, recorder)))
+        await asyncio.sleep(random.expovariate(rps))
+    await asyncio.gather(*tasks)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _wait_ready(url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Timed out waiting for {url}")
+
+
+def spawn_stack(args) -> List[subprocess.Popen]:
+    """Start the fake upstreams and the API replicas wired to them."""
+    upstream = f"http://127.0.0.1:{args.upstream_port}"
+    upstream_cmd = [sys.executable, "-m", "benchmarks.fake_upstreams", "--port", str(args.upstream_port)]
+    for name in ("gemini", "brave", "aiornot", "elevenlabs"):
+        spec = getattr(args, f"{name}_profile")
+        if spec:
+            upstream_cmd += [f"--{name}", spec]
+
+    scratch = tempfile.mkdtemp(prefix="truthlens-bench-")
+    env = dict(os.environ)
+    env.update({
+        "GEMINI_API_KEY": "bench-gemini-key",
+        "BRAVE_API_KEY": "bench-brave-key",
+        "AIORNOT_API_KEY": "bench-aiornot-key",
+        "ELEVENLABS_API_KEY": "bench-elevenlabs-key",
+        "GEMINI_API_ENDPOINT": upstream,
+        "BRAVE_SEARCH_URL": f"{upstream}/res/v1/web/search",
+        "AIORNOT_API_URL": f"{upstream}/v1/reports/image",
+        "ELEVENLABS_API_URL": f"{upstream}/v1/text-to-speech",
+        # Measure the service, not the client-side quota limits
+        "GEMINI_RATE_LIMIT": "10000", "GEMINI_BURST": "10000",
+        "BRAVE_RATE_LIMIT": "10000", "BRAVE_BURST": "10000",
+        "AIORNOT_RATE_LIMIT": "10000", "AIORNOT_BURST": "10000",
+        "ELEVENLABS_RATE_LIMIT": "10000", "ELEVENLABS_BURST": "10000",
+        "ADMIN_TOKEN": ADMIN_TOKEN,
+        "PREVERIFY_ENABLED": "false",
+        "EVIDENCE_ENABLED": "false",  # Fake search hits point at real news sites
+        "EVIDENCE_INDEX_PATH": os.path.join(scratch, "evidence_index.db"),
+        "JOBS_DB_PATH": os.path.join(scratch, "jobs.db"),
+        "MULTI_CLAIM_ENABLED": "true" if args.multi_claim else "false",
+    })
+    targets = [f"http://127.0.0.1:{args.api_port + i}" for i in range(args.replicas)]
+    if args.replicas > 1 and args.cluster:
+        env["CLUSTER_PEERS"] = ",".join(targets)
+        env["CLUSTER_SECRET"] = os.getenv("CLUSTER_SECRET", "bench-cluster-secret")
+
+    quiet = {"stdout": subprocess.DEVNULL, "stderr": subprocess.STDOUT} if not args.verbose else {}
+    procs = [subprocess.Popen(upstream_cmd, cwd=BACKEND_DIR, **quiet)]
+    _wait_ready(f"{upstream}/health")
+    for i, target in enumerate(targets):
+        api_cmd = [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(args.api_port + i), "--log-level", "warning",
+        ]
+        procs.append(subprocess.Popen(api_cmd, cwd=BACKEND_DIR, env={**env, "CLUSTER_SELF": target}, **quiet))
+    for target in targets:
+        _wait_ready(f"{target}/health")
+    return procs
+
+
+async def cluster_summary(clients: List[httpx.AsyncClient]) -> dict:
+    """Verdict cache hits and Gemini extractions summed over the replicas."""
+    hits = misses = extractions = 0
+    headers = {"X-Admin-Token": ADMIN_TOKEN}
+    for client in clients:
+        cache = (await client.get("/api/metrics/cache", headers=headers)).json()["verdict_cache"]
+        models = (await client.get("/api/metrics/models", headers=headers)).json()
+        hits += cache["hits"]
+        misses += cache["misses"]
+        extractions += sum(usage["calls"] for usage in models["stages"].get("extract", {}).values())
+    return {
+        "replicas": len(clients),
+        "verdict_cache_hits": hits,
+        "verdict_cache_misses": misses,
+        "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+        "gemini_extractions": extractions,
+    }
+
+
+def print_report(report: dict, baseline: Optional[dict] = None):
+    header = f"{'endpoint':<16}{'reqs':>7}{'err%':>7}{'rps':>8}{'p50':>9}{'p95':>9}{'p99':>9}"
+    print(header)
+    print("-" * len(header))
+    rows = [("overall", report["overall"])] + list(report["endpoints"].items())
+    for name, s in rows:
+        print(
+            f"{name:<16}{s['requests']:>7}{s['error_rate'] * 100:>6.1f}%{s['rps']:>8.1f}"
+            f"{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}"
+        )
+        if baseline:
+            base = baseline["overall"] if name == "overall" else baseline["endpoints"].get(name)
+            if base:
+                deltas = []
+                for metric in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+                    if base[metric]:
+                        deltas.append(f"{metric} {(s[metric] - base[metric]) / base[metric]:+.1%}")
+                print(f"{'':<16}vs {baseline['meta']['commit']}: " + ", ".join(deltas))
+    cluster = report.get("cluster")
+    if cluster:
+        mode = "cluster" if report["meta"]["cluster"] else "independent"
+        print(
+            f"\n{cluster['replicas']} replicas ({mode}): verdict cache hit rate {cluster['hit_rate']:.1%}, "
+            f"{cluster['gemini_extractions']} Gemini extractions"
+        )
+
+
+async def run(args) -> dict:
+    corpus = load_corpus(Path(args.corpus))
+    workload = Workload(corpus, parse_mix(args.mix), args.zipf, args.unique)
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=max(args.concurrency, 100))
+    clients = [
+        httpx.AsyncClient(base_url=target, timeout=args.timeout, limits=limits)
+        for target in args.target.split(",")
+    ]
+    try:
+        start = time.perf_counter()
+        if args.rps:
+            await run_open_loop(itertools.cycle(clients), workload, recorder, args.rps, args.duration)
+        else:
+            await run_closed_loop(itertools.cycle(clients), workload, recorder, args.concurrency, args.duration)
+        elapsed = time.perf_counter() - start
+        summary = await cluster_summary(clients) if len(clients) > 1 else None
+    finally:
+        for client in clients:
+            await client.aclose()
+
+    report = recorder.report(elapsed)
+    if summary is not None:
+        report["cluster"] = summary
+    report["meta"] = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "duration_s": round(elapsed, 2),
+        "mode": f"open-loop {args.rps} rps" if args.rps else f"closed-loop x{args.concurrency}",
+        "mix": args.mix,
+        "zipf": args.zipf,
+        "unique": args.unique,
+        "multi_claim": args.multi_claim,
+        "replicas": len(clients),
+        "cluster": args.cluster if len(clients) > 1 else None,
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default=None, help="API base URL, or comma-separated replica URLs (default: spawned stack)")
+    parser.add_argument("--spawn", action="store_true", help="Start fake upstreams + API locally")
+    parser.add_argument("--api-port", type=int, default=8100, help="Port of the first spawned replica")
+    parser.add_argument("--replicas", type=int, default=1, help="API replicas to spawn (requests round-robin across them)")
+    parser.add_argument("--no-cluster", dest="cluster", action="store_false", help="Run spawned replicas as independent caches")
+    parser.add_argument("--upstream-port", type=int, default=9100)
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds")
+    parser.add_argument("--concurrency", type=int, default=20, help="Closed-loop virtual users")
+    parser.add_argument("--rps", type=float, default=None, help="Open-loop arrival rate instead")
+    parser.add_argument("--mix", default="fact-check=8,check-media=1,text-to-speech=1")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Popularity skew (0 = uniform)")
+    parser.add_argument("--unique", action="store_true", help="Make every fact-check text unique (no cache hits)")
+    parser.add_argument("--multi-claim", action="store_true", help="Run the spawned API in multi-claim mode")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    parser.add_argument("--verbose", action="store_true", help="Show spawned server output")
+    for name in ("gemini", "brave", "aiornot", "elevenlabs"):
+        parser.add_argument(f"--{name}-profile", help="Fake upstream latency: median_ms[:sigma[:error_rate]]")
+    args = parser.parse_args()
+
+    procs = []
+    if args.spawn:
+        procs = spawn_stack(args)
+        args.target = args.target or ",".join(f"http://127.0.0.1:{args.api_port + i}" for i in range(args.replicas))
+    args.target = args.target or "http://127.0.0.1:8000"
+
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        for proc in procs:
+            proc.terminate()
+            proc.wait()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
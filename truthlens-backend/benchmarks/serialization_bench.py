@@ -0,0 +1,107 @@
+"""
+Micro-benchmark for the per-request result path: search hits -> sources ->
+FactCheckResponse -> JSON bytes.
+
+"legacy" reproduces the previous path (plain dicts, validated Source objects
+built per branch, stdlib-json JSONResponse); "current" uses the slotted
+SearchHit/Verdict types and ORJSONResponse. Reports CPU time and peak
+allocated bytes per request.
+
+    python -m benchmarks.serialization_bench --iterations 20000
+
+For the end-to-end effect at high RPS, compare load_test runs:
+    python -m benchmarks.load_test --spawn --rps 200 --duration 30 --output after.json
+"""
+import argparse
+import time
+import tracemalloc
+from typing import Callable, List
+from fastapi.responses import JSONResponse, ORJSONResponse
+from app.models import FactCheckResponse, SearchHit, Source, Verdict
+
+BRAVE_RESULTS = [
+    {
+        "title": f"Fact check: claim number {i} about the economy",
+        "url": f"https://www.reuters.com/fact-check/article-{i}",
+        "description": "Officials said the figures quoted in the post were taken out of context. " * 4,
+        "age": f"{i + 1} days ago",
+    }
+    for i in range(20)
+]
+SELECTED = [0, 2, 1]  # Source numbers picked by the model (0-based)
+
+
+def legacy_path() -> bytes:
+    results = [
+        {
+            "title": r.get("title", "N/A"),
+            "url": r.get("url", ""),
+            "content": r.get("description", ""),
+            "published_date": r.get("age", None),
+        }
+        for r in BRAVE_RESULTS[:3]
+    ]
+    sources = []
+    for idx in SELECTED:
+        result = results[idx]
+        sources.append(Source(
+            title=result.get("title", "Source"),
+            url=result.get("url", ""),
+            snippet=result.get("content", "")[:200],
+            published_date=result.get("published_date"),
+        ))
+    response = FactCheckResponse(
+        label="False", explanation="Reuters reports the figures were taken out of context.",
+        sources=sources, confidence=0.85, bias="Potential",
+    )
+    return JSONResponse(content=response.model_dump(mode="json")).body
+
+
+def current_path() -> bytes:
+    hits = [SearchHit.from_brave(r) for r in BRAVE_RESULTS[:3]]
+    verdict = Verdict()
+    verdict.label = "False"
+    verdict.explanation = "Reuters reports the figures were taken out of context."
+    verdict.confidence = 0.85
+    verdict.bias = "Potential"
+    response = verdict.to_response([hits[idx].to_source() for idx in SELECTED])
+    return ORJSONResponse(content=response.model_dump(mode="json")).body
+
+
+def measure(fn: Callable[[], bytes], iterations: int) -> dict:
+    for _ in range(min(1000, iterations)):
+        fn()  # Warm up
+
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    cpu_us = (time.process_time() - start) / iterations * 1e6
+
+    samples: List[int] = []
+    tracemalloc.start()
+    for _ in range(min(2000, iterations)):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        samples.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+
+    return {"cpu_us": cpu_us, "peak_bytes": sum(samples) / len(samples), "body_bytes": len(fn())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    results = {"legacy": measure(legacy_path, args.iterations), "current": measure(current_path, args.iterations)}
+    print(f"{'path':<10}{'cpu/request':>14}{'peak alloc':>14}{'body':>8}")
+    for name, r in results.items():
+        print(f"{name:<10}{r['cpu_us']:>11.1f} us{r['peak_bytes']:>12.0f} B{r['body_bytes']:>7} B")
+    legacy, current = results["legacy"], results["current"]
+    print(f"cpu {current['cpu_us'] / legacy['cpu_us'] - 1:+.1%}, "
+          f"allocations {current['peak_bytes'] / legacy['peak_bytes'] - 1:+.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Import-time benchmark for the TruthLens API.
+
+Runs `python -X importtime -c "import app.main"` in fresh interpreters and
+reports the median cumulative import time plus the slowest modules, so
+cold-start regressions show up in review.
+
+    python -m benchmarks.startup_time --runs 5 --output startup.json
+    python -m benchmarks.startup_time --compare startup.json --max-ms 400
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """Map module name -> (self_us, cumulative_us) from -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure_once(module: str) -> Dict[str, Tuple[int, int]]:
+    # Run without API keys: importing must not need configuration
+    env = {k: v for k, v in os.environ.items() if not k.endswith("_API_KEY") and not k.endswith("_API_KEYS")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def run(module: str, runs: int, top: int) -> dict:
+    samples: List[Dict[str, Tuple[int, int]]] = [measure_once(module) for _ in range(runs)]
+    totals = [s[module][1] / 1000.0 for s in samples]
+
+    # Slowest modules by median cumulative time
+    per_module: Dict[str, List[int]] = {}
+    for sample in samples:
+        for name, (_, cumulative) in sample.items():
+            per_module.setdefault(name, []).append(cumulative)
+    slowest = sorted(
+        ((name, statistics.median(values) / 1000.0) for name, values in per_module.items() if name != module),
+        key=lambda item: item[1],
+        reverse=True
+    )[:top]
+
+    return {
+        "module": module,
+        "runs": runs,
+        "median_ms": round(statistics.median(totals), 1),
+        "min_ms": round(min(totals), 1),
+        "max_ms": round(max(totals), 1),
+        "modules_imported": len(samples[0]),
+        "slowest": [{"module": name, "cumulative_ms": round(ms, 1)} for name, ms in slowest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    parser.add_argument("--max-ms", type=float, help="Exit non-zero if the median exceeds this budget")
+    args = parser.parse_args()
+
+    report = run(args.module, args.runs, args.top)
+    print(f"import {report['module']}: median {report['median_ms']} ms "
+          f"(min {report['min_ms']}, max {report['max_ms']}, {report['modules_imported']} modules)")
+    for item in report["slowest"]:
+        print(f"  {item['cumulative_ms']:>8.1f} ms  {item['module']}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        delta = report["median_ms"] - baseline["median_ms"]
+        print(f"vs baseline: {baseline['median_ms']} ms -> {report['median_ms']} ms ({delta:+.1f} ms)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.max_ms is not None and report["median_ms"] > args.max_ms:
+        print(f"❌ Import time {report['median_ms']} ms exceeds budget of {args.max_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Operational scripts (data import, evaluation) for the TruthLens API."""
@@ -0,0 +1,127 @@
+"""
+Evaluate, calibrate and (re)train the check-worthiness gate.
+
+Scores a labeled sample with k-fold cross-validation (each post is scored
+by a model that never saw it), then prints a calibration table and a
+threshold sweep: how many posts each skip threshold short-circuits, how
+many checkable posts it wrongly skips, and the upstream calls it saves.
+
+    python -m scripts.checkworthiness_eval
+    python -m scripts.checkworthiness_eval --max-false-skip 0 --write-model
+
+The chosen threshold is never below --min-threshold (0.95): a sample of a
+few hundred handwritten posts cannot vouch for a more aggressive one.
+
+Sample lines are {"text": ..., "checkable": true/false}.
+"""
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import List, Tuple
+from app.services.checkworthiness import MODEL_PATH, CheckWorthinessModel
+
+DEFAULT_SAMPLE = Path(__file__).resolve().parent / "data" / "checkworthiness_sample.jsonl"
+THRESHOLDS = [0.5, 0.6, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95, 0.98]
+
+
+def load_sample(paths: List[str]) -> List[Tuple[str, bool]]:
+    examples = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    examples.append((record["text"], bool(record["checkable"])))
+    return examples
+
+
+def cross_validate(examples: List[Tuple[str, bool]], folds: int, seed: int) -> List[Tuple[float, bool]]:
+    """Out-of-fold (P(checkable), label) for every example."""
+    shuffled = list(examples)
+    random.Random(seed).shuffle(shuffled)
+    scored = []
+    for fold in range(folds):
+        train = [example for i, example in enumerate(shuffled) if i % folds != fold]
+        test = [example for i, example in enumerate(shuffled) if i % folds == fold]
+        model = CheckWorthinessModel.train(train, seed=seed)
+        scored.extend((model.probability(text), checkable) for text, checkable in test)
+    return scored
+
+
+def sweep(scored: List[Tuple[float, bool]], calls_per_post: float) -> List[dict]:
+    checkable_total = sum(1 for _, checkable in scored if checkable) or 1
+    rows = []
+    for threshold in THRESHOLDS:
+        skipped = [checkable for probability, checkable in scored if 1.0 - probability >= threshold]
+        wrongly = sum(skipped)
+        rows.append({
+            "threshold": threshold,
+            "skip_rate": len(skipped) / len(scored),
+            "skip_precision": (len(skipped) - wrongly) / len(skipped) if skipped else 1.0,
+            "false_skip_rate": wrongly / checkable_total,
+            "calls_saved_per_1k": 1000 * len(skipped) / len(scored) * calls_per_post,
+        })
+    return rows
+
+
+def print_calibration(scored: List[Tuple[float, bool]], bins: int = 5):
+    print(f"\n{'P(checkable)':<14}{'posts':>7}{'mean p':>9}{'observed':>10}")
+    for b in range(bins):
+        low, high = b / bins, (b + 1) / bins
+        members = [(p, c) for p, c in scored if low <= p < high or (b == bins - 1 and p == 1.0)]
+        if members:
+            mean_p = sum(p for p, _ in members) / len(members)
+            observed = sum(c for _, c in members) / len(members)
+            print(f"{f'{low:.1f}-{high:.1f}':<14}{len(members):>7}{mean_p:>9.2f}{observed:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("samples", nargs="*", default=[str(DEFAULT_SAMPLE)], help="Labeled JSONL files")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--gemini-calls", type=float, default=2, help="Gemini calls per checked post")
+    parser.add_argument("--brave-calls", type=float, default=1, help="Brave calls per checked post")
+    parser.add_argument("--max-false-skip", type=float, default=0.02,
+                        help="Highest tolerated share of checkable posts skipped when picking the threshold")
+    parser.add_argument("--min-threshold", type=float, default=0.95,
+                        help="Lowest threshold written, whatever the sample suggests")
+    parser.add_argument("--write-model", action="store_true", help=f"Train on all samples and write {MODEL_PATH.name}")
+    args = parser.parse_args()
+
+    examples = load_sample(args.samples)
+    checkable = sum(1 for _, c in examples if c)
+    print(f"{len(examples)} labeled posts ({checkable} checkable, {len(examples) - checkable} not)")
+
+    scored = cross_validate(examples, args.folds, args.seed)
+    print_calibration(scored)
+
+    rows = sweep(scored, args.gemini_calls + args.brave_calls)
+    print(f"\n{'threshold':<11}{'skipped':>9}{'precision':>11}{'false skip':>12}{'calls saved/1k':>16}")
+    for row in rows:
+        print(f"{row['threshold']:<11}{row['skip_rate']:>8.1%}{row['skip_precision']:>11.1%}"
+              f"{row['false_skip_rate']:>11.1%}{row['calls_saved_per_1k']:>16.0f}")
+
+    # Lowest threshold (most savings) whose false-skip rate is tolerable
+    eligible = [row for row in rows if row["false_skip_rate"] <= args.max_false_skip]
+    chosen = eligible[0]["threshold"] if eligible else THRESHOLDS[-1]
+    chosen = max(chosen, args.min_threshold)
+    print(f"\nChosen threshold: {chosen} (false skips <= {args.max_false_skip:.0%}, at least {args.min_threshold})")
+
+    model = CheckWorthinessModel.train(examples, seed=args.seed)
+    model.threshold = chosen
+    start = time.perf_counter()
+    for text, _ in examples * 20:
+        model.probability(text)
+    per_post_us = (time.perf_counter() - start) / (len(examples) * 20) * 1e6
+    print(f"Scoring cost: {per_post_us:.1f} us/post")
+
+    if args.write_model:
+        model.save()
+        print(f"✓ Wrote {MODEL_PATH} ({len(model.weights)} weights)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Bulk-import fact-check records into the local evidence index.
+
+    python -m scripts.import_evidence fact_checks.jsonl [more.jsonl ...] [--db data/evidence_index.db]
+
+Accepted line formats are described in app/services/evidence_index.py.
+Writes are upserts keyed by (url, claim), so re-importing a file is safe,
+and the index (WAL mode) can be updated while the API is serving.
+"""
+import argparse
+import json
+import time
+from app.config import settings
+from app.services.evidence_index import EvidenceIndex, parse_records
+
+
+def read_records(path: str):
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield from parse_records(json.loads(line))
+            except (json.JSONDecodeError, AttributeError) as e:
+                print(f"⚠️  {path}:{line_number}: skipped ({e})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="+", help="JSONL files of fact-check records")
+    parser.add_argument("--db", default=settings.EVIDENCE_INDEX_PATH, help="Index database path")
+    args = parser.parse_args()
+
+    index = EvidenceIndex(args.db)
+    for path in args.files:
+        start = time.time()
+        written = index.write(read_records(path))
+        print(f"✓ {path}: {written} records in {time.time() - start:.1f}s")
+    print(f"📚 {args.db}: {index.count()} records")
+
+
+if __name__ == "__main__":
+    main()
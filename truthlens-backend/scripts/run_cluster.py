@@ -0,0 +1,86 @@
+"""
+Run several local API replicas in cluster mode.
+
+    python -m scripts.run_cluster --replicas 3 [--base-port 8000] [--host 127.0.0.1]
+
+Replica i listens on base-port + i; every replica gets the same
+CLUSTER_PEERS and CLUSTER_SECRET (a random one unless set) and its own
+CLUSTER_SELF, the rest of the configuration comes
+from the environment / .env as usual. Send traffic to any replica (or put a
+load balancer in front); /api/metrics/cluster on each shows its share
+(with X-Admin-Token).
+Ctrl-C stops them all.
+"""
+import argparse
+import os
+import secrets
+import subprocess
+import sys
+import time
+from pathlib import Path
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def cluster_env(peers, index: int, secret: str) -> dict:
+    """Environment of replica `index` (the rest is inherited)."""
+    env = dict(os.environ)
+    env["CLUSTER_PEERS"] = ",".join(peers)
+    env["CLUSTER_SECRET"] = secret
+    env["CLUSTER_SELF"] = peers[index]
+    return env
+
+
+def start_replicas(host: str, base_port: int, replicas: int, log_level: str) -> list:
+    """Start the replicas and wait until every one answers /health."""
+    peers = [f"http://{host}:{base_port + i}" for i in range(replicas)]
+    secret = os.getenv("CLUSTER_SECRET") or secrets.token_hex(16)
+    procs = []
+    for i in range(replicas):
+        cmd = [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", host, "--port", str(base_port + i), "--log-level", log_level,
+        ]
+        procs.append(subprocess.Popen(cmd, cwd=BACKEND_DIR, env=cluster_env(peers, i, secret)))
+    for peer in peers:
+        wait_ready(f"{peer}/health")
+    return procs
+
+
+def wait_ready(url: str, timeout: float = 30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Timed out waiting for {url}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replicas", type=int, default=3)
+    parser.add_argument("--base-port", type=int, default=8000)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    procs = start_replicas(args.host, args.base_port, args.replicas, args.log_level)
+    print(f"🕸️  {args.replicas} replicas on {args.host}:{args.base_port}-{args.base_port + args.replicas - 1}")
+    try:
+        while all(proc.poll() is None for proc in procs):
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
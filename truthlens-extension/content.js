@@ -2,6 +2,8 @@
 
 const API_ENDPOINT = 'http://localhost:8000/api/fact-check';
 const TTS_ENDPOINT = 'http://localhost:8000/api/text-to-speech';
+const MEDIA_ENDPOINT = 'http://localhost:8000/api/check-media';
+const WS_ENDPOINT = 'ws://localhost:8000/ws';
 
 // SVG icon for the magnifying glass
 const MAGNIFY_ICON = `
@@ -187,6 +189,16 @@ function getTweetId(tweet) {
   return null;
 }
 
+// Cancel in-flight checks for tweets scrolled out of view (abort controller per tweet)
+const pendingChecks = new WeakMap();
+const visibilityObserver = new IntersectionObserver((entries) => {
+  entries.forEach((entry) => {
+    if (!entry.isIntersecting && pendingChecks.has(entry.target)) {
+      pendingChecks.get(entry.target).abort();
+    }
+  });
+});
+
 // Create the fact-check button
 function createFactCheckButton(tweet, tweetId) {
   const button = document.createElement('div');
@@ -241,13 +253,31 @@ function createFactCheckButton(tweet, tweetId) {
     
     try {
       console.log('TruthLens: Calling API...');
-      // Call the backend API
-      const result = await factCheckTweet(tweetText);
+      // Call the backend API (cancelled if the tweet scrolls out of view)
+      const controller = new AbortController();
+      pendingChecks.set(tweet, controller);
+      visibilityObserver.observe(tweet);
+      const result = await factCheckTweet(tweetText, {
+        signal: controller.signal,
+        onProgress: (stage, data) => {
+          if (stage === 'claim' && data.claim) {
+            button.title = `Checking: ${data.claim}`;
+          } else if (stage === 'sources') {
+            button.title = `Checking: reading ${data.sources.length} sources`;
+          }
+        }
+      });
       console.log('TruthLens: Got result:', result);
       factCheckResult = result;
       updateButtonIcon(button, result.label);
       isChecked = true;
     } catch (error) {
+      if (error.name === 'AbortError') {
+        // Scrolled away before the verdict arrived; clicking again restarts it
+        console.log('TruthLens: Check cancelled');
+        button.title = 'Fact-check this tweet';
+        return;
+      }
       console.error('TruthLens error:', error);
       factCheckResult = {
         label: 'Error',
@@ -258,6 +288,8 @@ function createFactCheckButton(tweet, tweetId) {
       updateButtonIcon(button, 'Error');
       isChecked = true;
     } finally {
+      pendingChecks.delete(tweet);
+      visibilityObserver.unobserve(tweet);
       button.classList.remove('truthlens-loading');
     }
   });
@@ -301,8 +333,135 @@ function extractTweetText(tweet) {
   return tweetTextElement.textContent.trim();
 }
 
+// Persistent WebSocket channel to the backend. One socket multiplexes all
+// fact-check, media and TTS requests; each request gets an id, may receive
+// progress messages, and can be cancelled. If the socket cannot be opened the
+// callers fall back to plain HTTP.
+class TruthLensChannel {
+  constructor(url) {
+    this.url = url;
+    this.socket = null;
+    this.ready = null;
+    this.nextId = 1;
+    this.pending = new Map();
+    this.audioFor = null; // Request id whose binary audio frame comes next
+    this.retryAt = 0;
+  }
+
+  connect() {
+    if (this.ready) {
+      return this.ready;
+    }
+    if (Date.now() < this.retryAt) {
+      return Promise.reject(new Error('WebSocket unavailable'));
+    }
+    this.ready = new Promise((resolve, reject) => {
+      const socket = new WebSocket(this.url);
+      socket.binaryType = 'blob';
+      socket.onopen = () => {
+        this.socket = socket;
+        resolve(socket);
+      };
+      socket.onmessage = (event) => this.handleMessage(event.data);
+      socket.onclose = () => {
+        // Back off before trying the socket again after a failure
+        if (!this.socket) {
+          this.retryAt = Date.now() + 30000;
+        }
+        this.socket = null;
+        this.ready = null;
+        this.audioFor = null;
+        reject(new Error('WebSocket closed'));
+        for (const entry of this.pending.values()) {
+          entry.reject(new Error('WebSocket closed'));
+        }
+        this.pending.clear();
+      };
+    });
+    return this.ready;
+  }
+
+  handleMessage(data) {
+    if (data instanceof Blob) {
+      const entry = this.pending.get(this.audioFor);
+      if (entry) {
+        entry.audio.push(data);
+      }
+      this.audioFor = null;
+      return;
+    }
+
+    const message = JSON.parse(data);
+    const entry = this.pending.get(message.id);
+    if (!entry) {
+      return;
+    }
+    if (message.type === 'progress') {
+      if (entry.onProgress) {
+        entry.onProgress(message.stage, message.data);
+      }
+      return;
+    }
+    if (message.type === 'audio') {
+      // The next binary frame is a chunk of this request's audio
+      this.audioFor = message.id;
+      entry.mediaType = message.media_type;
+      return;
+    }
+
+    this.pending.delete(message.id);
+    if (message.type === 'result') {
+      entry.resolve(message.data);
+    } else if (message.type === 'audio-end') {
+      entry.resolve(new Blob(entry.audio, { type: entry.mediaType || 'audio/mpeg' }));
+    } else if (message.type === 'cancelled') {
+      entry.reject(new DOMException('Request cancelled', 'AbortError'));
+    } else {
+      const error = new Error(`API error: ${message.status} ${message.detail || ''}`.trim());
+      error.status = message.status;
+      entry.reject(error);
+    }
+  }
+
+  // Send one request; resolves with the result (or a Blob for TTS audio)
+  async request(type, payload, { onProgress, signal } = {}) {
+    const socket = await this.connect();
+    if (signal && signal.aborted) {
+      throw new DOMException('Request cancelled', 'AbortError');
+    }
+    const id = String(this.nextId++);
+    return new Promise((resolve, reject) => {
+      this.pending.set(id, { resolve, reject, onProgress, audio: [] });
+      socket.send(JSON.stringify({ id, type, ...payload }));
+      if (signal) {
+        signal.addEventListener('abort', () => {
+          if (this.pending.has(id) && this.socket === socket) {
+            socket.send(JSON.stringify({ id, type: 'cancel' }));
+          }
+        }, { once: true });
+      }
+    });
+  }
+}
+
+const channel = new TruthLensChannel(WS_ENDPOINT);
+
+// Whether an error means the socket itself failed (retry over HTTP)
+function isChannelFailure(error) {
+  return error.status === undefined && error.name !== 'AbortError';
+}
+
 // Call the backend API to fact-check
-async function factCheckTweet(text) {
+async function factCheckTweet(text, { onProgress, signal } = {}) {
+  try {
+    return await channel.request('fact-check', { text }, { onProgress, signal });
+  } catch (error) {
+    if (!isChannelFailure(error)) {
+      throw error;
+    }
+    console.log('TruthLens: WebSocket unavailable, using HTTP');
+  }
+
   console.log('TruthLens: Fetching from:', API_ENDPOINT);
   console.log('TruthLens: Request body:', { text });
   
@@ -311,7 +470,8 @@ async function factCheckTweet(text) {
     headers: {
       'Content-Type': 'application/json',
     },
-    body: JSON.stringify({ text })
+    body: JSON.stringify({ text }),
+    signal
   });
   
   console.log('TruthLens: Response status:', response.status);
@@ -325,6 +485,55 @@ async function factCheckTweet(text) {
   return data;
 }
 
+// Check whether an image is AI-generated
+async function checkMedia(mediaUrl) {
+  try {
+    return await channel.request('check-media', { media_url: mediaUrl, media_type: 'image' });
+  } catch (error) {
+    if (!isChannelFailure(error)) {
+      throw error;
+    }
+  }
+
+  const response = await fetch(MEDIA_ENDPOINT, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ media_url: mediaUrl, media_type: 'image' })
+  });
+  
+  if (!response.ok) {
+    const errorText = await response.text();
+    throw new Error(`API returned ${response.status}: ${errorText}`);
+  }
+  
+  return response.json();
+}
+
+// Get the spoken summary of a fact-check as an audio Blob
+async function fetchSpeech(claim, result) {
+  try {
+    return await channel.request('text-to-speech', { claim, result });
+  } catch (error) {
+    if (!isChannelFailure(error)) {
+      throw error;
+    }
+  }
+
+  const response = await fetch(TTS_ENDPOINT, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ claim, result })
+  });
+  
+  if (!response.ok) {
+    throw new Error(`TTS API error: ${response.status}`);
+  }
+  
+  return response.blob();
+}
+
 // Show the fact-check result overlay
 function showFactCheckResult(tweet, result) {
   console.log('TruthLens: showFactCheckResult called', result);
@@ -449,24 +658,8 @@ function showFactCheckResult(tweet, result) {
       
       console.log('🔊 TTS: Requesting audio for fact check');
       
-      // Call the TTS endpoint
-      const response = await fetch(TTS_ENDPOINT, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          claim: tweetText,
-          result: result
-        })
-      });
-      
-      if (!response.ok) {
-        throw new Error(`TTS API error: ${response.status}`);
-      }
-      
       // Get the audio blob
-      const audioBlob = await response.blob();
+      const audioBlob = await fetchSpeech(tweetText, result);
       const audioUrl = URL.createObjectURL(audioBlob);
       
       // Create and play audio
@@ -583,24 +776,7 @@ function showFactCheckResult(tweet, result) {
         console.log('📤 Sending to backend:', { media_url: mediaUrl, media_type: 'image' });
         
         // Call backend (always use 'image' type now)
-        const apiUrl = `${API_ENDPOINT.replace('/fact-check', '/check-media')}`;
-        console.log('API endpoint:', apiUrl);
-        
-        const response = await fetch(apiUrl, {
-          method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ media_url: mediaUrl, media_type: 'image' })
-        });
-        
-        console.log('📥 Response status:', response.status);
-        
-        if (!response.ok) {
-          const errorText = await response.text();
-          console.error('❌ API error:', errorText);
-          throw new Error(`API returned ${response.status}: ${errorText}`);
-        }
-        
-        const data = await response.json();
+        const data = await checkMedia(mediaUrl);
         console.log('✓ Response data:', data);
         
         // Display result with verdict
@@ -747,22 +923,7 @@ function showGenericOverlay(result, claimText = null) {
         
         console.log('🔊 TTS: Requesting audio for generic fact check');
         
-        const response = await fetch(TTS_ENDPOINT, {
-          method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-          },
-          body: JSON.stringify({
-            claim: claimText,
-            result: result
-          })
-        });
-        
-        if (!response.ok) {
-          throw new Error(`TTS API error: ${response.status}`);
-        }
-        
-        const audioBlob = await response.blob();
+        const audioBlob = await fetchSpeech(claimText, result);
         const audioUrl = URL.createObjectURL(audioBlob);
         
         currentAudio = new Audio(audioUrl);